@@ -0,0 +1,154 @@
+# api.py
+#
+# API JSON de solo lectura y versionada, para integraciones y BI:
+#
+#   GET /api/v1/                       -> recursos disponibles y sus campos
+#   GET /api/v1/<recurso>?campos=a,b&limite=100&despues=<cursor>&f_...=...
+#
+# Usa las mismas consultas y filtros (f_*) que las páginas HTML
+# (consultas.py) y los mismos permisos: un rol puede leer un recurso si
+# puede ver la página equivalente.
+#
+# Paginación por cursor (keyset) sobre la clave única de cada recurso:
+# la respuesta trae "siguiente", que se pasa tal cual en ?despues=.
+# ?campos= limita las columnas que se leen de MySQL y se serializan.
+
+import logging
+
+from flask import Blueprint, jsonify, request, session
+from mysql.connector import Error
+
+import consultas
+import json_rapido
+import paginacion
+
+log = logging.getLogger(__name__)
+
+VERSION = "v1"
+LIMITE_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+
+# recurso -> (consulta, endpoint de la página HTML cuyos permisos aplica)
+RECURSOS = {
+    "instituciones": (consultas.instituciones, "instituciones_list"),
+    "sedes": (consultas.sedes, "sedes_list"),
+    "tutores": (consultas.tutores, "tutores_list"),
+    "estudiantes": (consultas.estudiantes, "estudiantes_list"),
+    "periodos": (consultas.periodos, "periodos_list"),
+    "reportes/asistencia-aula": (consultas.reporte_asistencia_aula, "reporte_asistencia_aula"),
+    "reportes/asistencia-estudiante": (consultas.reporte_asistencia_estudiante,
+                                       "reporte_asistencia_estudiante"),
+    "reportes/boletin": (consultas.reporte_boletin, "reporte_boletin"),
+    "reportes/comparativo-programa": (consultas.reporte_comparativo_programa,
+                                      "reporte_comparativo_programa"),
+}
+
+
+def _error(estado, mensaje):
+    resp = jsonify({"error": mensaje})
+    resp.status_code = estado
+    return resp
+
+
+def _campos_pedidos(consulta):
+    """Campos de ?campos= validados; retorna (campos, desconocidos)."""
+    crudo = request.args.get("campos", "").strip()
+    if not crudo:
+        return consulta.nombres_campos, []
+    pedidos = [c.strip() for c in crudo.split(",") if c.strip()]
+    disponibles = set(consulta.nombres_campos)
+    desconocidos = [c for c in pedidos if c not in disponibles]
+    # Se respeta el orden de la consulta y no se repiten campos
+    return [c for c in consulta.nombres_campos if c in pedidos], desconocidos
+
+
+def crear_blueprint(get_connection, autorizacion):
+    bp = Blueprint("api_v1", __name__, url_prefix=f"/api/{VERSION}")
+
+    def _verificar_acceso(endpoint):
+        if "user_id" not in session:
+            return _error(401, "Debes iniciar sesión.")
+        if not autorizacion().permite(session.get("rol"), endpoint):
+            return _error(403, "No tienes permiso sobre este recurso.")
+        return None
+
+    @bp.route("/")
+    def indice():
+        if "user_id" not in session:
+            return _error(401, "Debes iniciar sesión.")
+        aut = autorizacion()
+        rol = session.get("rol")
+        recursos = {}
+        for nombre, (fabrica, endpoint) in RECURSOS.items():
+            if aut.permite(rol, endpoint):
+                consulta = fabrica(request.args)
+                recursos[nombre] = {"campos": consulta.nombres_campos,
+                                    "clave": consulta.clave}
+        return jsonify({"version": VERSION, "recursos": recursos})
+
+    @bp.route("/<path:recurso>")
+    def listar(recurso):
+        if recurso not in RECURSOS:
+            return _error(404, f"Recurso desconocido: {recurso}")
+        fabrica, endpoint = RECURSOS[recurso]
+        denegado = _verificar_acceso(endpoint)
+        if denegado is not None:
+            return denegado
+
+        consulta = fabrica(request.args)
+        campos, desconocidos = _campos_pedidos(consulta)
+        if desconocidos:
+            return _error(400, "Campos desconocidos: " + ", ".join(desconocidos))
+
+        limite = max(1, min(request.args.get("limite", LIMITE_DEFECTO, type=int),
+                            LIMITE_MAXIMO))
+        despues = None
+        if request.args.get("despues"):
+            despues = paginacion.decodificar_cursor(request.args["despues"],
+                                                    len(consulta.clave))
+            if despues is None:
+                return _error(400, "Cursor inválido.")
+
+        # La clave siempre se lee (hace falta para el cursor) aunque no se pida
+        leidos = campos + [c for c in consulta.clave if c not in campos]
+        sql, params = consulta.sql(campos=leidos, despues=despues, limite=limite + 1)
+
+        conn = get_connection()
+        if not conn:
+            return _error(503, "No se pudo conectar a la base de datos.")
+        # Cursor de tuplas: más liviano que dictionary=True, el dict se
+        # arma una sola vez abajo solo con los campos pedidos
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            filas = cursor.fetchall()
+        except Error as e:
+            log.error("Error en la API (%s): %s", recurso, e)
+            return _error(500, "Error consultando la base de datos.")
+        finally:
+            cursor.close()
+            conn.close()
+
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+
+        siguiente = None
+        if hay_mas and filas:
+            posiciones = [leidos.index(c) for c in consulta.clave]
+            siguiente = paginacion.codificar_cursor([filas[-1][i] for i in posiciones])
+
+        n = len(campos)
+        datos = [dict(zip(campos, fila[:n])) for fila in filas]
+        return jsonify({
+            "recurso": recurso,
+            "campos": campos,
+            "datos": datos,
+            "siguiente": siguiente,
+        })
+
+    return bp
+
+
+def registrar(app, get_connection, autorizacion):
+    json_rapido.registrar(app)
+    app.register_blueprint(crear_blueprint(get_connection, autorizacion))
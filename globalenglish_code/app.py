@@ -1,24 +1,62 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import (Flask, render_template, request, redirect, url_for, flash, session,
+                   jsonify, abort, Response)
+from itsdangerous import URLSafeSerializer, BadSignature
 import mysql
 from mysql.connector import Error
 from functools import wraps          # ⬅️ IMPORTANTE: esto debe estar aquí
 
-from config import DB_CONFIG
+from config import SECRET_KEY, DEBUG
+import logging
+import horario_tutor
+import paginacion
+import cache
+import busqueda
+import contrasenas
+import permisos
+import plantillas
+import streaming
+import assets
+import compresion
+import consultas
+import consultas_paralelas
+import metricas
+import perfilador
+import registro
+import repositorio
+import notas
+import replicas
+import riesgo
+import api
+import arranque
+import secrets
 from datetime import datetime, date
 
 
+log = logging.getLogger(__name__)
+
 app = Flask(__name__)
-app.secret_key = "supersecretkey"  # cambia en producción
+# En producción viene de GE_SECRET_KEY (crear_app() la exige)
+app.secret_key = SECRET_KEY or secrets.token_hex(32)
+registro.registrar(app)
+plantillas.registrar(app)
+assets.registrar(app)
+compresion.registrar(app)
+metricas.registrar(app)
+replicas.registrar(app)
 
 
 def get_connection():
-    """Crea y retorna una conexión a MySQL usando DB_CONFIG."""
+    """
+    Crea y retorna una conexión a MySQL: a una réplica en las lecturas de
+    reportes, listados y API (ver replicas.py), si no a DB_CONFIG.
+    """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        conn, origen = replicas.conectar()
+        metricas.contar("ge_db_conexiones_total", origen=origen)
+        return metricas.ConexionMedida(conn)
     except Error as e:
-        print("Error al conectar a MySQL:", e)
+        metricas.contar("ge_db_conexiones_fallidas_total", origen="directa")
+        log.error("Error al conectar a MySQL: %s", e)
         return None
 
 
@@ -57,6 +95,8 @@ def instituciones_new():
                         VALUES (%s, %s, %s, %s, %s);
                     """, (nombre, codigo_dane, tipo_jornada, telefono, email))
                     conn.commit()
+                    busqueda.agregar("institucion", cursor.lastrowid, nombre,
+                                     f"DANE {codigo_dane}", codigo_dane)
                     flash("Institución creada correctamente.", "success")
                     cursor.close()
                 except Error as e:
@@ -85,13 +125,91 @@ def login_required(f):
         return f(*args, **kwargs)
     return wrapper
 
+def _leer_version_permisos():
+    conn = get_connection()
+    if not conn:
+        return None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version FROM permisos_version WHERE id = 1;")
+        fila = cursor.fetchone()
+        return fila[0] if fila else None
+    except Error as e:
+        log.error("Error leyendo versión de permisos: %s", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _leer_tablas_permisos():
+    conn = get_connection()
+    if not conn:
+        return None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT r.nombre_rol, p.endpoint
+            FROM rol_permiso rp
+            JOIN rol r     ON r.id_rol = rp.id_rol
+            JOIN permiso p ON p.id_permiso = rp.id_permiso;
+        """)
+        filas_permisos = cursor.fetchall()
+        # Un endpoint registrado en la tabla permiso pero sin roles queda
+        # cerrado para todos (no cae al valor por defecto del decorador)
+        cursor.execute("SELECT endpoint FROM permiso;")
+        registrados = {fila[0] for fila in cursor.fetchall()}
+        cursor.execute("""
+            SELECT grupo, etiqueta, endpoint, divisor_antes
+            FROM menu_item
+            WHERE activo = 1
+            ORDER BY orden_grupo, orden;
+        """)
+        menu = cursor.fetchall()
+    except Error as e:
+        log.error("Error leyendo tablas de permisos: %s", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+    con_rol = {endpoint for _, endpoint in filas_permisos}
+    filas_permisos += [(None, endpoint) for endpoint in registrados - con_rol]
+    return filas_permisos, menu
+
+
+def autorizacion():
+    return permisos.obtener(_leer_version_permisos, _leer_tablas_permisos)
+
+
+# API JSON de solo lectura (/api/v1), con los mismos permisos que las páginas
+api.registrar(app, get_connection, autorizacion)
+
+# Perfilado bajo pedido: lo puede pedir quien tenga acceso a /admin/perfiles
+perfilador.registrar(app, lambda rol: autorizacion().permite(rol, "admin_perfiles"))
+
+
+@app.context_processor
+def inyectar_menu():
+    aut = autorizacion()
+    # menu_version entra en la clave del fragmento en caché de base.html
+    return {"menu_navegacion": aut.menu(session.get("rol")), "menu_version": aut.version}
+
+
 def role_required(*roles):
+    """
+    Restringe la vista a los roles con permiso sobre su endpoint.
+    Los permisos salen de la BD (ver permisos.py); los `roles` indicados
+    aquí solo se usan mientras el endpoint no esté registrado en la tabla.
+    """
     def decorator(f):
+        permisos.registrar_defecto(f.__name__, roles)
+
         @wraps(f)
         def wrapper(*args, **kwargs):
             if "user_id" not in session:
                 return redirect(url_for("login"))
-            if session.get("rol") not in roles:
+            if not autorizacion().permite(session.get("rol"), request.endpoint):
                 flash("No tienes permiso para acceder a esta sección.", "danger")
                 return redirect(url_for("index"))
             return f(*args, **kwargs)
@@ -101,25 +219,12 @@ def role_required(*roles):
 @app.route("/admin/usuarios/nuevo", methods=["GET", "POST"])
 @role_required("ADMINISTRADOR")
 def admin_nuevo_usuario():
-    conn = get_connection()
-    if not conn:
-        flash("Error de conexión con la base de datos.", "danger")
-        return redirect(url_for("index"))
-
-    cursor = conn.cursor(dictionary=True)
-
-    # Cargar roles disponibles (por ejemplo todos excepto ADMINISTRADOR,
-    # o dejar también ADMINISTRADOR si quieres que un admin cree otros admins)
-    cursor.execute("SELECT id_rol, nombre_rol FROM rol;")
-    roles = cursor.fetchall()
-
-    # Cargar tipos de documento si quieres desplegarlos en un select
-    cursor.execute("SELECT id_tipo_documento, nombre FROM tipo_documento;")
-    tipos_doc = cursor.fetchall()
-
-    cursor.close()
-
     if request.method == "POST":
+        conn = get_connection()
+        if not conn:
+            flash("Error de conexión con la base de datos.", "danger")
+            return redirect(url_for("admin_nuevo_usuario"))
+
         full_name = request.form.get("full_name")
         email = request.form.get("email")
         numero_doc = request.form.get("numero_documento")
@@ -141,7 +246,7 @@ def admin_nuevo_usuario():
             id_persona = cursor.lastrowid
 
             # 2. Insertar en USUARIO_SISTEMA
-            password_hash = generate_password_hash(password)
+            password_hash = contrasenas.generar_hash(password)
             cursor.execute("""
                 INSERT INTO usuario_sistema (username, password_hash, activo, id_persona, id_rol)
                 VALUES (%s, %s, 1, %s, %s);
@@ -157,15 +262,23 @@ def admin_nuevo_usuario():
 
         return redirect(url_for("admin_nuevo_usuario"))
 
-    # GET
-    conn.close()
+    # GET: roles y tipos de documento para los <select>
+    try:
+        roles = repositorio.roles()
+        tipos_doc = repositorio.tipos_documento()
+    except Error as e:
+        log.error("Error cargando combos de usuario: %s", e)
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("index"))
     return render_template("admin_usuario_form.html", roles=roles, tipos_doc=tipos_doc)
 
 # ============================
 # 🏫 AULAS
 # ============================
 
-# 1. /aulas → lista de instituciones con botón "Agregar aulas"
+# 1. /aulas → lista de instituciones con sus totales y botón "Agregar aulas"
+#    Los totales salen de UNA consulta agrupada; las aulas de cada institución
+#    se piden aparte (JSON paginado) solo cuando se despliega la fila.
 @app.route("/aulas")
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR")
 def aulas_list():
@@ -177,17 +290,34 @@ def aulas_list():
         try:
             cursor.execute("""
                 SELECT 
-                    id_institucion,
-                    nombre AS nombre_institucion,
-                    codigo_dane,
-                    activa
-                FROM institucion
-                WHERE activa = 1              -- solo instituciones activas
-                ORDER BY nombre;
+                    i.id_institucion,
+                    i.nombre AS nombre_institucion,
+                    i.codigo_dane,
+                    i.activa,
+                    COALESCE(a.total_aulas, 0)   AS total_aulas,
+                    COALESCE(a.aulas_activas, 0) AS aulas_activas,
+                    COALESCE(m.estudiantes, 0)   AS estudiantes
+                FROM institucion i
+                LEFT JOIN (
+                    SELECT id_institucion,
+                           COUNT(*)          AS total_aulas,
+                           SUM(estado = 1)   AS aulas_activas
+                    FROM aula_programa
+                    GROUP BY id_institucion
+                ) a ON a.id_institucion = i.id_institucion
+                LEFT JOIN (
+                    SELECT ap.id_institucion,
+                           COUNT(DISTINCT mt.id_estudiante) AS estudiantes
+                    FROM matricula mt
+                    JOIN aula_programa ap ON ap.id_aula = mt.id_aula
+                    GROUP BY ap.id_institucion
+                ) m ON m.id_institucion = i.id_institucion
+                WHERE i.activa = 1              -- solo instituciones activas
+                ORDER BY i.nombre;
             """)
             instituciones = cursor.fetchall()
         except Error as e:
-            print("Error al consultar instituciones para aulas:", e)
+            log.error("Error al consultar instituciones para aulas: %s", e)
         finally:
             cursor.close()
             conn.close()
@@ -195,6 +325,79 @@ def aulas_list():
     return render_template("aulas_instituciones.html", instituciones=instituciones)
 
 
+# Orden de las aulas dentro de una institución (la PK al final para el cursor)
+COLUMNAS_ORDEN_AULAS = ["s.nombre_sede", "g.nivel", "g.numero_grado", "ap.id_aula"]
+TAMANO_PAGINA_AULAS = 25
+
+
+@app.route("/api/instituciones/<int:id_institucion>/aulas")
+@role_required("ADMINISTRATIVO", "ADMINISTRADOR")
+def api_aulas_institucion(id_institucion):
+    """Aulas de una institución en JSON, paginadas por cursor (?despues=...)."""
+    despues = paginacion.decodificar_cursor(request.args.get("despues"),
+                                            len(COLUMNAS_ORDEN_AULAS))
+    condicion, params = "1 = 1", []
+    if despues is not None:
+        condicion, params = paginacion.condicion_keyset(COLUMNAS_ORDEN_AULAS, despues)
+
+    conn = get_connection()
+    if not conn:
+        return jsonify({"error": "No hay conexión con la base de datos."}), 503
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT 
+                ap.id_aula,
+                ap.codigo_aula,
+                ap.capacidad,
+                ap.estado,
+                s.nombre_sede,
+                g.nivel,
+                g.numero_grado,
+                tp.nombre AS programa
+            FROM aula_programa ap
+            INNER JOIN sede s           ON ap.id_sede          = s.id_sede
+            INNER JOIN grado g          ON ap.id_grado         = g.id_grado
+            INNER JOIN tipo_programa tp ON ap.id_tipo_programa = tp.id_tipo_programa
+            WHERE ap.id_institucion = %s
+              AND {condicion}
+            ORDER BY {paginacion.orden_sql(COLUMNAS_ORDEN_AULAS)}
+            LIMIT %s;
+        """, [id_institucion] + params + [TAMANO_PAGINA_AULAS + 1])
+        aulas = cursor.fetchall()
+    except Error as e:
+        log.error("ERROR al consultar aulas (api): %s", e)
+        return jsonify({"error": "Error al consultar las aulas."}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+    siguiente = None
+    if len(aulas) > TAMANO_PAGINA_AULAS:
+        aulas = aulas[:TAMANO_PAGINA_AULAS]
+        ultima = aulas[-1]
+        siguiente = paginacion.codificar_cursor(
+            [ultima["nombre_sede"], ultima["nivel"], ultima["numero_grado"], ultima["id_aula"]]
+        )
+
+    return jsonify({
+        "aulas": [
+            {
+                "id_aula": a["id_aula"],
+                "codigo_aula": a["codigo_aula"],
+                "sede": a["nombre_sede"],
+                "grado": f"{a['nivel']} {a['numero_grado']}",
+                "programa": a["programa"],
+                "capacidad": a["capacidad"],
+                "activa": a["estado"] == 1,
+                "url_estado": url_for("deshabilitar_aula", id_aula=a["id_aula"],
+                                      id_institucion=id_institucion),
+            }
+            for a in aulas
+        ],
+        "siguiente": siguiente,
+    })
 
 
 
@@ -232,7 +435,7 @@ def aulas_institucion_list(id_institucion):
         """, (id_institucion,))
         aulas = cursor.fetchall()
     except Error as e:
-        print("ERROR al consultar aulas:", e)
+        log.error("ERROR al consultar aulas: %s", e)
         flash("Error al consultar las aulas.", "danger")
     finally:
         cursor.close()
@@ -268,7 +471,7 @@ def toggle_aula(id_aula, id_institucion):
                          END
             WHERE id_aula = %s;
         """, (id_aula,))
-        print("Filas afectadas toggle_aula:", cursor.rowcount)
+        log.debug("Filas afectadas toggle_aula: %s", cursor.rowcount)
         conn.commit()
         if cursor.rowcount == 0:
             flash("No se encontró el aula a actualizar.", "warning")
@@ -276,7 +479,7 @@ def toggle_aula(id_aula, id_institucion):
             flash("Estado del aula actualizado correctamente.", "success")
     except Error as e:
         conn.rollback()
-        print("ERROR toggle_aula:", e)
+        log.error("ERROR toggle_aula: %s", e)
         flash("Error al actualizar el estado del aula.", "danger")
     finally:
         cursor.close()
@@ -289,34 +492,59 @@ def toggle_aula(id_aula, id_institucion):
 
 
 
+def _actualizar_hash_usuario(id_usuario, hash_anterior, password):
+    """
+    Re-hashea la contraseña con la política vigente (config.py).
+    Si falla no pasa nada: se vuelve a intentar en el siguiente login.
+    """
+    conn = get_connection()
+    if not conn:
+        return
+    cursor = conn.cursor()
+    try:
+        # La condición sobre el hash anterior evita pisar un cambio de
+        # contraseña hecho al mismo tiempo.
+        cursor.execute("""
+            UPDATE usuario_sistema
+            SET password_hash = %s
+            WHERE id_usuario = %s AND password_hash = %s;
+        """, (contrasenas.generar_hash(password), id_usuario, hash_anterior))
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        log.error("Error al actualizar hash de contraseña: %s", e)
+    finally:
+        cursor.close()
+        conn.close()
+
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         email = request.form.get("email")
         password = request.form.get("password")
 
-        conn = get_connection()
-        if not conn:
+        # suponiendo que username = email
+        try:
+            user = repositorio.usuario_para_login(email)
+        except Error as e:
+            log.error("Error consultando usuario para login: %s", e)
             flash("Error de conexión con la base de datos.", "danger")
             return render_template("login.html")
 
-        cursor = conn.cursor(dictionary=True)
-        # suponiendo que username = email
-        cursor.execute("""
-            SELECT u.id_usuario, u.username, u.password_hash, r.nombre_rol
-            FROM usuario_sistema u
-            JOIN rol r ON u.id_rol = r.id_rol
-            JOIN persona p ON u.id_persona = p.id_persona
-            WHERE u.username = %s AND u.activo = 1;
-        """, (email,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        try:
+            valido = user is not None and contrasenas.verificar(user["password_hash"], password)
+        except contrasenas.SistemaOcupado:
+            flash("Hay muchos ingresos en este momento. Intenta de nuevo en unos segundos.", "warning")
+            return render_template("login.html"), 503
 
-        if not user or not check_password_hash(user["password_hash"], password):
+        if not valido:
             flash("Usuario o contraseña incorrectos.", "danger")
             return render_template("login.html")
 
+        if contrasenas.necesita_rehash(user["password_hash"]):
+            _actualizar_hash_usuario(user["id_usuario"], user["password_hash"], password)
+
         # Login correcto
         session["user_id"] = user["id_usuario"]
         session["username"] = user["username"]
@@ -351,15 +579,15 @@ def register():
 @app.route("/instituciones/<int:id_institucion>/aulas/nueva", methods=["GET", "POST"])
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR")
 def aulas_new(id_institucion):
-    conn = get_connection()
-    if not conn:
-        flash("Error de conexión con la base de datos.", "danger")
-        return redirect(url_for("aulas_institucion_list", id_institucion=id_institucion))
-
-    cursor = conn.cursor(dictionary=True)
-
     # ----------------- POST: guardar aula -----------------
     if request.method == "POST":
+        conn = get_connection()
+        if not conn:
+            flash("Error de conexión con la base de datos.", "danger")
+            return redirect(url_for("aulas_institucion_list", id_institucion=id_institucion))
+
+        cursor = conn.cursor(dictionary=True)
+
         id_sede = request.form.get("id_sede")
         id_grado = request.form.get("id_grado")
         codigo_aula = request.form.get("codigo_aula")
@@ -425,7 +653,7 @@ def aulas_new(id_institucion):
 
         except Error as e:
             conn.rollback()
-            print("ERROR al crear aula:", e)
+            log.error("ERROR al crear aula: %s", e)
             flash("Error al crear el aula.", "danger")
         finally:
             cursor.close()
@@ -434,47 +662,46 @@ def aulas_new(id_institucion):
         return redirect(url_for("aulas_institucion_list", id_institucion=id_institucion))
 
     # ----------------- GET: mostrar formulario -------------
+    # Institución, sedes y grados no dependen entre sí: se cargan a la vez
     try:
-        # Nombre de la institución
-        cursor.execute(
-            "SELECT nombre FROM institucion WHERE id_institucion = %s",
-            (id_institucion,)
-        )
-        inst = cursor.fetchone()
-        nombre_institucion = inst["nombre"] if inst else "Institución"
-
-        # Sedes de la institución
-        cursor.execute(
-            """
-            SELECT id_sede, nombre_sede
-            FROM sede
-            WHERE id_institucion = %s
-            ORDER BY nombre_sede;
-            """,
-            (id_institucion,)
-        )
-        sedes = cursor.fetchall()
-
-        # Todos los grados disponibles
-        cursor.execute(
-            """
-            SELECT id_grado,
-                   CONCAT(nivel, ' ', numero_grado) AS nombre_grado
-            FROM grado
-            ORDER BY nivel, numero_grado;
-            """
-        )
-        grados = cursor.fetchall()
+        datos = consultas_paralelas.consultar({
+            # Nombre de la institución
+            "institucion": (
+                "SELECT nombre FROM institucion WHERE id_institucion = %s",
+                (id_institucion,)
+            ),
+            # Sedes de la institución
+            "sedes": (
+                """
+                SELECT id_sede, nombre_sede
+                FROM sede
+                WHERE id_institucion = %s
+                ORDER BY nombre_sede;
+                """,
+                (id_institucion,)
+            ),
+            # Todos los grados disponibles
+            "grados": (
+                """
+                SELECT id_grado,
+                       CONCAT(nivel, ' ', numero_grado) AS nombre_grado
+                FROM grado
+                ORDER BY nivel, numero_grado;
+                """,
+                None
+            ),
+        })
+        inst = datos["institucion"]
+        nombre_institucion = inst[0]["nombre"] if inst else "Institución"
+        sedes = datos["sedes"]
+        grados = datos["grados"]
 
     except Error as e:
-        print("ERROR al cargar datos para nueva aula:", e)
+        log.error("ERROR al cargar datos para nueva aula: %s", e)
         flash("Error al cargar datos para la nueva aula.", "danger")
         sedes = []
         grados = []
         nombre_institucion = "Institución"
-    finally:
-        cursor.close()
-        conn.close()
 
     return render_template(
         "aulas_form.html",
@@ -508,7 +735,7 @@ def deshabilitar_aula(id_aula, id_institucion):
             flash("Estado del aula actualizado correctamente.", "success")
     except Error as e:
         conn.rollback()
-        print("ERROR deshabilitar_aula:", e)
+        log.error("ERROR deshabilitar_aula: %s", e)
         flash("Error al actualizar el estado del aula.", "danger")
     finally:
         cursor.close()
@@ -531,7 +758,7 @@ def habilitar_aula(id_aula, id_institucion):
     except Error as e:
         conn.rollback()
         flash("Error al habilitar el aula.", "danger")
-        print("ERROR habilitar:", e)
+        log.error("ERROR habilitar: %s", e)
     finally:
         cursor.close()
         conn.close()
@@ -686,11 +913,7 @@ def instituciones_list():
     instituciones = []
     if conn:
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT id_institucion, nombre, codigo_dane, jornada, activa
-            FROM institucion
-            ORDER BY nombre;
-        """)
+        cursor.execute(*consultas.instituciones().sql())
         instituciones = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -734,41 +957,20 @@ def admin_duraciones_new():
 @app.route("/instituciones/<int:id_institucion>/aulas")
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR")
 def aulas_por_institucion(id_institucion):
-    conn = get_connection()
     aulas = []
-    institucion = None
-
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-
-        # Obtener info de la institución
-        cursor.execute("""
-            SELECT id_institucion, nombre 
-            FROM institucion
-            WHERE id_institucion = %s;
-        """, (id_institucion,))
-        institucion = cursor.fetchone()
-
-        # Si no existe, mensaje y redirección
-        if not institucion:
-            cursor.close()
-            conn.close()
-            flash("La institución seleccionada no existe.", "warning")
-            return redirect(url_for("instituciones_list"))
-
-        # Consultar aulas de esa institución
-        cursor.execute("""
-            SELECT a.id_aula, a.grado, a.programa, a.jornada, a.activa,
-                   s.nombre_sede AS sede
-            FROM aula a
-            INNER JOIN sede s ON a.id_sede = s.id_sede
-            WHERE a.id_institucion = %s
-            ORDER BY a.grado, a.programa;
-        """, (id_institucion,))
-        aulas = cursor.fetchall()
+    try:
+        institucion = repositorio.institucion(id_institucion)
+        if institucion:
+            aulas = repositorio.aulas_de_institucion(id_institucion)
+    except Error as e:
+        log.error("Error cargando aulas de la institución: %s", e)
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("instituciones_list"))
 
-        cursor.close()
-        conn.close()
+    # Si no existe, mensaje y redirección
+    if not institucion:
+        flash("La institución seleccionada no existe.", "warning")
+        return redirect(url_for("instituciones_list"))
 
     return render_template(
         "aulas_list.html",
@@ -868,17 +1070,183 @@ def institucion_habilitar(id_ied):
 def admin_config_dashboard():
     return render_template("admin_config_dashboard.html")
 
-@app.route("/admin/roles")
+def _subir_version_permisos(cursor):
+    cursor.execute("UPDATE permisos_version SET version = version + 1 WHERE id = 1;")
+
+
+@app.route("/admin/plantillas")
+@role_required("ADMINISTRADOR")
+def admin_plantillas_estadisticas():
+    """Tiempos de render por plantilla y aciertos del caché de fragmentos (JSON)."""
+    return jsonify(plantillas.estadisticas())
+
+
+@app.route("/admin/perfiles")
+@role_required("ADMINISTRADOR")
+def admin_perfiles():
+    """Perfiles de peticiones guardados por perfilador.py."""
+    f_endpoint = request.args.get("f_endpoint", "").strip()
+    orden = request.args.get("orden", "fecha")
+    perfiles = perfilador.listar(f_endpoint or None, orden)
+    endpoints = sorted({p["endpoint"] for p in perfilador.listar()})
+    return render_template(
+        "admin_perfiles.html",
+        perfiles=perfiles,
+        endpoints=endpoints,
+        f_endpoint=f_endpoint,
+        orden=orden,
+        tasa=perfilador.PERFILADOR_TASA,
+    )
+
+
+@app.route("/admin/perfiles/<nombre>.folded")
+@role_required("ADMINISTRADOR")
+def admin_perfil_descargar(nombre):
+    ruta = perfilador.ruta_folded(nombre)
+    if ruta is None:
+        abort(404)
+    with open(ruta, encoding="utf-8") as f:
+        contenido = f.read()
+    return Response(contenido, mimetype="text/plain",
+                    headers={"Content-Disposition": f"attachment; filename={nombre}.folded"})
+
+
+@app.route("/admin/roles", methods=["GET", "POST"])
 @role_required("ADMINISTRADOR")
 def roles_list():
-    # TODO: listar roles
-    return render_template("roles_list.html")
+    conn = get_connection()
+    if not conn:
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("admin_config_dashboard"))
+
+    # ----- POST: guardar los permisos de un rol -----
+    if request.method == "POST":
+        id_rol = request.form.get("id_rol", type=int)
+        seleccionados = {int(x) for x in request.form.getlist("permisos") if x.isdigit()}
+
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT nombre_rol FROM rol WHERE id_rol = %s;", (id_rol,))
+            rol = cursor.fetchone()
+            if not rol:
+                flash("El rol seleccionado no existe.", "warning")
+                return redirect(url_for("roles_list"))
+
+            # Evitar que el administrador se quite a sí mismo esta pantalla
+            if rol["nombre_rol"] == session.get("rol"):
+                cursor.execute("SELECT id_permiso FROM permiso WHERE endpoint = 'roles_list';")
+                propio = cursor.fetchone()
+                if propio:
+                    seleccionados.add(propio["id_permiso"])
+
+            cursor.execute("DELETE FROM rol_permiso WHERE id_rol = %s;", (id_rol,))
+            if seleccionados:
+                cursor.executemany(
+                    "INSERT INTO rol_permiso (id_rol, id_permiso) VALUES (%s, %s);",
+                    [(id_rol, id_permiso) for id_permiso in sorted(seleccionados)]
+                )
+            _subir_version_permisos(cursor)
+            conn.commit()
+            permisos.invalidar()
+            flash(f"Permisos del rol {rol['nombre_rol']} actualizados.", "success")
+        except Error as e:
+            conn.rollback()
+            flash(f"Error al guardar permisos: {e}", "danger")
+        finally:
+            cursor.close()
+            conn.close()
+
+        return redirect(url_for("roles_list"))
+
+    # ----- GET: matriz rol x permiso -----
+    roles, lista_permisos, asignados = [], [], set()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id_rol, nombre_rol FROM rol ORDER BY nombre_rol;")
+        roles = cursor.fetchall()
+        cursor.execute("""
+            SELECT id_permiso, endpoint, descripcion
+            FROM permiso
+            ORDER BY endpoint;
+        """)
+        lista_permisos = cursor.fetchall()
+        cursor.execute("SELECT id_rol, id_permiso FROM rol_permiso;")
+        asignados = {(f["id_rol"], f["id_permiso"]) for f in cursor.fetchall()}
+    except Error as e:
+        log.error("Error al consultar roles y permisos: %s", e)
+        flash("No se pudieron cargar los permisos. ¿Ya se aplicó sql/003_permisos.sql?", "warning")
+    finally:
+        cursor.close()
+        conn.close()
+
+    return render_template(
+        "roles_list.html",
+        roles=roles,
+        permisos=lista_permisos,
+        asignados=asignados,
+    )
 
-@app.route("/admin/menus")
+
+@app.route("/admin/menus", methods=["GET", "POST"])
 @role_required("ADMINISTRADOR")
 def menus_list():
-    # TODO: gestionar menús por rol si lo implementas
-    return render_template("menus_list.html")
+    conn = get_connection()
+    if not conn:
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("admin_config_dashboard"))
+
+    # ----- POST: actualizar una opción del menú -----
+    if request.method == "POST":
+        id_menu_item = request.form.get("id_menu_item", type=int)
+        etiqueta = request.form.get("etiqueta", "").strip()
+        orden = request.form.get("orden", type=int)
+        divisor_antes = 1 if request.form.get("divisor_antes") == "1" else 0
+        activo = 1 if request.form.get("activo") == "1" else 0
+
+        if not etiqueta or orden is None:
+            flash("La etiqueta y el orden son obligatorios.", "danger")
+            conn.close()
+            return redirect(url_for("menus_list"))
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE menu_item
+                SET etiqueta = %s, orden = %s, divisor_antes = %s, activo = %s
+                WHERE id_menu_item = %s;
+            """, (etiqueta, orden, divisor_antes, activo, id_menu_item))
+            _subir_version_permisos(cursor)
+            conn.commit()
+            permisos.invalidar()
+            flash("Menú actualizado.", "success")
+        except Error as e:
+            conn.rollback()
+            flash(f"Error al actualizar el menú: {e}", "danger")
+        finally:
+            cursor.close()
+            conn.close()
+
+        return redirect(url_for("menus_list"))
+
+    # ----- GET -----
+    items = []
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT id_menu_item, grupo, orden_grupo, etiqueta, endpoint,
+                   orden, divisor_antes, activo
+            FROM menu_item
+            ORDER BY orden_grupo, orden;
+        """)
+        items = cursor.fetchall()
+    except Error as e:
+        log.error("Error al consultar menús: %s", e)
+        flash("No se pudo cargar el menú. ¿Ya se aplicó sql/003_permisos.sql?", "warning")
+    finally:
+        cursor.close()
+        conn.close()
+
+    return render_template("menus_list.html", items=items)
 
 # Listado de sedes
 @app.route("/sedes")
@@ -889,17 +1257,7 @@ def sedes_list():
 
     if conn:
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                s.id_sede,
-                s.nombre_sede,
-                s.direccion,
-                s.es_principal,
-                i.nombre AS institucion
-            FROM sede s
-            INNER JOIN institucion i ON s.id_institucion = i.id_institucion
-            ORDER BY i.nombre, s.nombre_sede;
-        """)
+        cursor.execute(*consultas.sedes().sql())
         sedes = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -942,16 +1300,12 @@ def sedes_new():
             return redirect(url_for("sedes_list"))
 
     # ----- GET: mostrar formulario con instituciones -----
-    cursor = conn.cursor(dictionary=True)
-    # Si tienes un campo 'activa' en institucion puedes filtrar, si no, quita el WHERE
-    cursor.execute("""
-        SELECT id_institucion, nombre
-        FROM institucion
-        ORDER BY nombre;
-    """)
-    instituciones = cursor.fetchall()
-    cursor.close()
     conn.close()
+    try:
+        instituciones = repositorio.instituciones_para_combo()
+    except Error as e:
+        log.error("Error cargando instituciones: %s", e)
+        instituciones = []
 
     return render_template("sedes_form.html", instituciones=instituciones)
 
@@ -999,7 +1353,10 @@ def sedes_edit(id_sede):
                     es_principal = %s
                 WHERE id_sede = %s
             """, (id_institucion, nombre_sede, direccion, es_principal, id_sede))
+            # El nombre de la sede aparece en el horario de los tutores
+            _subir_version_horario(cursor)
             conn.commit()
+            horario_tutor.invalidar()
             cursor.close()
             conn.close()
             flash("Sede actualizada correctamente.", "success")
@@ -1012,14 +1369,13 @@ def sedes_edit(id_sede):
             return redirect(url_for("sedes_list"))
 
     # --- GET: cargar instituciones y mostrar formulario ---
-    cursor.execute("""
-        SELECT id_institucion, nombre
-        FROM institucion
-        ORDER BY nombre;
-    """)
-    instituciones = cursor.fetchall()
     cursor.close()
     conn.close()
+    try:
+        instituciones = repositorio.instituciones_para_combo()
+    except Error as e:
+        log.error("Error cargando instituciones: %s", e)
+        instituciones = []
 
     return render_template(
         "sedes_form.html",
@@ -1042,7 +1398,9 @@ def sedes_delete(id_sede):
     try:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM sede WHERE id_sede = %s", (id_sede,))
+        _subir_version_horario(cursor)
         conn.commit()
+        horario_tutor.invalidar()
         cursor.close()
         conn.close()
         flash("Sede eliminada correctamente.", "success")
@@ -1064,27 +1422,17 @@ def tutores_list():
     tutores = []
 
     if conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                p.id_persona,
-                p.nombres,
-                p.apellidos,
-                p.email,
-                p.telefono,
-                p.numero_documento,
-                td.nombre AS tipo_documento
-            FROM persona p
-            LEFT JOIN tipo_documento td 
-                ON p.id_tipo_documento = td.id_tipo_documento
-            WHERE p.tipo_perfil_contrato = 'TUTOR'
-            ORDER BY p.apellidos, p.nombres;
-        """)
-        tutores = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        cursor = conn.cursor()  # sin buffer: se lee mientras se renderiza
+        try:
+            cursor.execute(*consultas.tutores().sql())
+            tutores = streaming.iterar_filas(conn, cursor)
+        except Error as e:
+            log.error("Error cargando tutores: %s", e)
+            flash("Error al cargar la lista de tutores.", "danger")
+            cursor.close()
+            conn.close()
 
-    return render_template("tutores_list.html", tutores=tutores)
+    return streaming.render_listado("tutores_list.html", tutores=tutores)
 
 # ============================
 # ➕ REGISTRAR NUEVO TUTOR
@@ -1092,21 +1440,6 @@ def tutores_list():
 @app.route("/tutores/nuevo", methods=["GET", "POST"])
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR")
 def tutores_new():
-    conn = get_connection()
-    if not conn:
-        flash("Error de conexión con la base de datos.", "danger")
-        return redirect(url_for("tutores_list"))
-
-    cursor = conn.cursor(dictionary=True)
-
-    # Cargar tipos de documento para el combo
-    cursor.execute("""
-        SELECT id_tipo_documento, nombre
-        FROM tipo_documento
-        ORDER BY nombre;
-    """)
-    tipos_doc = cursor.fetchall()
-
     if request.method == "POST":
         id_tipo_documento = request.form.get("id_tipo_documento")
         numero_documento = request.form.get("numero_documento")
@@ -1115,9 +1448,14 @@ def tutores_new():
         email = request.form.get("email")
         telefono = request.form.get("telefono")
 
+        conn = get_connection()
+        if not conn:
+            flash("Error de conexión con la base de datos.", "danger")
+            return redirect(url_for("tutores_list"))
+
+        cursor = conn.cursor()
         try:
-            cursor2 = conn.cursor()
-            cursor2.execute("""
+            cursor.execute("""
                 INSERT INTO persona (
                     id_tipo_documento,
                     numero_documento,
@@ -1130,27 +1468,78 @@ def tutores_new():
                 VALUES (%s, %s, %s, %s, %s, %s, 'TUTOR');
             """, (id_tipo_documento, numero_documento, nombres, apellidos, email, telefono))
             conn.commit()
-            cursor2.close()
-            cursor.close()
-            conn.close()
+            busqueda.agregar("tutor", cursor.lastrowid, f"{apellidos}, {nombres}",
+                             email, numero_documento)
             flash("Tutor registrado correctamente.", "success")
-            return redirect(url_for("tutores_list"))
         except Error as e:
             conn.rollback()
-            cursor2.close()
+            flash(f"Error al registrar el tutor: {e}", "danger")
+        finally:
             cursor.close()
             conn.close()
-            flash(f"Error al registrar el tutor: {e}", "danger")
-            return redirect(url_for("tutores_list"))
+        return redirect(url_for("tutores_list"))
 
-    # GET -> mostrar formulario vacío
-    cursor.close()
-    conn.close()
+    # GET -> mostrar formulario vacío, con los tipos de documento para el combo
+    try:
+        tipos_doc = repositorio.tipos_documento()
+    except Error as e:
+        log.error("Error cargando tipos de documento: %s", e)
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("tutores_list"))
     return render_template("tutores_form.html", tipos_doc=tipos_doc)
 
 # ============================
 # 👨‍🎓 LISTA DE ESTUDIANTES
 # ============================
+# Columnas de orden permitidas (campos de consultas.estudiantes, cada una
+# respaldada por un índice, ver sql/001_indices_estudiante.sql). La última
+# columna siempre es la PK para que la clave sea única y el cursor no salte
+# ni repita filas.
+ORDENES_ESTUDIANTE = {
+    "nombre":    ["apellidos", "nombres", "id_estudiante"],
+    "documento": ["numero_documento", "id_estudiante"],
+}
+TAMANO_PAGINA_ESTUDIANTES = 50
+
+_totales_estudiantes = cache.CacheTTL(120, "estudiantes_totales")
+_combos_estudiantes = cache.CacheTTL(300, "estudiantes_combos")
+
+
+def _total_estudiantes(cursor, where_sql, params, clave):
+    """
+    Total de estudiantes para los filtros dados, sin hacer COUNT(*) en cada página.
+    Sin filtros se usa la estimación de InnoDB (information_schema);
+    con filtros se cuenta una vez y se guarda en caché unos minutos.
+    Retorna (total, es_estimado).
+    """
+    guardado = _totales_estudiantes.get(clave)
+    if guardado is not None:
+        return guardado
+
+    if not params:
+        cursor.execute("""
+            SELECT TABLE_ROWS AS total
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'estudiante';
+        """)
+        fila = cursor.fetchone()
+        resultado = (int(fila["total"] or 0) if fila else 0, True)
+    else:
+        cursor.execute(f"SELECT COUNT(*) AS total FROM estudiante e WHERE {where_sql};", params)
+        resultado = (cursor.fetchone()["total"], False)
+
+    _totales_estudiantes.set(clave, resultado)
+    return resultado
+
+
+def _combos_filtro_estudiantes():
+    combos = _combos_estudiantes.get("combos")
+    if combos is None:
+        combos = (repositorio.instituciones_para_combo(), repositorio.grados())
+        _combos_estudiantes.set("combos", combos)
+    return combos
+
+
 @app.route("/estudiantes")
 @login_required
 @role_required("ADMINISTRADOR", "ADMINISTRATIVO")
@@ -1160,31 +1549,82 @@ def estudiantes_list():
         flash("No se pudo conectar a la base de datos.", "danger")
         return redirect(url_for("index"))
 
+    # ----- Filtros (compartidos con /api/v1/estudiantes) -----
+    f_institucion = request.args.get("f_institucion", type=int)
+    f_grado = request.args.get("f_grado", type=int)
+    f_documento = request.args.get("f_documento", "").strip()
+    consulta = consultas.estudiantes(request.args)
+    where_filtros, params = consulta.where()
+
+    # ----- Orden y cursor -----
+    orden = request.args.get("orden", "nombre")
+    if orden not in ORDENES_ESTUDIANTE:
+        orden = "nombre"
+    descendente = request.args.get("dir") == "desc"
+    columnas = ORDENES_ESTUDIANTE[orden]
+
+    despues = paginacion.decodificar_cursor(request.args.get("despues"), len(columnas))
+    antes = paginacion.decodificar_cursor(request.args.get("antes"), len(columnas))
+    hacia_atras = antes is not None and despues is None
+
+    estudiantes, total, total_estimado = [], 0, False
+    instituciones, grados = [], []
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT 
-                e.id_estudiante,
-                td.nombre AS tipo_doc,
-                e.numero_documento,
-                CONCAT(e.apellidos, ', ', e.nombres) AS nombre_completo,
-                g.numero_grado,
-                e.fecha_nacimiento,
-                e.correo,
-                e.telefono,
-                i.nombre AS institucion
-            FROM estudiante e
-            JOIN tipo_documento td ON td.id_tipo_documento = e.id_tipo_documento
-            LEFT JOIN grado g       ON g.id_grado = e.id_grado_actual
-            LEFT JOIN institucion i ON i.id_institucion = e.id_institucion
-            ORDER BY e.apellidos, e.nombres;
-        """)
+        cursor.execute(*consulta.sql(
+            clave=columnas,
+            despues=antes if hacia_atras else despues,
+            descendente=descendente != hacia_atras,
+            limite=TAMANO_PAGINA_ESTUDIANTES + 1,
+        ))
         estudiantes = cursor.fetchall()
+
+        total, total_estimado = _total_estudiantes(
+            cursor, where_filtros, params,
+            (f_institucion, f_grado, f_documento)
+        )
+        instituciones, grados = _combos_filtro_estudiantes()
+    except Error as e:
+        log.error("Error cargando estudiantes: %s", e)
+        flash("Error al cargar la lista de estudiantes.", "danger")
     finally:
         cursor.close()
         conn.close()
 
-    return render_template("estudiantes_list.html", estudiantes=estudiantes)
+    hay_mas = len(estudiantes) > TAMANO_PAGINA_ESTUDIANTES
+    estudiantes = estudiantes[:TAMANO_PAGINA_ESTUDIANTES]
+    if hacia_atras:
+        estudiantes.reverse()
+
+    def clave(fila):
+        return [fila[c] for c in columnas]
+
+    cursor_siguiente = cursor_anterior = None
+    if estudiantes:
+        if hay_mas or hacia_atras:
+            cursor_siguiente = paginacion.codificar_cursor(clave(estudiantes[-1]))
+        if despues is not None or (hacia_atras and hay_mas):
+            cursor_anterior = paginacion.codificar_cursor(clave(estudiantes[0]))
+
+    filtros = {k: v for k, v in {
+        "f_institucion": f_institucion,
+        "f_grado": f_grado,
+        "f_documento": f_documento,
+    }.items() if v}
+
+    return render_template(
+        "estudiantes_list.html",
+        estudiantes=estudiantes,
+        instituciones=instituciones,
+        grados=grados,
+        filtros=filtros,
+        orden=orden,
+        direccion="desc" if descendente else "asc",
+        cursor_siguiente=cursor_siguiente,
+        cursor_anterior=cursor_anterior,
+        total=total,
+        total_estimado=total_estimado,
+    )
 
 # ============================
 # ➕ REGISTRAR NUEVO ESTUDIANTE
@@ -1193,12 +1633,12 @@ def estudiantes_list():
 @login_required
 @role_required("ADMINISTRADOR", "ADMINISTRATIVO")
 def estudiantes_new():
-    conn = get_connection()
-    if not conn:
-        flash("No se pudo conectar a la base de datos.", "danger")
-        return redirect(url_for("estudiantes_list"))
-
     if request.method == "POST":
+        conn = get_connection()
+        if not conn:
+            flash("No se pudo conectar a la base de datos.", "danger")
+            return redirect(url_for("estudiantes_list"))
+
         id_tipo_documento = request.form.get("id_tipo_documento")
         numero_documento = request.form.get("numero_documento")
         nombres = request.form.get("nombres")
@@ -1237,6 +1677,9 @@ def estudiantes_new():
                 id_grado_actual
             ))
             conn.commit()
+            _totales_estudiantes.invalidar()
+            busqueda.agregar("estudiante", cursor.lastrowid, f"{apellidos}, {nombres}",
+                             None, numero_documento)
             flash("Estudiante registrado correctamente.", "success")
         except Error as e:
             conn.rollback()
@@ -1247,34 +1690,34 @@ def estudiantes_new():
 
         return redirect(url_for("estudiantes_list"))
 
-    # GET: cargar combos
-    cursor = conn.cursor(dictionary=True)
+    # GET: cargar combos (consultas independientes, en paralelo)
     try:
-        cursor.execute("""
-            SELECT id_tipo_documento, nombre
-            FROM tipo_documento
-            ORDER BY nombre;
-        """)
-        tipos_doc = cursor.fetchall()
-
-        cursor.execute("""
-            SELECT id_institucion, nombre
-            FROM institucion
-            WHERE activa = 1
-            ORDER BY nombre;
-        """)
-        instituciones = cursor.fetchall()
-
-        cursor.execute("""
-            SELECT id_grado, numero_grado
-            FROM grado
-            WHERE numero_grado IN (4,5,9,10)
-            ORDER BY numero_grado;
-        """)
-        grados = cursor.fetchall()
-    finally:
-        cursor.close()
-        conn.close()
+        combos = consultas_paralelas.consultar({
+            "tipos_doc": ("""
+                SELECT id_tipo_documento, nombre
+                FROM tipo_documento
+                ORDER BY nombre;
+            """, None),
+            "instituciones": ("""
+                SELECT id_institucion, nombre
+                FROM institucion
+                WHERE activa = 1
+                ORDER BY nombre;
+            """, None),
+            "grados": ("""
+                SELECT id_grado, numero_grado
+                FROM grado
+                WHERE numero_grado IN (4,5,9,10)
+                ORDER BY numero_grado;
+            """, None),
+        })
+    except Error as e:
+        log.error("Error cargando combos de estudiante: %s", e)
+        flash("No se pudieron cargar los datos del formulario.", "danger")
+        return redirect(url_for("estudiantes_list"))
+    tipos_doc = combos["tipos_doc"]
+    instituciones = combos["instituciones"]
+    grados = combos["grados"]
 
     return render_template(
         "estudiantes_new.html",
@@ -1298,28 +1741,12 @@ def periodos_list():
     if conn:
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute("""
-                SELECT 
-                    id_periodo,
-                    nombre_periodo,
-                    fecha_inicio,
-                    fecha_fin,
-                    anio
-                FROM periodo_academico
-                ORDER BY fecha_inicio;
-            """)
+            # "activo" se calcula en el SQL (CURDATE() entre inicio y fin)
+            cursor.execute(*consultas.periodos().sql())
             periodos = cursor.fetchall()
 
-            # Calculamos si el período está ACTIVO o INACTIVO
-            hoy = date.today()
-            for p in periodos:
-                fi = p["fecha_inicio"]
-                ff = p["fecha_fin"]
-                # fi y ff vienen como date/datetime desde MySQL
-                p["activo"] = (fi <= hoy <= ff)
-
         except Error as e:
-            print("Error al consultar períodos académicos:", e)
+            log.error("Error al consultar períodos académicos: %s", e)
         finally:
             cursor.close()
             conn.close()
@@ -1404,7 +1831,7 @@ def componentes_list():
             """)
             componentes = cursor.fetchall()
         except Error as e:
-            print("Error al consultar componentes de nota:", e)
+            log.error("Error al consultar componentes de nota: %s", e)
         finally:
             cursor.close()
             conn.close()
@@ -1459,7 +1886,7 @@ def componentes_new():
             """)
             programas = cursor.fetchall()
         except Error as e:
-            print("Error al consultar tipos de programa:", e)
+            log.error("Error al consultar tipos de programa: %s", e)
         finally:
             cursor.close()
             conn.close()
@@ -1467,6 +1894,64 @@ def componentes_new():
     return render_template("componentes_form.html", programas=programas)
 
 
+@app.route("/componentes/<int:id_componente>/editar", methods=["GET", "POST"])
+@role_required("ADMINISTRATIVO", "ADMINISTRADOR")
+def componentes_edit(id_componente):
+    conn = get_connection()
+    if not conn:
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("componentes_list"))
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT id_componente, id_tipo_programa, nombre_componente, porcentaje
+            FROM componente_nota
+            WHERE id_componente = %s
+        """, (id_componente,))
+        componente = cursor.fetchone()
+        if not componente:
+            flash("El componente seleccionado no existe.", "warning")
+            return redirect(url_for("componentes_list"))
+
+        if request.method == "POST":
+            nombre_componente = request.form.get("nombre_componente")
+            porcentaje = request.form.get("porcentaje")
+            try:
+                # El SELECT de arriba ya abrió la transacción (sin autocommit):
+                # el UPDATE y el recálculo van en ella hasta el commit
+                cursor.execute("""
+                    UPDATE componente_nota
+                    SET nombre_componente = %s,
+                        porcentaje = %s
+                    WHERE id_componente = %s
+                """, (nombre_componente, porcentaje, id_componente))
+                # Cambió un peso: la nota final de todo el programa, en el mismo commit
+                notas.recalcular_programa(cursor, componente["id_tipo_programa"])
+                conn.commit()
+                flash("Componente actualizado; se recalculó la nota final del programa.", "success")
+            except Error as e:
+                conn.rollback()
+                flash(f"Error al actualizar el componente de nota: {e}", "danger")
+            return redirect(url_for("componentes_list"))
+
+        cursor.execute("""
+            SELECT id_tipo_programa, nombre
+            FROM tipo_programa
+            ORDER BY id_tipo_programa;
+        """)
+        programas = cursor.fetchall()
+    except Error as e:
+        log.error("Error al consultar el componente de nota: %s", e)
+        flash("Error al consultar el componente de nota.", "danger")
+        return redirect(url_for("componentes_list"))
+    finally:
+        cursor.close()
+        conn.close()
+
+    return render_template("componentes_form.html", programas=programas, componente=componente)
+
+
 
 # ============================
 # 📘 MÓDULO DE REGISTRO DE NOTAS
@@ -1477,103 +1962,311 @@ def componentes_new():
 def notas_registro():
     """
     Página inicial del sistema de notas.
-    Desde aquí se seleccionará aula, período y componente para proceder a registrar.
+    Desde aquí se selecciona aula, período y componente y se abre la planilla.
     """
-    conn = get_connection()
     aulas = []
     periodos = []
     componentes = []
 
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        try:
-            # Obtener aulas activas
-            cursor.execute("""
+    # Las tres consultas son independientes: corren a la vez
+    try:
+        datos = consultas_paralelas.consultar({
+            # Aulas activas
+            "aulas": ("""
                 SELECT id_aula, nombre_aula 
                 FROM aula_programa
                 WHERE activa = 1
                 ORDER BY nombre_aula;
-            """)
-            aulas = cursor.fetchall()
-
-            # Obtener periodos activos
-            cursor.execute("""
+            """, None),
+            # Periodos activos
+            "periodos": ("""
                 SELECT id_periodo, nombre_periodo
                 FROM periodo_academico
                 WHERE activo = 1
                 ORDER BY id_periodo;
-            """)
-            periodos = cursor.fetchall()
-
-            # Obtener componentes
-            cursor.execute("""
+            """, None),
+            # Componentes
+            "componentes": ("""
                 SELECT id_componente, nombre_componente, programa
                 FROM componente_nota
                 WHERE activo = 1
                 ORDER BY programa, nombre_componente;
-            """)
-            componentes = cursor.fetchall()
+            """, None),
+        })
+        aulas = datos["aulas"]
+        periodos = datos["periodos"]
+        componentes = datos["componentes"]
+    except Error as e:
+        log.error("Error cargando datos del registro de notas: %s", e)
 
-        except Error as e:
-            print("Error cargando datos del registro de notas:", e)
-        finally:
-            cursor.close()
-            conn.close()
+    aulas_tutor = _aulas_del_tutor()
+    if aulas_tutor is not None:
+        aulas = [a for a in aulas if a["id_aula"] in aulas_tutor]
 
     return render_template(
         "notas_menu.html",
         aulas=aulas,
         periodos=periodos,
-        componentes=componentes
+        componentes=componentes,
+        puede_importar=autorizacion().permite(session.get("rol"), "notas_importar"),
+    )
+
+
+def _aulas_del_tutor():
+    """Ids de las aulas asignadas si quien entra es TUTOR; None para los demás roles."""
+    if session.get("rol") != "TUTOR":
+        return None
+    entrada = _horario_en_cache(session["user_id"])
+    return {a["id_aula"] for a in entrada["filas"]} if entrada else set()
+
+
+@app.route("/notas/planilla", methods=["GET", "POST"])
+@role_required("ADMINISTRATIVO", "ADMINISTRADOR", "TUTOR")
+def notas_planilla():
+    """
+    Planilla de un componente: todo el listado del aula con su nota, y se
+    guarda completa en una sola transacción (ver notas.py).
+    """
+    id_aula = request.values.get("aula", type=int)
+    id_periodo = request.values.get("periodo", type=int)
+    id_componente = request.values.get("componente", type=int)
+    aulas_tutor = _aulas_del_tutor()
+    if not (id_aula and id_periodo and id_componente):
+        flash("Seleccione aula, período y componente.", "warning")
+        return redirect(url_for("notas_registro"))
+    if aulas_tutor is not None and id_aula not in aulas_tutor:
+        flash("Solo puede registrar notas de sus aulas.", "danger")
+        return redirect(url_for("notas_registro"))
+
+    try:
+        contexto = repositorio.contexto_planilla(id_aula, id_periodo, id_componente)
+        estudiantes = repositorio.estudiantes_de_aula(id_aula) if contexto else []
+        registradas = repositorio.notas_planilla(id_aula, id_periodo, id_componente)
+    except Error as e:
+        log.error("Error cargando la planilla de notas: %s", e)
+        flash("Error cargando la planilla de notas.", "danger")
+        return redirect(url_for("notas_registro"))
+    if not contexto:
+        flash("El aula, el período o el componente no existe.", "warning")
+        return redirect(url_for("notas_registro"))
+
+    errores = {}
+    if request.method == "POST":
+        valores, vacios, errores = notas.leer_planilla(request.form, estudiantes)
+        # Una celda vaciada borra la nota que tenía
+        borrar = [(id_estudiante, id_aula, id_periodo, id_componente)
+                  for id_estudiante in vacios if id_estudiante in registradas]
+        if errores:
+            flash("Hay notas inválidas; no se guardó nada.", "danger")
+        else:
+            conn = get_connection()
+            if not conn:
+                flash("Error de conexión con la base de datos.", "danger")
+            else:
+                try:
+                    guardadas = notas.guardar(conn, [
+                        (id_estudiante, id_aula, id_periodo, id_componente, valor)
+                        for id_estudiante, valor in valores.items()
+                    ], borrar)
+                    mensaje = f"{guardadas} nota(s) guardada(s)"
+                    if borrar:
+                        mensaje += f", {len(borrar)} borrada(s)"
+                    flash(mensaje + ".", "success")
+                    return redirect(url_for("notas_planilla", aula=id_aula, periodo=id_periodo,
+                                            componente=id_componente))
+                except Error as e:
+                    log.error("Error guardando la planilla de notas: %s", e)
+                    flash("Error guardando las notas; no se guardó nada.", "danger")
+                finally:
+                    conn.close()
+
+    return render_template(
+        "notas_planilla.html",
+        contexto=contexto,
+        id_periodo=id_periodo,
+        id_componente=id_componente,
+        estudiantes=estudiantes,
+        # Tras un POST con errores se muestra lo que se escribió
+        valores=request.form if request.method == "POST" else {
+            f"nota_{id_estudiante}": valor for id_estudiante, valor in registradas.items()
+        },
+        errores=errores,
+    )
+
+
+@app.route("/notas/importar", methods=["GET", "POST"])
+@role_required("ADMINISTRATIVO", "ADMINISTRADOR")
+def notas_importar():
+    """
+    Carga desde CSV las notas de un componente para toda una institución
+    (columnas documento y nota, opcionalmente id_aula).
+    """
+    errores = []
+    if request.method == "POST":
+        id_institucion = request.form.get("institucion", type=int)
+        id_periodo = request.form.get("periodo", type=int)
+        id_componente = request.form.get("componente", type=int)
+        archivo = request.files.get("archivo")
+        if not (id_institucion and id_periodo and id_componente and archivo and archivo.filename):
+            flash("Seleccione institución, período, componente y archivo.", "warning")
+            return redirect(url_for("notas_importar"))
+
+        try:
+            matriculas = repositorio.matriculas_institucion(id_institucion)
+        except Error as e:
+            log.error("Error cargando matrículas para importar notas: %s", e)
+            flash("Error cargando las matrículas de la institución.", "danger")
+            return redirect(url_for("notas_importar"))
+
+        filas, errores = notas.leer_csv(archivo.read(), matriculas)
+        if errores:
+            flash(f"El archivo tiene {len(errores)} error(es); no se guardó nada.", "danger")
+            errores = errores[:notas.ERRORES_MAXIMOS]
+        elif not filas:
+            flash("El archivo no tiene notas.", "warning")
+        else:
+            conn = get_connection()
+            if not conn:
+                flash("Error de conexión con la base de datos.", "danger")
+            else:
+                try:
+                    guardadas = notas.guardar(conn, [
+                        (id_estudiante, id_aula, id_periodo, id_componente, valor)
+                        for id_estudiante, id_aula, valor in filas
+                    ])
+                    flash(f"{guardadas} nota(s) importada(s).", "success")
+                    return redirect(url_for("notas_importar"))
+                except Error as e:
+                    log.error("Error importando notas: %s", e)
+                    flash("Error guardando las notas; no se guardó nada.", "danger")
+                finally:
+                    conn.close()
+
+    instituciones, periodos, componentes = [], [], []
+    try:
+        datos = consultas_paralelas.consultar({
+            "periodos": ("""
+                SELECT id_periodo, nombre_periodo
+                FROM periodo_academico
+                WHERE activo = 1
+                ORDER BY id_periodo
+            """, None),
+            "componentes": ("""
+                SELECT id_componente, nombre_componente, programa
+                FROM componente_nota
+                WHERE activo = 1
+                ORDER BY programa, nombre_componente
+            """, None),
+        })
+        instituciones = repositorio.instituciones_para_combo(solo_activas=True)
+        periodos = datos["periodos"]
+        componentes = datos["componentes"]
+    except Error as e:
+        log.error("Error cargando datos de la importación de notas: %s", e)
+
+    return render_template(
+        "notas_importar.html",
+        instituciones=instituciones,
+        periodos=periodos,
+        componentes=componentes,
+        errores=errores,
     )
 
+def _consultar_horario_tutor(id_tutor):
+    """Consulta en BD las aulas y horarios activos de un tutor (None si falla)."""
+    try:
+        return repositorio.horario_tutor(id_tutor)
+    except Error as e:
+        log.error("Error cargando aulas del tutor: %s", e)
+        return None
+
+
+def _leer_version_horario():
+    """horario_version en BD (ver horario_tutor.py), o None si no se pudo leer."""
+    conn = get_connection()
+    if not conn:
+        return None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version FROM horario_version WHERE id = 1;")
+        fila = cursor.fetchone()
+        return fila[0] if fila else None
+    except Error as e:
+        log.error("Error leyendo versión del horario: %s", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _subir_version_horario(cursor):
+    cursor.execute("UPDATE horario_version SET version = version + 1 WHERE id = 1;")
+
+
+def _horario_en_cache(id_tutor):
+    return horario_tutor.obtener(id_tutor, lambda: _consultar_horario_tutor(id_tutor),
+                                 _leer_version_horario)
+
+
+def _token_ics(id_tutor):
+    return URLSafeSerializer(app.secret_key, salt="horario-ics").dumps(id_tutor)
+
+
 @app.route("/asistencia/mis-clases")
 @role_required("TUTOR", "ADMINISTRATIVO", "ADMINISTRADOR")
 def asistencia_mis_clases():
     """
     Vista donde el TUTOR ve sus aulas asignadas y los horarios.
+    El horario sale de la caché por tutor (ver horario_tutor.py).
     """
+    entrada = _horario_en_cache(session["user_id"])
+    aulas = entrada["filas"] if entrada else []
 
-    aulas = []
+    return render_template(
+        "asistencia_mis_clases.html",
+        aulas=aulas,
+        url_ics=url_for("asistencia_mis_clases_ics",
+                        token=_token_ics(session["user_id"]), _external=True)
+    )
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        try:
-            cursor.execute(
-                """
-                SELECT 
-                    a.id_aula,
-                    a.nombre_aula,
-                    i.nombre_institucion AS institucion,
-                    s.nombre_sede AS sede,
-                    h.dia_semana,
-                    h.hora_inicio,
-                    h.hora_fin
-                FROM tutor_aula_horario tah
-                JOIN aula_programa a ON tah.id_aula = a.id_aula
-                JOIN institucion i   ON a.id_institucion = i.id_institucion
-                JOIN sede s          ON a.id_sede = s.id_sede
-                JOIN horario_aula h  ON tah.id_horario = h.id_horario
-                WHERE tah.id_tutor = %s
-                  AND tah.estado = 'ACTIVO'
-                ORDER BY 
-                    i.nombre_institucion,
-                    s.nombre_sede,
-                    a.nombre_aula,
-                    h.dia_semana,
-                    h.hora_inicio;
-                """,
-                (session["user_id"],)
-            )
-            aulas = cursor.fetchall()
-        except Error as e:
-            print("Error cargando aulas del tutor:", e)
-        finally:
-            cursor.close()
-            conn.close()
 
-    return render_template("asistencia_mis_clases.html", aulas=aulas)
+@app.route("/api/asistencia/mis-clases")
+@role_required("TUTOR", "ADMINISTRATIVO", "ADMINISTRADOR")
+def api_asistencia_mis_clases():
+    """Horario del tutor en JSON, con ETag para que el cliente reuse su copia."""
+    entrada = _horario_en_cache(session["user_id"])
+    if entrada is None:
+        return jsonify({"error": "No hay conexión con la base de datos."}), 503
+
+    resp = jsonify({
+        "generado": entrada["generado"].isoformat(timespec="seconds"),
+        "clases": entrada["filas"],
+    })
+    resp.set_etag(entrada["etag"], weak=True)
+    resp.headers["Cache-Control"] = "private, max-age=60"
+    return resp.make_conditional(request)
+
+
+@app.route("/asistencia/mis-clases/<token>.ics")
+def asistencia_mis_clases_ics(token):
+    """
+    Feed iCalendar del horario del tutor. Los clientes de calendario no
+    tienen sesión, por eso el tutor se identifica con un token firmado.
+    """
+    try:
+        id_tutor = URLSafeSerializer(app.secret_key, salt="horario-ics").loads(token)
+    except BadSignature:
+        abort(404)
+
+    entrada = _horario_en_cache(id_tutor)
+    if entrada is None:
+        return "Error de conexión con la base de datos", 503
+
+    resp = Response(horario_tutor.generar_ics(id_tutor, entrada),
+                    mimetype="text/calendar")
+    resp.set_etag("ics-" + entrada["etag"], weak=True)
+    resp.headers["Cache-Control"] = "private, max-age=300"
+    return resp.make_conditional(request)
 
 @app.route("/asistencia/tomar", methods=["GET", "POST"])
 @role_required("TUTOR", "ADMINISTRATIVO", "ADMINISTRADOR")
@@ -1682,277 +2375,276 @@ def motivos_inasistencia_list():
     return render_template("motivos_inasistencia_list.html", motivos=motivos)
 
 @app.route("/reportes/asistencia-aula")
+@compresion.opciones(nivel_gzip=4, calidad_brotli=4)  # páginas de varios MB: menos CPU por byte
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR")
 def reporte_asistencia_aula():
     registros = []
     conn = get_connection()
     if conn:
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()  # tuplas: iterar_filas arma filas compactas
 
-        f_institucion = request.args.get("f_institucion", "").strip()
-        f_sede = request.args.get("f_sede", "").strip()
-        f_aula = request.args.get("f_aula", "").strip()
-        f_semana_ini = request.args.get("f_semana_ini", "").strip()
-        f_semana_fin = request.args.get("f_semana_fin", "").strip()
-
-        query = """
-            SELECT
-                sp.numero_semana AS semana,
-                ac.fecha_clase,
-                i.nombre_institucion AS institucion,
-                s.nombre_sede AS sede,
-                a.nombre_aula AS aula,
-                ac.es_festivo,
-                ac.se_dicto,
-                ac.horas_dictadas,
-                ac.horas_no_dictadas,
-                m.nombre_motivo AS motivo,
-                ac.fecha_reposicion,
-                CONCAT(pt.nombres, ' ', pt.apellidos) AS tutor
-            FROM asistencia_clase ac
-            JOIN aula_programa a ON ac.id_aula = a.id_aula
-            JOIN institucion i ON a.id_institucion = i.id_institucion
-            LEFT JOIN sede s ON a.id_sede = s.id_sede
-            LEFT JOIN semana_programa sp ON ac.id_semana = sp.id_semana
-            LEFT JOIN motivo_inasistencia m ON ac.id_motivo_no_dictada = m.id_motivo
-            LEFT JOIN persona pt ON ac.id_tutor = pt.id_persona
-            WHERE 1 = 1
-        """
-
-        params = []
-
-        if f_institucion:
-            query += " AND i.nombre_institucion LIKE %s"
-            params.append(f"%{f_institucion}%")
-
-        if f_sede:
-            query += " AND s.nombre_sede LIKE %s"
-            params.append(f"%{f_sede}%")
-
-        if f_aula:
-            query += " AND a.nombre_aula LIKE %s"
-            params.append(f"%{f_aula}%")
-
-        if f_semana_ini and f_semana_fin:
-            query += " AND sp.numero_semana BETWEEN %s AND %s"
-            params.append(f_semana_ini)
-            params.append(f_semana_fin)
-        elif f_semana_ini:
-            query += " AND sp.numero_semana >= %s"
-            params.append(f_semana_ini)
-        elif f_semana_fin:
-            query += " AND sp.numero_semana <= %s"
-            params.append(f_semana_fin)
-
-        query += """
-            ORDER BY sp.numero_semana, ac.fecha_clase, i.nombre_institucion, s.nombre_sede, a.nombre_aula
-        """
-
-        cursor.execute(query, params)
-        registros = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        query, params = consultas.reporte_asistencia_aula(request.args).sql()
+        try:
+            cursor.execute(query, params)
+            registros = streaming.iterar_filas(conn, cursor)
+        except Error as e:
+            log.error("Error cargando reporte de asistencia por aula: %s", e)
+            flash("Error al cargar el reporte de asistencia.", "danger")
+            cursor.close()
+            conn.close()
 
-    return render_template(
+    return streaming.render_listado(
         "reporte_asistencia_aula.html",
         registros=registros
     )
 
 
 @app.route("/reportes/asistencia-estudiante")
+@compresion.opciones(nivel_gzip=4, calidad_brotli=4)  # páginas de varios MB: menos CPU por byte
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR", "TUTOR")
 def reporte_asistencia_estudiante():
     registros = []
     conn = get_connection()
     if conn:
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()
 
-        f_documento = request.args.get("f_documento", "").strip()
-        f_nombre = request.args.get("f_nombre", "").strip()
-        f_institucion = request.args.get("f_institucion", "").strip()
-        f_grado = request.args.get("f_grado", "").strip()
-        f_programa = request.args.get("f_programa", "").strip()
-        f_semana_ini = request.args.get("f_semana_ini", "").strip()
-        f_semana_fin = request.args.get("f_semana_fin", "").strip()
-
-        query = """
-            SELECT
-                sp.numero_semana AS semana,
-                ac.fecha_clase,
-                CONCAT(e.nombres, ' ', e.apellidos) AS estudiante,
-                e.numero_documento AS documento,
-                i.nombre_institucion AS institucion,
-                s.nombre_sede AS sede,
-                a.nombre_aula AS aula,
-                a.programa,
-                ad.estado_asistencia,
-                ad.justificacion AS motivo_inasistencia,
-                ac.fecha_reposicion,
-                CONCAT(pt.nombres, ' ', pt.apellidos) AS tutor
-            FROM asistencia_detalle ad
-            JOIN asistencia_clase ac ON ad.id_clase = ac.id_clase
-            JOIN aula_programa a ON ac.id_aula = a.id_aula
-            JOIN institucion i ON a.id_institucion = i.id_institucion
-            LEFT JOIN sede s ON a.id_sede = s.id_sede
-            JOIN estudiante e ON ad.id_estudiante = e.id_estudiante
-            LEFT JOIN semana_programa sp ON ac.id_semana = sp.id_semana
-            LEFT JOIN persona pt ON ac.id_tutor = pt.id_persona
-            WHERE 1 = 1
-        """
-
-        params = []
-
-        if f_documento:
-            query += " AND e.numero_documento = %s"
-            params.append(f_documento)
-
-        if f_nombre:
-            query += " AND CONCAT(e.nombres, ' ', e.apellidos) LIKE %s"
-            params.append(f"%{f_nombre}%")
-
-        if f_institucion:
-            query += " AND i.nombre_institucion LIKE %s"
-            params.append(f"%{f_institucion}%")
-
-        if f_grado:
-            query += " AND e.grado = %s"
-            params.append(f_grado)
-
-        if f_programa:
-            query += " AND a.programa = %s"
-            params.append(f_programa)
-
-        if f_semana_ini and f_semana_fin:
-            query += " AND sp.numero_semana BETWEEN %s AND %s"
-            params.append(f_semana_ini)
-            params.append(f_semana_fin)
-        elif f_semana_ini:
-            query += " AND sp.numero_semana >= %s"
-            params.append(f_semana_ini)
-        elif f_semana_fin:
-            query += " AND sp.numero_semana <= %s"
-            params.append(f_semana_fin)
-
-        query += """
-            ORDER BY sp.numero_semana, ac.fecha_clase, estudiante
-        """
-
-        cursor.execute(query, params)
-        registros = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        query, params = consultas.reporte_asistencia_estudiante(request.args).sql()
+        try:
+            cursor.execute(query, params)
+            registros = streaming.iterar_filas(conn, cursor)
+        except Error as e:
+            log.error("Error cargando reporte de asistencia por estudiante: %s", e)
+            flash("Error al cargar el reporte de asistencia.", "danger")
+            cursor.close()
+            conn.close()
 
-    return render_template(
+    return streaming.render_listado(
         "reporte_asistencia_estudiante.html",
         registros=registros
     )
 
-from flask import request
-
 @app.route("/reportes/boletin", methods=["GET"])
+@compresion.opciones(nivel_gzip=4, calidad_brotli=4)  # páginas de varios MB: menos CPU por byte
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR", "TUTOR")
 def reporte_boletin():
     boletines = []
     conn = get_connection()
     if conn:
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()
 
-        f_documento = request.args.get("f_documento", "").strip()
-        f_periodo = request.args.get("f_periodo", "").strip()
-        f_institucion = request.args.get("f_institucion", "").strip()
-        f_grado = request.args.get("f_grado", "").strip()
-
-        query = """
-            SELECT
-                e.id_estudiante,
-                e.numero_documento,
-                CONCAT(e.nombres, ' ', e.apellidos) AS estudiante,
-                i.nombre_institucion,
-                a.nombre_aula,
-                e.grado,
-                per.nombre_periodo,
-                asig.nombre_asignatura,
-                n.nota_final
-            FROM nota n
-            JOIN estudiante e ON n.id_estudiante = e.id_estudiante
-            JOIN aula_programa a ON n.id_aula = a.id_aula
-            JOIN institucion i ON a.id_institucion = i.id_institucion
-            JOIN periodo per ON n.id_periodo = per.id_periodo
-            JOIN asignatura asig ON n.id_asignatura = asig.id_asignatura
-            WHERE 1 = 1
-        """
-
-        params = []
-
-        if f_documento:
-            query += " AND e.numero_documento = %s"
-            params.append(f_documento)
-
-        if f_periodo:
-            query += " AND per.id_periodo = %s"
-            params.append(f_periodo)
-
-        if f_institucion:
-            query += " AND i.nombre_institucion LIKE %s"
-            params.append(f"%{f_institucion}%")
-
-        if f_grado:
-            query += " AND e.grado = %s"
-            params.append(f_grado)
-
-        query += """
-            ORDER BY e.apellidos, e.nombres, asig.nombre_asignatura
-        """
+        query, params = consultas.reporte_boletin(request.args).sql()
 
         try:
             cursor.execute(query, params)
-            boletines = cursor.fetchall()
+            boletines = streaming.iterar_filas(conn, cursor)
         except Error as e:
-            print("Error cargando boletín:", e)
-        finally:
+            log.error("Error cargando boletín: %s", e)
             cursor.close()
             conn.close()
 
-    return render_template(
+    return streaming.render_listado(
         "reporte_boletin.html",
         boletines=boletines
     )
 
 @app.route("/reportes/comparativo-programa", methods=["GET"])
+@compresion.opciones(nivel_gzip=4, calidad_brotli=4)  # páginas de varios MB: menos CPU por byte
 @role_required("ADMINISTRATIVO", "ADMINISTRADOR")
 def reporte_comparativo_programa():
     comparativos = []
     conn = get_connection()
     if conn:
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()
         try:
-            cursor.execute("""
-                SELECT 
-                    a.id_aula,
-                    a.nombre_aula,
-                    i.nombre_institucion,
-                    COUNT(DISTINCT e.id_estudiante) AS total_estudiantes
-                FROM aula_programa a
-                LEFT JOIN institucion i ON a.id_institucion = i.id_institucion
-                LEFT JOIN matricula m ON m.id_aula = a.id_aula
-                LEFT JOIN estudiante e ON e.id_estudiante = m.id_estudiante
-                GROUP BY a.id_aula, a.nombre_aula, i.nombre_institucion
-                ORDER BY i.nombre_institucion, a.nombre_aula;
-            """)
-            comparativos = cursor.fetchall()
+            cursor.execute(*consultas.reporte_comparativo_programa().sql())
+            comparativos = streaming.iterar_filas(conn, cursor)
         except Error as e:
-            print("Error cargando comparativo de programa:", e)
-        finally:
+            log.error("Error cargando comparativo de programa: %s", e)
             cursor.close()
             conn.close()
 
-    return render_template(
+    return streaming.render_listado(
         "reporte_comparativo_programa.html",
         comparativos=comparativos
     )
 
 
+# El cálculo recorre todo el detalle del período: se guarda unos minutos
+_riesgo_por_periodo = cache.CacheTTL(600, "riesgo_asistencia")
+
+
+@app.route("/reportes/riesgo-asistencia", methods=["GET"])
+@role_required("ADMINISTRATIVO", "ADMINISTRADOR")
+def reporte_riesgo_asistencia():
+    """
+    Estudiantes en riesgo por inasistencia en un período (ver riesgo.py),
+    ordenados por puntaje dentro de cada institución o de cada tutor.
+    """
+    agrupar = "id_tutor" if request.args.get("agrupar") == "tutor" else "id_institucion"
+    periodos, grupos, estudiantes, tutores = [], {}, {}, {}
+    id_periodo = request.args.get("periodo", type=int)
+
+    conn = get_connection()
+    if not conn:
+        flash("Error de conexión con la base de datos.", "danger")
+        return redirect(url_for("index"))
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*consultas.periodos().sql())
+        periodos = cursor.fetchall()
+        if id_periodo is None:
+            # Por defecto el período en curso, o el último
+            activos = [p for p in periodos if p["activo"]] or periodos[-1:]
+            id_periodo = activos[0]["id_periodo"] if activos else None
+
+        if id_periodo is not None:
+            resultados = _riesgo_por_periodo.get(id_periodo)
+            if resultados is None:
+                resultados, tiempos = riesgo.analizar(conn, id_periodo)
+                log.info("Riesgo de asistencia calculado: %s", tiempos)
+                _riesgo_por_periodo.set(id_periodo, resultados)
+            grupos = riesgo.ranking(resultados, agrupar, limite=50)
+            estudiantes, tutores = riesgo.nombres(
+                conn,
+                {r.id_estudiante for lista in grupos.values() for r in lista},
+                {r.id_tutor for lista in grupos.values() for r in lista if r.id_tutor},
+            )
+    except Error as e:
+        log.error("Error calculando estudiantes en riesgo: %s", e)
+        flash("Error calculando el reporte de riesgo.", "danger")
+    finally:
+        cursor.close()
+        conn.close()
+
+    try:
+        instituciones = {i["id_institucion"]: i["nombre"] for i in repositorio.instituciones_para_combo()}
+    except Error as e:
+        log.error("Error cargando instituciones: %s", e)
+        instituciones = {}
+
+    nombres_grupo = instituciones if agrupar == "id_institucion" else tutores
+    return render_template(
+        "reporte_riesgo_asistencia.html",
+        periodos=periodos,
+        id_periodo=id_periodo,
+        agrupar=agrupar,
+        # Grupos con más estudiantes en riesgo primero
+        grupos=sorted(grupos.items(), key=lambda g: (-len(g[1]), str(nombres_grupo.get(g[0], "")))),
+        nombres_grupo=nombres_grupo,
+        estudiantes=estudiantes,
+        instituciones=instituciones,
+        tutores=tutores,
+        umbral_tasa=riesgo.UMBRAL_TASA,
+        umbral_racha=riesgo.UMBRAL_RACHA,
+        ventana=riesgo.VENTANA_CLASES,
+    )
+
+
+
+# ============================
+# 🔎 BÚSQUEDA / AUTOCOMPLETADO
+# ============================
+
+def _registros_busqueda():
+    """Estudiantes, tutores e instituciones para armar el índice de búsqueda."""
+    conn = get_connection()
+    if not conn:
+        return None
+
+    registros = []
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT e.id_estudiante,
+                   CONCAT(e.apellidos, ', ', e.nombres),
+                   i.nombre,
+                   e.numero_documento
+            FROM estudiante e
+            LEFT JOIN institucion i ON i.id_institucion = e.id_institucion;
+        """)
+        registros += [("estudiante",) + tuple(fila) for fila in cursor]
+
+        cursor.execute("""
+            SELECT id_persona,
+                   CONCAT(apellidos, ', ', nombres),
+                   email,
+                   numero_documento
+            FROM persona
+            WHERE tipo_perfil_contrato = 'TUTOR';
+        """)
+        registros += [("tutor",) + tuple(fila) for fila in cursor]
+
+        cursor.execute("""
+            SELECT id_institucion,
+                   nombre,
+                   CONCAT('DANE ', codigo_dane),
+                   codigo_dane
+            FROM institucion;
+        """)
+        registros += [("institucion",) + tuple(fila) for fila in cursor]
+    except Error as e:
+        log.error("Error cargando índice de búsqueda: %s", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+    return registros
+
+
+@app.route("/api/buscar")
+@login_required
+def api_buscar():
+    """
+    Autocompletado: /api/buscar?q=gom&tipos=estudiante,tutor&limite=10
+    Responde desde el índice en memoria del worker (ver busqueda.py).
+    Solo incluye los tipos cuyo listado puede ver el rol de la sesión.
+    """
+    aut = autorizacion()
+    pedidos = tuple(t for t in request.args.get("tipos", "").split(",")
+                    if t in busqueda.TIPOS) or busqueda.TIPOS
+    tipos = tuple(t for t in pedidos
+                  if aut.permite(session.get("rol"), busqueda.ENDPOINT_POR_TIPO[t]))
+    if not tipos:
+        return jsonify({"error": "No tienes permiso sobre este recurso."}), 403
+
+    q = request.args.get("q", "").strip()
+    limite = max(1, min(request.args.get("limite", 10, type=int), 50))
+
+    resultados = []
+    if len(q) >= 2:
+        resultados = busqueda.obtener_indice(_registros_busqueda).buscar(q, tipos, limite)
+
+    resp = jsonify({"q": q, "resultados": resultados})
+    resp.headers["Cache-Control"] = "private, max-age=30"
+    return resp
+
+
+# ============================
+# 🚀 ARRANQUE EN PRODUCCIÓN
+# ============================
+
+def crear_app():
+    """
+    Entrada de producción (wsgi.py, lanzado por servidor.py).
+    Valida la configuración y precalienta, una sola vez en el proceso
+    maestro, lo que los workers heredan después del fork (ver arranque.py).
+    """
+    if not SECRET_KEY:
+        raise RuntimeError("Falta GE_SECRET_KEY: sin ella cada worker firmaría "
+                           "las sesiones con una clave distinta.")
+    app.config["DEBUG"] = False
+    metricas.limpiar()
+
+    with arranque.medir("precompilar plantillas"):
+        plantillas.precompilar(app)
+    with arranque.medir("cargar permisos y menú"):
+        autorizacion()
+    with arranque.medir("armar índice de búsqueda"):
+        busqueda.obtener_indice(_registros_busqueda)
+    return app
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Servidor de desarrollo (un proceso). En producción: python servidor.py
+    app.run(debug=DEBUG)
@@ -0,0 +1,75 @@
+# arranque.py
+#
+# Ciclo de vida del proceso en producción (ver servidor.py):
+#
+# 1. El proceso maestro importa la app y la precalienta una sola vez
+#    (preload). Todo lo que queda en memoria en ese momento (plantillas
+#    compiladas, índice de búsqueda, permisos) lo comparten los workers
+#    gracias a copy-on-write después del fork.
+# 2. Cada worker, recién creado, corre los ganchos registrados con
+#    @al_iniciar_worker: ahí se crea lo que NO se puede heredar de un
+#    fork (hilos, pools de conexiones, locks que pudieran quedar tomados).
+#
+# También mide cuánto tarda cada paso del arranque en frío, para
+# compararlo con el presupuesto de config.ARRANQUE_PRESUPUESTO_SEGUNDOS.
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+_ganchos_worker = []
+tiempos = []            # [(paso, segundos)] del arranque de este proceso
+_inicio = time.perf_counter()
+
+
+def al_iniciar_worker(f):
+    """Decorador: f() se llama en cada worker justo después del fork."""
+    _ganchos_worker.append(f)
+    return f
+
+
+def iniciar_worker():
+    for gancho in _ganchos_worker:
+        with medir(f"worker {os.getpid()}: {gancho.__module__}.{gancho.__name__}"):
+            gancho()
+
+
+@contextmanager
+def medir(paso):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos.append((paso, time.perf_counter() - t0))
+
+
+def total():
+    """Segundos desde que se importó este módulo (≈ inicio del arranque)."""
+    return time.perf_counter() - _inicio
+
+
+def resumen():
+    lineas = [f"  {paso:<45} {seg * 1000:9.1f} ms" for paso, seg in tiempos]
+    lineas.append(f"  {'total':<45} {total() * 1000:9.1f} ms")
+    return "\n".join(lineas)
+
+
+def verificar_presupuesto(presupuesto, estricto=False):
+    """
+    Imprime el desglose del arranque y lo compara con el presupuesto.
+    Con estricto=True un arranque lento es un error (para CI / despliegues).
+    """
+    transcurrido = total()
+    log.info("Arranque listo en %.0f ms (presupuesto %.0f ms)\n%s",
+             transcurrido * 1000, presupuesto * 1000, resumen(),
+             extra={"arranque_ms": round(transcurrido * 1000, 1)})
+    if transcurrido > presupuesto:
+        mensaje = (f"El arranque en frío tardó {transcurrido:.2f} s, "
+                   f"más que el presupuesto de {presupuesto:.2f} s.")
+        if estricto:
+            raise RuntimeError(mensaje)
+        log.warning(mensaje)
+    return transcurrido
@@ -0,0 +1,202 @@
+# assets.py
+#
+# Archivos estáticos propios (sin CDN), con huella en el nombre y
+# precomprimidos.
+#
+#   python assets.py descargar   -> baja Bootstrap a static/vendor/ (verifica SRI)
+#   python assets.py construir   -> minifica, pone huella y genera .gz / .br
+#                                   en static/dist/ + static/dist/manifest.json
+#
+# En las plantillas se usa asset_url('css/auth.css') en lugar de
+# url_for('static', ...). Si static/dist/ ya está construido, apunta al
+# archivo con huella (p. ej. css/auth.3f9a1c0b2d4e.css), que se sirve con
+# caché "immutable" de un año y en gzip/brotli según Accept-Encoding; si no
+# está construido, cae al archivo normal (o al CDN para Bootstrap).
+
+import base64
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import urllib.request
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli solo se genera .gz
+    brotli = None
+
+from flask import request, send_from_directory, url_for
+
+import compresion
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST = os.path.join(DIST_DIR, "manifest.json")
+
+UN_ANIO = 365 * 24 * 3600
+
+# Archivos de terceros: ruta en static/ -> (url, integridad SRI)
+VENDOR = {
+    "vendor/bootstrap.min.css": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css",
+        "sha384-T3c6CoIi6uLrA9TneNEoa7RxnatzjcDSCmG1MXxSR1GAsXEV/Dwwykc2MPK8M2HN",
+    ),
+    "vendor/bootstrap.bundle.min.js": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js",
+        "sha384-C6RzsynM9kWDrMNeT87bh95OGNyZPhcTNXj1NW7RuBCsyN/o0jlpcV8Qyq46cDfL",
+    ),
+}
+
+# Archivos propios que entran al build
+PROPIOS = ["css/auth.css", "js/buscar.js"]
+
+# Solo vale la pena comprimir texto
+COMPRIMIBLES = (".css", ".js", ".svg", ".json", ".txt", ".map")
+
+
+# ============================
+# 🔧 BUILD
+# ============================
+
+def _sri(contenido):
+    return "sha384-" + base64.b64encode(hashlib.sha384(contenido).digest()).decode()
+
+
+def descargar():
+    for ruta, (url, integridad) in VENDOR.items():
+        destino = os.path.join(STATIC_DIR, ruta)
+        if os.path.exists(destino):
+            print("ya existe:", ruta)
+            continue
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            contenido = resp.read()
+        if _sri(contenido) != integridad:
+            sys.exit(f"La integridad de {url} no coincide; no se guarda.")
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, "wb") as f:
+            f.write(contenido)
+        print("descargado:", ruta)
+
+
+def minificar_css(texto):
+    texto = re.sub(r"/\*.*?\*/", "", texto, flags=re.S)
+    texto = re.sub(r"\s+", " ", texto)
+    texto = re.sub(r"\s*([{};,>])\s*", r"\1", texto)
+    texto = re.sub(r";\s*([\w-]+)\s*:\s*", r";\1:", texto)
+    texto = re.sub(r"{\s*([\w-]+)\s*:\s*", r"{\1:", texto)
+    return texto.replace(";}", "}").strip()
+
+
+def minificar_js(texto):
+    # Conservador: solo comentarios de bloque al inicio de línea, comentarios
+    # de línea completa e indentación. No toca el contenido de las líneas.
+    texto = re.sub(r"^\s*/\*.*?\*/", "", texto, flags=re.S | re.M)
+    lineas = [l.strip() for l in texto.splitlines()]
+    return "\n".join(l for l in lineas if l and not l.startswith("//"))
+
+
+def _con_huella(ruta, contenido):
+    raiz, ext = os.path.splitext(ruta)
+    return f"{raiz}.{hashlib.sha256(contenido).hexdigest()[:12]}{ext}"
+
+
+def construir():
+    manifest = {}
+    for ruta in list(VENDOR) + PROPIOS:
+        origen = os.path.join(STATIC_DIR, ruta)
+        if not os.path.exists(origen):
+            print("falta (se omite):", ruta)
+            continue
+        with open(origen, "rb") as f:
+            contenido = f.read()
+
+        if ruta in PROPIOS and ruta.endswith(".css"):
+            contenido = minificar_css(contenido.decode("utf-8")).encode("utf-8")
+        elif ruta in PROPIOS and ruta.endswith(".js"):
+            contenido = minificar_js(contenido.decode("utf-8")).encode("utf-8")
+
+        destino_rel = _con_huella(ruta, contenido)
+        destino = os.path.join(DIST_DIR, destino_rel)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, "wb") as f:
+            f.write(contenido)
+
+        if ruta.endswith(COMPRIMIBLES):
+            with open(destino + ".gz", "wb") as f:
+                f.write(gzip.compress(contenido, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(destino + ".br", "wb") as f:
+                    f.write(brotli.compress(contenido, quality=11))
+
+        manifest[ruta] = destino_rel
+        print(f"{ruta} -> dist/{destino_rel} ({len(contenido)} bytes)")
+
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+# ============================
+# 🌐 EN LA APP
+# ============================
+
+_manifest = None
+
+
+def _cargar_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(filename):
+    """Como url_for('static', filename=...), pero usando la versión con huella."""
+    construido = _cargar_manifest().get(filename)
+    if construido:
+        return url_for("asset_dist", filename=construido)
+    if filename in VENDOR and not os.path.exists(os.path.join(STATIC_DIR, filename)):
+        return VENDOR[filename][0]
+    return url_for("static", filename=filename)
+
+
+def asset_dist(filename):
+    """Sirve static/dist/ con caché immutable y la variante comprimida si aplica."""
+    tipo = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    # Variantes precomprimidas que existen para este archivo, en orden de preferencia
+    variantes = {nombre: filename + ext for ext, nombre in ((".br", "br"), (".gz", "gzip"))
+                 if os.path.exists(os.path.join(DIST_DIR, filename + ext))}
+    codificacion = compresion._codificacion_aceptada(
+        request.headers.get("Accept-Encoding"), tuple(variantes))
+    archivo = variantes[codificacion] if codificacion else filename
+
+    resp = send_from_directory(DIST_DIR, archivo, mimetype=tipo, max_age=UN_ANIO)
+    if codificacion:
+        resp.headers["Content-Encoding"] = codificacion
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = f"public, max-age={UN_ANIO}, immutable"
+    return resp
+
+
+def registrar(app):
+    # Regla más específica que /static/<path:filename>, así que gana
+    app.add_url_rule("/static/dist/<path:filename>", "asset_dist", asset_dist)
+    app.jinja_env.globals["asset_url"] = asset_url
+
+
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else "construir"
+    if comando == "descargar":
+        descargar()
+    elif comando == "construir":
+        construir()
+    else:
+        sys.exit("Uso: python assets.py [descargar|construir]")
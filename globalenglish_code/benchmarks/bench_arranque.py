@@ -0,0 +1,59 @@
+# benchmarks/bench_arranque.py
+#
+# Mide el arranque en frío: importar wsgi.py (app + precalentamiento) en
+# un proceso Python nuevo, varias veces, y lo compara con el presupuesto.
+# Uso (desde globalenglish_code/):
+#     python benchmarks/bench_arranque.py            # 5 arranques
+#     python benchmarks/bench_arranque.py 10
+#
+# Sale con código 1 si la mediana supera ARRANQUE_PRESUPUESTO_SEGUNDOS,
+# así puede correr en CI. La primera corrida suele ser más lenta porque
+# todavía no existe el bytecode de las plantillas en disco.
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import config  # noqa: E402
+
+
+def arrancar():
+    entorno = dict(os.environ)
+    entorno.setdefault("GE_SECRET_KEY", "clave-de-benchmark")
+    entorno["GE_LOG_NIVEL"] = "WARNING"     # el desglose se imprime abajo, no como log JSON
+    inicio = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", "import wsgi, arranque; print(arranque.resumen())"],
+                          cwd=BASE_DIR, env=entorno,
+                          capture_output=True, text=True)
+    transcurrido = time.perf_counter() - inicio
+    if proc.returncode != 0:
+        sys.exit(f"El arranque falló:\n{proc.stderr}")
+    return transcurrido, proc.stdout
+
+
+def main(veces):
+    tiempos = []
+    salida = ""
+    for i in range(veces):
+        transcurrido, salida = arrancar()
+        tiempos.append(transcurrido)
+        print(f"arranque {i + 1}: {transcurrido * 1000:.0f} ms")
+
+    mediana = statistics.median(tiempos)
+    presupuesto = config.ARRANQUE_PRESUPUESTO_SEGUNDOS
+    print(f"\nmediana {mediana * 1000:.0f} ms   máx {max(tiempos) * 1000:.0f} ms   "
+          f"presupuesto {presupuesto * 1000:.0f} ms")
+    print("\nDesglose del último arranque:\n" + salida)
+    if mediana > presupuesto:
+        print("FALLA: la mediana supera el presupuesto de arranque.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
@@ -0,0 +1,65 @@
+# benchmarks/bench_consultas_paralelas.py
+#
+# Compara cargar N consultas independientes una tras otra en la misma
+# conexión contra consultas_paralelas.consultar() con el pool.
+# Cada consulta es un SELECT SLEEP(x) para simular su latencia; se
+# espera que en paralelo el tiempo se acerque a la más lenta y no a la suma.
+# Uso (desde globalenglish_code/, con la BD de config.py accesible):
+#     python benchmarks/bench_consultas_paralelas.py
+#     python benchmarks/bench_consultas_paralelas.py 0.02 0.05 0.03
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector  # noqa: E402
+
+import consultas_paralelas  # noqa: E402
+from config import DB_CONFIG  # noqa: E402
+
+REPETICIONES = 10
+
+
+def en_serie(latencias):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        for segundos in latencias:
+            cursor.execute("SELECT SLEEP(%s) AS s;", (segundos,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def en_paralelo(latencias):
+    consultas_paralelas.consultar({
+        f"q{i}": ("SELECT SLEEP(%s) AS s;", (segundos,))
+        for i, segundos in enumerate(latencias)
+    })
+
+
+def medir(funcion, latencias):
+    funcion(latencias)  # calienta conexiones / pool
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion(latencias)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main(latencias):
+    print(f"consultas: {latencias}   suma {sum(latencias) * 1000:.0f} ms   "
+          f"más lenta {max(latencias) * 1000:.0f} ms")
+    serie = medir(en_serie, latencias)
+    paralelo = medir(en_paralelo, latencias)
+    print(f"{'en serie (1 conexión)':<26} {serie * 1000:8.1f} ms")
+    print(f"{'en paralelo (pool)':<26} {paralelo * 1000:8.1f} ms   ({serie / paralelo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main([float(x) for x in sys.argv[1:]] or [0.03, 0.05, 0.02])
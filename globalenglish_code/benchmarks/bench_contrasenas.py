@@ -0,0 +1,59 @@
+# benchmarks/bench_contrasenas.py
+#
+# Mide cuántos logins por segundo por núcleo soporta la política de hash.
+# Uso (desde globalenglish_code/):
+#     python benchmarks/bench_contrasenas.py
+#     python benchmarks/bench_contrasenas.py "pbkdf2:sha256:600000" "scrypt:16384:8:1"
+#
+# Para cada método:
+#   - 1 hilo: verificaciones/seg en un núcleo (la cifra que importa para
+#     dimensionar los workers).
+#   - pool: las mismas verificaciones a través de contrasenas.verificar(),
+#     con PASSWORD_VERIFICADORES hilos, para ver cuánto escala en la máquina.
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash, check_password_hash  # noqa: E402
+
+import config  # noqa: E402
+import contrasenas  # noqa: E402
+
+PASSWORD = "Clave-de-prueba-2025"
+SEGUNDOS = 3.0
+
+
+def medir_un_hilo(password_hash):
+    n = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < SEGUNDOS:
+        check_password_hash(password_hash, PASSWORD)
+        n += 1
+    return n / (time.perf_counter() - inicio)
+
+
+def medir_pool(password_hash, total):
+    clientes = config.PASSWORD_VERIFICADORES * 4
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as ex:
+        list(ex.map(lambda _: contrasenas.verificar(password_hash, PASSWORD), range(total)))
+    return total / (time.perf_counter() - inicio)
+
+
+def main(metodos):
+    nucleos = os.cpu_count() or 1
+    print(f"Núcleos: {nucleos}   verificadores en pool: {config.PASSWORD_VERIFICADORES}")
+    print(f"{'método':<24} {'ms/login':>9} {'logins/s/núcleo':>16} {'logins/s pool':>14}")
+    for metodo in metodos:
+        password_hash = generate_password_hash(PASSWORD, method=metodo)
+        por_nucleo = medir_un_hilo(password_hash)
+        en_pool = medir_pool(password_hash, total=max(8, int(por_nucleo * SEGUNDOS)))
+        print(f"{metodo:<24} {1000 / por_nucleo:>9.1f} {por_nucleo:>16.1f} {en_pool:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or [config.PASSWORD_HASH_METODO])
@@ -0,0 +1,148 @@
+# benchmarks/bench_filas.py
+#
+# Memoria por cada 100 000 filas de los reportes de asistencia: filas
+# como dict (cursor(dictionary=True), lo de antes) contra filas compactas
+# de filas.py (cursor de tuplas + filas.Resultado). Mide lo que queda
+# retenido con la lista completa en memoria (tracemalloc), que es el caso
+# de render_listado con GE_RENDER_EN_STREAMING=0.
+#
+# Uso (desde globalenglish_code/):
+#     python benchmarks/fixture.py 25                 # una vez, escala con bastantes filas
+#     python benchmarks/bench_filas.py                # hasta 100 000 filas por reporte
+#     python benchmarks/bench_filas.py --sintetico    # sin BD: filas generadas con
+#                                                     # las mismas columnas
+
+import argparse
+import datetime
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import consultas  # noqa: E402
+import filas  # noqa: E402
+
+FILAS = 100_000
+REPORTES = {
+    "asistencia-aula": consultas.reporte_asistencia_aula,
+    "asistencia-estudiante": consultas.reporte_asistencia_estudiante,
+}
+
+
+class _SinFiltros(dict):
+    def get(self, clave, defecto=None, type=None):
+        return defecto
+
+
+def medir(construir):
+    """(filas, bytes retenidos con la lista viva)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        lista = construir()
+        retenidos, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    n = len(lista)
+    del lista
+    return n, retenidos
+
+
+# ============================
+# 🗄️ CONTRA LA BD DE PRUEBA
+# ============================
+
+def variantes_bd(conn, consulta, limite):
+    sql, params = consulta.sql(limite=limite)
+
+    def como_dict():
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, params)
+        try:
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def compactas():
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        try:
+            return filas.todas(cursor)
+        finally:
+            cursor.close()
+
+    return como_dict, compactas
+
+
+# ============================
+# 🧪 SINTÉTICO
+# ============================
+
+def _valor(columna, i):
+    # Objetos nuevos por fila, como los que entrega el conector
+    if columna.startswith("id_") or columna in ("semana", "es_festivo", "se_dicto"):
+        return i % 5000 + 1
+    if columna.startswith("fecha"):
+        return datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 300)
+    if columna.startswith("horas"):
+        return float(i % 3)
+    return f"{columna} {i % 997:03d}"
+
+
+def variantes_sinteticas(consulta, limite):
+    columnas = tuple(consulta.nombres_campos)
+
+    def tuplas():
+        return [tuple(_valor(c, i) for c in columnas) for i in range(limite)]
+
+    def como_dict():
+        return [dict(zip(columnas, t)) for t in tuplas()]
+
+    def compactas():
+        return filas.Resultado(columnas, tuplas())
+
+    return como_dict, compactas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=FILAS)
+    parser.add_argument("--sintetico", action="store_true")
+    args = parser.parse_args()
+
+    conn = None
+    if not args.sintetico:
+        import fixture
+        import mysql.connector
+        from config import DB_CONFIG
+        fixture.usar()
+        conn = mysql.connector.connect(**DB_CONFIG)
+
+    print(f"por cada {FILAS:,} filas (lista completa en memoria)")
+    print(f"{'reporte':<24} {'variante':<10} {'MB':>8}")
+    try:
+        for nombre, crear_consulta in REPORTES.items():
+            consulta = crear_consulta(_SinFiltros())
+            if conn is None:
+                variantes = variantes_sinteticas(consulta, args.filas)
+            else:
+                variantes = variantes_bd(conn, consulta, args.filas)
+            base = None
+            for etiqueta, construir in zip(("dict", "compactas"), variantes):
+                n, retenidos = medir(construir)
+                if not n:
+                    print(f"{nombre:<24} sin filas (¿corriste fixture.py?)")
+                    break
+                mb = retenidos / n * FILAS / 2 ** 20
+                ahorro = "" if base is None else f"   (ahorro {(base - mb) / base:+.0%} vs dict)"
+                base = base or mb
+                print(f"{nombre:<24} {etiqueta:<10} {mb:8.1f}{ahorro}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_repositorio.py
+#
+# Mide cuánto ahorra la caché de sentencias preparadas de repositorio.py
+# en las consultas calientes (login, horario del tutor, lista de un aula),
+# contra la BD de prueba de fixture.py. Para cada consulta compara:
+#   texto        cursor normal (protocolo de texto: MySQL analiza el SQL cada vez)
+#   preparada    cursor preparado nuevo en cada llamada (prepara + ejecuta + cierra)
+#   repositorio  la función de repositorio.py (preparada una vez por conexión del pool)
+# y muestra los contadores del servidor Com_stmt_prepare / Com_stmt_execute
+# de cada variante, para confirmar que la tercera no vuelve a preparar.
+#
+# Uso (desde globalenglish_code/):
+#     python benchmarks/fixture.py                  # una vez
+#     python benchmarks/bench_repositorio.py        # 500 llamadas por variante
+#     python benchmarks/bench_repositorio.py 2000
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixture  # noqa: E402
+
+fixture.usar()
+
+import mysql.connector  # noqa: E402
+
+import repositorio  # noqa: E402
+from config import DB_CONFIG  # noqa: E402
+
+
+def _contadores(cursor):
+    cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN ('Com_stmt_prepare', 'Com_stmt_execute')")
+    return {nombre: int(valor) for nombre, valor in cursor.fetchall()}
+
+
+def con_texto(conn, sql, params):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(sql, params)
+    cursor.fetchall()
+    cursor.close()
+
+
+def con_preparada(conn, sql, params):
+    cursor = conn.cursor(prepared=True)
+    cursor.execute(sql, params)
+    cursor.fetchall()
+    cursor.close()
+
+
+def medir(funcion, veces):
+    funcion()   # calienta (y en el repositorio, prepara)
+    tiempos = []
+    for _ in range(veces):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos) * 1e6
+
+
+def main(veces):
+    casos = [
+        ("login", repositorio.SQL_USUARIO_LOGIN, repositorio.usuario_para_login,
+         (fixture.usuario("TUTOR"),)),
+        ("horario del tutor", repositorio.SQL_HORARIO_TUTOR, repositorio.horario_tutor,
+         (fixture.id_usuario("TUTOR"),)),
+        ("lista del aula", repositorio.SQL_ESTUDIANTES_AULA, repositorio.estudiantes_de_aula,
+         (fixture.primer_id("aula_programa", "id_aula"),)),
+    ]
+    conn = mysql.connector.connect(**DB_CONFIG)
+    conn_estado = mysql.connector.connect(**DB_CONFIG)
+    estado = conn_estado.cursor()
+    print(f"{veces} llamadas por variante; mediana por llamada")
+    print(f"{'consulta':<20} {'variante':<12} {'µs':>9} {'prepare':>8} {'execute':>8}")
+    try:
+        for nombre, sql, funcion, params in casos:
+            variantes = [
+                ("texto", lambda: con_texto(conn, sql, params)),
+                ("preparada", lambda: con_preparada(conn, sql, params)),
+                ("repositorio", lambda: funcion(*params)),
+            ]
+            base = None
+            for variante, f in variantes:
+                antes = _contadores(estado)
+                us = medir(f, veces)
+                despues = _contadores(estado)
+                ahorro = "" if base is None else f"   (ahorro {(base - us) / base:+.0%} vs texto)"
+                base = base or us
+                print(f"{nombre:<20} {variante:<12} {us:9.0f} "
+                      f"{despues['Com_stmt_prepare'] - antes['Com_stmt_prepare']:8d} "
+                      f"{despues['Com_stmt_execute'] - antes['Com_stmt_execute']:8d}{ahorro}")
+    finally:
+        estado.close()
+        conn_estado.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
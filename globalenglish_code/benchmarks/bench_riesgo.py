@@ -0,0 +1,85 @@
+# benchmarks/bench_riesgo.py
+#
+# Tiempo de riesgo.calcular() sobre un detalle de asistencia sintético de
+# millones de filas (sin BD), con numpy y con el recorrido en Python, y
+# comprobación de que los dos dan lo mismo. Un 5 % de los estudiantes
+# "se van": su probabilidad de faltar sube a lo largo del período.
+#
+# Uso (desde globalenglish_code/):
+#     python benchmarks/bench_riesgo.py                  # 2 000 000 filas
+#     python benchmarks/bench_riesgo.py 5000000 --sin-python
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import riesgo  # noqa: E402
+
+CLASES_POR_ESTUDIANTE = 60
+SEMILLA = 20251
+
+
+def sintetico(filas):
+    rng = random.Random(SEMILLA)
+    columnas = riesgo.Columnas()
+    estudiantes = max(1, filas // CLASES_POR_ESTUDIANTE)
+    lote = []
+    for e in range(1, estudiantes + 1):
+        base = rng.uniform(0.02, 0.2)
+        deriva = rng.uniform(0.3, 0.7) if rng.random() < 0.05 else 0.0
+        institucion, tutor = e % 40 + 1, e % 300 + 1
+        for k in range(CLASES_POR_ESTUDIANTE):
+            p = base + deriva * k / CLASES_POR_ESTUDIANTE
+            lote.append((e, 739000 + k * 3, int(rng.random() < p), institucion, tutor))
+        if len(lote) >= riesgo.LOTE_LECTURA:
+            columnas.agregar(lote)
+            lote = []
+    if lote:
+        columnas.agregar(lote)
+    # Desordenadas, como llegan sin ORDER BY
+    orden = list(range(len(columnas)))
+    rng.shuffle(orden)
+    desordenadas = riesgo.Columnas()
+    for nombre in riesgo.Columnas.__slots__:
+        original = getattr(columnas, nombre)
+        getattr(desordenadas, nombre).extend(original[i] for i in orden)
+    return desordenadas
+
+
+def medir(columnas, usar_numpy):
+    t0 = time.perf_counter()
+    resultados = riesgo.calcular(columnas, usar_numpy=usar_numpy)
+    return resultados, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filas", nargs="?", type=int, default=2_000_000)
+    parser.add_argument("--sin-python", action="store_true", help="no medir el recorrido en Python")
+    args = parser.parse_args()
+
+    columnas = sintetico(args.filas)
+    print(f"{len(columnas):,} filas de detalle")
+    medidos = {}
+    if riesgo.np is not None:
+        medidos["numpy"] = medir(columnas, True)
+    else:
+        print("numpy no está instalado: solo se mide el recorrido en Python")
+    if not args.sin_python or riesgo.np is None:
+        medidos["python"] = medir(columnas, False)
+
+    for nombre, (resultados, segundos) in medidos.items():
+        en_riesgo = sum(r.en_riesgo for r in resultados)
+        print(f"{nombre:<8} {segundos:7.2f} s   {len(resultados):,} estudiantes, {en_riesgo:,} en riesgo")
+    if len(medidos) == 2 and medidos["numpy"][0] != medidos["python"][0]:
+        print("¡numpy y Python no coinciden!")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+# benchmarks/bench_rutas.py
+#
+# Microbenchmark de cada ruta de app.py (listados, formularios, reportes,
+# login, API) con el cliente de pruebas de Flask, contra la BD de prueba
+# de fixture.py. Por ruta mide latencia (p50/p95/p99), consultas SQL por
+# petición y memoria asignada por petición (pico de tracemalloc), y lo
+# compara con la línea base guardada en el repo (LINEA_BASE).
+#
+# Uso (desde globalenglish_code/):
+#     python benchmarks/fixture.py                 # una vez: crea la BD de prueba
+#     python benchmarks/bench_rutas.py             # compara; sale con 1 si algo empeoró
+#     python benchmarks/bench_rutas.py --guardar   # reescribe la línea base (subirla al repo)
+#     python benchmarks/bench_rutas.py -k reporte  # solo las rutas que contienen "reporte"
+#
+# Una ruta empeora si su p50 o p95 supera la base en más de --umbral
+# (25 % por defecto, y al menos HOLGURA_MS), si hace más consultas SQL, o
+# si asigna más de --umbral de memoria. Las latencias dependen de la
+# máquina: la base se guarda y se compara en la misma.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixture  # noqa: E402  (también agrega globalenglish_code/ al path)
+
+fixture.usar()
+os.environ.setdefault("GE_SECRET_KEY", "clave-de-benchmark")
+os.environ["GE_LOG_NIVEL"] = "WARNING"
+
+import api  # noqa: E402
+import app as aplicacion  # noqa: E402
+import metricas  # noqa: E402
+from flask import url_for  # noqa: E402
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "lineas_base", "rutas.json")
+CALENTAR = 3
+HOLGURA_MS = 2.0
+HOLGURA_KB = 64
+
+# Rutas que cambian datos al pedirlas por GET o que necesitan un archivo
+OMITIR = {"static", "logout", "toggle_aula", "deshabilitar_aula", "habilitar_aula",
+          "admin_perfil_descargar"}
+
+# Variantes con filtros, además de la ruta sin parámetros
+VARIANTES = {
+    "estudiantes_list": ["f_institucion={id_institucion}", "orden=documento&dir=desc"],
+    "reporte_asistencia_aula": ["f_institucion={id_institucion}"],
+    "reporte_asistencia_estudiante": ["f_institucion={id_institucion}"],
+    "reporte_boletin": ["f_institucion={id_institucion}"],
+    "api_buscar": ["q=ma", "q=gomez&tipos=estudiante"],
+}
+
+
+def _rol(endpoint):
+    # El horario y la toma de asistencia son páginas del tutor
+    return "TUTOR" if "asistencia" in endpoint and "reporte" not in endpoint else "ADMINISTRADOR"
+
+
+def casos():
+    """[(nombre, rol o None, método, url, datos)] para todas las rutas GET de la app."""
+    ids = {
+        "id_institucion": fixture.primer_id("institucion", "id_institucion"),
+        "id_ied": fixture.primer_id("institucion", "id_institucion"),
+        "id_aula": fixture.primer_id("aula_programa", "id_aula"),
+        "id_sede": fixture.primer_id("sede", "id_sede"),
+        "token": aplicacion._token_ics(fixture.id_usuario("TUTOR")),
+    }
+    lista = [("login (POST)", None, "POST", "/login",
+              {"email": fixture.usuario("ADMINISTRADOR"), "password": fixture.CLAVE})]
+    reglas = sorted(aplicacion.app.url_map.iter_rules(), key=lambda r: r.endpoint)
+    for regla in reglas:
+        if regla.endpoint in OMITIR or "GET" not in regla.methods:
+            continue
+        if "recurso" in regla.arguments:
+            for recurso in api.RECURSOS:
+                lista.append((f"api_v1:{recurso}", "ADMINISTRADOR", "GET",
+                              f"/api/{api.VERSION}/{recurso}", None))
+            continue
+        with aplicacion.app.test_request_context():
+            url = url_for(regla.endpoint, **{a: ids[a] for a in regla.arguments})
+        rol = None if regla.endpoint in ("login", "register", "asistencia_mis_clases_ics") \
+            else _rol(regla.endpoint)
+        lista.append((regla.endpoint, rol, "GET", url, None))
+        for variante in VARIANTES.get(regla.endpoint, []):
+            consulta = variante.format(**ids)
+            lista.append((f"{regla.endpoint}?{consulta}", rol, "GET", f"{url}?{consulta}", None))
+    return lista
+
+
+def _cliente(rol):
+    cliente = aplicacion.app.test_client()
+    if rol:
+        resp = cliente.post("/login", data={"email": fixture.usuario(rol), "password": fixture.CLAVE})
+        if resp.status_code != 302:
+            sys.exit(f"No se pudo iniciar sesión como {rol} (¿se corrió fixture.py?).")
+    return cliente
+
+
+def _pedir(cliente, metodo, url, datos):
+    resp = cliente.open(url, method=metodo, data=datos)
+    resp.get_data()   # los reportes en streaming se generan al leer el cuerpo
+    resp.close()
+    return resp
+
+
+def _percentil(valores, p):
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def medir(cliente, metodo, url, datos, repeticiones):
+    for _ in range(CALENTAR):
+        _pedir(cliente, metodo, url, datos)
+
+    tiempos, consultas = [], []
+    for _ in range(repeticiones):
+        antes = metricas.valor("ge_sql_consultas_total")
+        t0 = time.perf_counter()
+        resp = _pedir(cliente, metodo, url, datos)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+        consultas.append(metricas.valor("ge_sql_consultas_total") - antes)
+
+    # La memoria se mide aparte: tracemalloc frena bastante la petición
+    tracemalloc.start()
+    _pedir(cliente, metodo, url, datos)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(_percentil(tiempos, 50), 2),
+        "p95_ms": round(_percentil(tiempos, 95), 2),
+        "p99_ms": round(_percentil(tiempos, 99), 2),
+        # Mediana: la relectura periódica de permisos suma una consulta a veces
+        "consultas": statistics.median_low(consultas),
+        "memoria_kb": round(pico / 1024, 1),
+        "estado": resp.status_code,
+        "redirige": resp.headers.get("Location"),
+    }
+
+
+def regresiones(actual, base, umbral):
+    """Motivos por los que `actual` es peor que `base` (lista vacía si no)."""
+    motivos = []
+    for clave in ("p50_ms", "p95_ms"):
+        limite = max(base[clave] * (1 + umbral), base[clave] + HOLGURA_MS)
+        if actual[clave] > limite:
+            motivos.append(f"{clave} {base[clave]} -> {actual[clave]}")
+    if actual["consultas"] > base["consultas"]:
+        motivos.append(f"consultas {base['consultas']} -> {actual['consultas']}")
+    limite = max(base["memoria_kb"] * (1 + umbral), base["memoria_kb"] + HOLGURA_KB)
+    if actual["memoria_kb"] > limite:
+        motivos.append(f"memoria {base['memoria_kb']} -> {actual['memoria_kb']} KB")
+    if actual["estado"] != base["estado"]:
+        motivos.append(f"estado {base['estado']} -> {actual['estado']}")
+    return motivos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por ruta contra la BD de prueba.")
+    parser.add_argument("--repeticiones", type=int, default=30, help="mínimo 2")
+    parser.add_argument("--umbral", type=float, default=float(os.environ.get("GE_BENCH_UMBRAL", 0.25)))
+    parser.add_argument("--guardar", action="store_true", help="reescribe la línea base")
+    parser.add_argument("-k", dest="filtro", default="", help="solo rutas que contienen este texto")
+    args = parser.parse_args()
+
+    base = {}
+    if os.path.exists(LINEA_BASE):
+        with open(LINEA_BASE, encoding="utf-8") as f:
+            base = json.load(f)["rutas"]
+    elif not args.guardar:
+        print(f"Sin línea base en {LINEA_BASE}: solo se reportan los tiempos "
+              "(correr con --guardar para crearla).")
+
+    clientes = {}
+    resultados, fallas = {}, []
+    print(f"{'ruta':<52} {'p50':>8} {'p95':>8} {'p99':>8} {'sql':>4} {'KB':>8}  estado")
+    for nombre, rol, metodo, url, datos in casos():
+        if args.filtro not in nombre:
+            continue
+        if rol not in clientes:
+            clientes[rol] = _cliente(rol)
+        r = medir(clientes[rol], metodo, url, datos, args.repeticiones)
+        resultados[nombre] = r
+
+        problemas = []
+        if r["estado"] >= 500:
+            problemas.append(f"error {r['estado']}")
+        elif r["redirige"] and "/login" in r["redirige"] and rol:
+            problemas.append("redirige al login")
+        if nombre in base and not args.guardar:
+            problemas += regresiones(r, base[nombre], args.umbral)
+        if problemas:
+            fallas.append((nombre, problemas))
+        print(f"{nombre[:52]:<52} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} "
+              f"{r['consultas']:4d} {r['memoria_kb']:8.0f}  {r['estado']}"
+              + ("   <-- " + "; ".join(problemas) if problemas else ""))
+
+    if args.guardar:
+        if args.filtro:
+            resultados = dict(base, **resultados)
+        os.makedirs(os.path.dirname(LINEA_BASE), exist_ok=True)
+        with open(LINEA_BASE, "w", encoding="utf-8") as f:
+            json.dump({
+                "maquina": platform.node(),
+                "python": platform.python_version(),
+                "repeticiones": args.repeticiones,
+                "rutas": resultados,
+            }, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nLínea base guardada en {LINEA_BASE}")
+    else:
+        nuevas = sorted(set(resultados) - set(base)) if base else []
+        if nuevas:
+            print(f"\nRutas sin línea base: {', '.join(nuevas)}")
+
+    if fallas:
+        print(f"\nFALLA: {len(fallas)} ruta(s) con problemas:")
+        for nombre, problemas in fallas:
+            print(f"  {nombre}: {'; '.join(problemas)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# benchmarks/carga.py
+#
+# Prueba de carga y de resistencia (soak) contra una instancia corriendo
+# en local (python servidor.py) con la BD de prueba de fixture.py.
+#
+# Cada usuario virtual es un hilo con su propia sesión que repite
+# recorridos típicos de su rol, con pausas entre pasos:
+#   - tutores (la mayoría): login, mis clases, su horario en JSON, tomar
+#     asistencia (ver y enviar) y notas;
+#   - coordinadores (ADMINISTRATIVO): login, aulas, estudiantes y reportes;
+#   - administradores: login, catálogos y la API.
+# Al final reporta por paso: peticiones, peticiones/s, p50/p95/p99 y
+# porcentaje de error, y sale con 1 si algún paso incumple su SLO.
+#
+# Con --soak además lee /metrics cada --muestreo segundos y, al terminar,
+# revisa que no queden conexiones abiertas ni prestadas del pool y que la
+# memoria de ningún worker siga creciendo (pendiente por mínimos cuadrados
+# en la segunda mitad de la prueba, ya caliente).
+#
+# Uso (desde globalenglish_code/, con el servidor apuntando a la BD de prueba):
+#     GE_DB_NAME=globalenglish_bench python servidor.py &
+#     python benchmarks/carga.py --usuarios 200 --duracion 300
+#     python benchmarks/carga.py --usuarios 50 --duracion 3600 --soak
+#
+# /metrics responde sin token a la misma máquina; si el servidor tiene
+# GE_METRICAS_TOKEN, exportarlo también aquí.
+
+import argparse
+import http.cookiejar
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixture  # noqa: E402
+
+PAUSA_SEGUNDOS = 1.0        # pausa media entre pasos de un usuario
+TIEMPO_ESPERA = 30          # timeout por petición
+
+# SLO por paso: p95 en ms (los que no están usan SLO_P95_DEFECTO)
+SLO_P95_MS = {
+    "login": 1500,
+    "mis_clases": 500,
+    "mis_clases_json": 300,
+    "tomar_asistencia": 500,
+    "enviar_asistencia": 800,
+}
+SLO_P95_DEFECTO = 2000
+SLO_ERRORES = 0.01
+
+
+# ============================
+# 🧭 RECORRIDOS
+# ============================
+# (nombre, método, ruta, datos). El login se antepone en cada recorrido.
+
+RECORRIDOS = {
+    "TUTOR": (0.75, [
+        ("mis_clases", "GET", "/asistencia/mis-clases", None),
+        ("mis_clases_json", "GET", "/api/asistencia/mis-clases", None),
+        ("tomar_asistencia", "GET", "/asistencia/tomar", None),
+        ("enviar_asistencia", "POST", "/asistencia/tomar", {"presentes": "1"}),
+        ("notas", "GET", "/notas", None),
+    ]),
+    "ADMINISTRATIVO": (0.20, [
+        ("aulas", "GET", "/aulas", None),
+        ("estudiantes", "GET", "/estudiantes", None),
+        ("reporte_asistencia_aula", "GET", "/reportes/asistencia-aula", None),
+        ("reporte_boletin", "GET", "/reportes/boletin", None),
+        ("reporte_comparativo", "GET", "/reportes/comparativo-programa", None),
+    ]),
+    "ADMINISTRADOR": (0.05, [
+        ("instituciones", "GET", "/instituciones", None),
+        ("semanas", "GET", "/admin/semanas", None),
+        ("periodos", "GET", "/periodos", None),
+        ("api_estudiantes", "GET", "/api/v1/estudiantes?limite=500", None),
+    ]),
+}
+
+
+class _SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    """Se mide cada respuesta tal cual: un 302 es una respuesta, no un salto."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Estadisticas:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tiempos = {}       # paso -> [ms]
+        self.errores = {}       # paso -> n
+        self.inicio = time.monotonic()
+
+    def registrar(self, paso, ms, error):
+        with self._lock:
+            self.tiempos.setdefault(paso, []).append(ms)
+            if error:
+                self.errores[paso] = self.errores.get(paso, 0) + 1
+
+
+class UsuarioVirtual(threading.Thread):
+
+    def __init__(self, base, rol, cuenta, stats, fin, pausa):
+        super().__init__(daemon=True)
+        self.base, self.rol, self.cuenta = base, rol, cuenta
+        self.stats, self.fin, self.pausa = stats, fin, pausa
+        self.rng = random.Random()
+
+    def _pedir(self, opener, paso, metodo, ruta, datos):
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos else None
+        req = urllib.request.Request(self.base + ruta, data=cuerpo, method=metodo)
+        t0 = time.perf_counter()
+        try:
+            with opener.open(req, timeout=TIEMPO_ESPERA) as resp:
+                resp.read()
+                estado, destino = resp.status, None
+        except urllib.error.HTTPError as e:
+            e.read()
+            estado, destino = e.code, e.headers.get("Location")
+        except (urllib.error.URLError, OSError):
+            estado, destino = 599, None
+        ms = (time.perf_counter() - t0) * 1000
+        if paso == "login":
+            # Un login correcto redirige fuera de /login
+            fallido = destino is None or "/login" in destino
+        else:
+            # Un salto al login a media sesión también es un error
+            fallido = destino is not None and "/login" in destino
+        self.stats.registrar(paso, ms, estado >= 500 or fallido)
+        return estado, destino
+
+    def run(self):
+        while not self.fin.is_set():
+            opener = urllib.request.build_opener(
+                urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+                _SinRedirecciones)
+            _, destino = self._pedir(opener, "login", "POST", "/login", {
+                "email": fixture.usuario(self.rol, self.cuenta), "password": fixture.CLAVE})
+            if destino is None or "/login" in destino:
+                self.fin.wait(self.pausa)
+                continue
+            for paso, metodo, ruta, datos in RECORRIDOS[self.rol][1]:
+                if self.fin.wait(self.rng.expovariate(1 / self.pausa) if self.pausa else 0):
+                    return
+                self._pedir(opener, paso, metodo, ruta, datos)
+
+
+# ============================
+# 📈 SOAK: /metrics
+# ============================
+
+_LINEA = re.compile(r'^(\w+)(?:\{([^}]*)\})? (\S+)$')
+
+
+def leer_metricas(base):
+    """{nombre: {labels como tupla: valor}} desde /metrics."""
+    req = urllib.request.Request(base + "/metrics")
+    token = os.environ.get("GE_METRICAS_TOKEN")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    with urllib.request.urlopen(req, timeout=TIEMPO_ESPERA) as resp:
+        texto = resp.read().decode("utf-8")
+    series = {}
+    for linea in texto.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            labels = tuple(re.findall(r'(\w+)="([^"]*)"', m.group(2) or ""))
+            series.setdefault(m.group(1), {})[labels] = float(m.group(3))
+    return series
+
+
+def _pendiente(puntos):
+    """Pendiente por mínimos cuadrados de [(t, y)]."""
+    ts = [t for t, _ in puntos]
+    ys = [y for _, y in puntos]
+    mt, my = statistics.fmean(ts), statistics.fmean(ys)
+    den = sum((t - mt) ** 2 for t in ts)
+    return sum((t - mt) * (y - my) for t, y in puntos) / den if den else 0.0
+
+
+class Muestreador(threading.Thread):
+
+    def __init__(self, base, intervalo, fin):
+        super().__init__(daemon=True)
+        self.base, self.intervalo, self.fin = base, intervalo, fin
+        self.memoria = {}       # pid -> [(t, bytes)]
+        self.errores = 0
+        self.inicio = time.monotonic()
+
+    def run(self):
+        while not self.fin.wait(self.intervalo):
+            try:
+                series = leer_metricas(self.base)
+            except (urllib.error.URLError, OSError):
+                self.errores += 1
+                continue
+            t = time.monotonic() - self.inicio
+            for labels, valor in series.get("ge_proceso_memoria_bytes", {}).items():
+                pid = dict(labels).get("pid")
+                self.memoria.setdefault(pid, []).append((t, valor))
+
+    def crecimiento_mb_hora(self):
+        """{pid: MB/h} en la segunda mitad de la prueba (workers con datos suficientes)."""
+        resultado = {}
+        for pid, puntos in self.memoria.items():
+            calientes = puntos[len(puntos) // 2:]
+            if len(calientes) >= 3:
+                resultado[pid] = _pendiente(calientes) * 3600 / 2 ** 20
+        return resultado
+
+
+def revisar_fugas(base, muestreador, max_mb_hora, espera):
+    """Con la carga ya detenida. Retorna la lista de problemas encontrados."""
+    problemas = []
+    time.sleep(espera)      # que terminen las respuestas en vuelo y se vuelquen las fotos
+    series = leer_metricas(base)
+    abiertas = sum(series.get("ge_db_conexiones_abiertas", {}).values())
+    prestadas = sum(series.get("ge_db_pool_en_uso", {}).values())
+    print(f"\nSin carga: {abiertas:.0f} conexión(es) directa(s) abierta(s), "
+          f"{prestadas:.0f} del pool prestada(s).")
+    if abiertas > 0:
+        problemas.append(f"fuga de conexiones: {abiertas:.0f} siguen abiertas sin carga")
+    if prestadas > 0:
+        problemas.append(f"fuga del pool: {prestadas:.0f} conexiones sin devolver")
+
+    crecimiento = muestreador.crecimiento_mb_hora()
+    for pid, mb_hora in sorted(crecimiento.items()):
+        ultima = muestreador.memoria[pid][-1][1] / 2 ** 20
+        print(f"  worker {pid}: {ultima:7.1f} MB, {mb_hora:+7.1f} MB/h")
+        if mb_hora > max_mb_hora:
+            problemas.append(f"worker {pid} crece {mb_hora:.1f} MB/h (máx {max_mb_hora})")
+    if not crecimiento:
+        problemas.append("no hubo suficientes muestras de memoria (¿prueba muy corta o /metrics cerrado?)")
+    return problemas
+
+
+# ============================
+# 🧾 REPORTE
+# ============================
+
+def _percentil(valores, p):
+    if len(valores) < 2:
+        return valores[0] if valores else 0.0
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def reporte(stats, duracion, slos, max_errores):
+    fallas = []
+    print(f"\n{'paso':<26} {'n':>7} {'pet/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'error':>7}  SLO p95")
+    total = errores_total = 0
+    for paso in sorted(stats.tiempos):
+        tiempos = stats.tiempos[paso]
+        errores = stats.errores.get(paso, 0)
+        total += len(tiempos)
+        errores_total += errores
+        p95 = _percentil(tiempos, 95)
+        tasa = errores / len(tiempos)
+        slo = slos.get(paso, SLO_P95_DEFECTO)
+        marca = ""
+        if p95 > slo:
+            fallas.append(f"{paso}: p95 {p95:.0f} ms > {slo} ms")
+            marca = "  <-- p95"
+        if tasa > max_errores:
+            fallas.append(f"{paso}: {tasa:.1%} de errores > {max_errores:.1%}")
+            marca += "  <-- errores"
+        print(f"{paso:<26} {len(tiempos):7d} {len(tiempos) / duracion:7.1f} "
+              f"{_percentil(tiempos, 50):8.0f} {p95:8.0f} {_percentil(tiempos, 99):8.0f} "
+              f"{tasa:7.1%}  {slo}{marca}")
+    if total:
+        print(f"{'total':<26} {total:7d} {total / duracion:7.1f} {'':>26} {errores_total / total:7.1%}")
+    return fallas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con recorridos por rol.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--usuarios", type=int, default=50, help="usuarios virtuales concurrentes")
+    parser.add_argument("--duracion", type=float, default=120, help="segundos de carga")
+    parser.add_argument("--rampa", type=float, default=10, help="segundos para arrancar a todos")
+    parser.add_argument("--pausa", type=float, default=PAUSA_SEGUNDOS, help="pausa media entre pasos")
+    parser.add_argument("--slo", action="append", default=[], metavar="PASO=MS",
+                        help="cambia el p95 máximo de un paso (repetible)")
+    parser.add_argument("--max-errores", type=float, default=SLO_ERRORES)
+    parser.add_argument("--soak", action="store_true", help="revisa fugas de conexiones y memoria")
+    parser.add_argument("--muestreo", type=float, default=15, help="segundos entre lecturas de /metrics")
+    parser.add_argument("--max-mb-hora", type=float, default=20, help="crecimiento de memoria tolerado")
+    args = parser.parse_args()
+
+    slos = dict(SLO_P95_MS)
+    for par in args.slo:
+        paso, _, ms = par.partition("=")
+        slos[paso] = float(ms)
+
+    base = args.url.rstrip("/")
+    stats = Estadisticas()
+    fin = threading.Event()
+    muestreador = None
+    if args.soak:
+        muestreador = Muestreador(base, args.muestreo, fin)
+        muestreador.start()
+
+    # Roles según su peso; cada usuario toma una cuenta distinta de su rol
+    roles = list(RECORRIDOS)
+    pesos = [RECORRIDOS[r][0] for r in roles]
+    cuentas = {r: 0 for r in roles}
+    usuarios = []
+    print(f"{args.usuarios} usuarios durante {args.duracion:.0f} s contra {base}"
+          + (" (soak)" if args.soak else ""))
+    inicio = time.monotonic()
+    for i in range(args.usuarios):
+        rol = random.choices(roles, pesos)[0]
+        cuenta = cuentas[rol] % fixture.CUENTAS[rol]
+        cuentas[rol] += 1
+        u = UsuarioVirtual(base, rol, cuenta, stats, fin, args.pausa)
+        u.start()
+        usuarios.append(u)
+        if args.rampa and fin.wait(args.rampa / args.usuarios):
+            break
+
+    try:
+        fin.wait(max(0.0, args.duracion - (time.monotonic() - inicio)))
+    except KeyboardInterrupt:
+        print("\nInterrumpido: se reporta lo medido hasta ahora.")
+    fin.set()
+    for u in usuarios:
+        u.join(TIEMPO_ESPERA)
+    duracion = time.monotonic() - inicio
+    print(f"Usuarios por rol: {', '.join(f'{r} {n}' for r, n in cuentas.items())}")
+
+    fallas = reporte(stats, duracion, slos, args.max_errores)
+    if muestreador is not None:
+        fallas += revisar_fugas(base, muestreador, args.max_mb_hora, espera=args.muestreo)
+
+    if fallas:
+        print(f"\nFALLA ({len(fallas)}):")
+        for f in fallas:
+            print(f"  {f}")
+        sys.exit(1)
+    print("\nOK: todos los pasos dentro del SLO.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# benchmarks/fixture.py
+#
+# Base de datos de prueba para los benchmarks (bench_rutas.py y los de
+# carga). Se arma a partir del esquema de la BD de config.py
+# (GE_DB_NAME), en el mismo servidor y sin tocar sus datos:
+#
+#   1. Copia la estructura de todas las tablas y vistas a NOMBRE
+#      (GE_BENCH_DB_NAME, por defecto "<GE_DB_NAME>_bench").
+#   2. Copia tal cual las tablas de catálogo (roles, permisos, grados...).
+#   3. Llena las demás con datos sintéticos deterministas (misma semilla,
+#      mismos datos), respetando las llaves foráneas.
+#   4. Crea CUENTAS[rol] usuarios por rol: usuario(rol, n) / CLAVE.
+#
+# Uso (desde globalenglish_code/):
+#     python benchmarks/fixture.py          # escala 1
+#     python benchmarks/fixture.py 5        # 5 veces más filas
+
+import os
+import random
+import re
+import sys
+from datetime import date, datetime, time, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import mysql.connector  # noqa: E402
+
+import contrasenas  # noqa: E402
+from config import DB_CONFIG  # noqa: E402
+
+ORIGEN = DB_CONFIG["database"]
+NOMBRE = os.environ.get("GE_BENCH_DB_NAME") or f"{ORIGEN}_bench"
+CLAVE = "bench-clave"
+ROLES = ("ADMINISTRADOR", "ADMINISTRATIVO", "TUTOR")
+# Cuentas por rol (la prueba de carga reparte sus usuarios virtuales entre ellas)
+CUENTAS = {"ADMINISTRADOR": 2, "ADMINISTRATIVO": 10, "TUTOR": 60}
+SEMILLA = 20251
+
+# Se copian del origen: son pocos datos y la app depende de sus valores
+CATALOGOS = (
+    "rol", "permiso", "rol_permiso", "menu_item", "permisos_version", "horario_version",
+    "tipo_documento", "grado", "tipo_programa", "motivo_inasistencia",
+    "componente_nota", "duracion_hora", "festivo",
+)
+
+# Filas por tabla en escala 1 (las no listadas llevan FILAS_DEFECTO)
+FILAS_DEFECTO = 50
+FILAS = {
+    "institucion": 20,
+    "sede": 40,
+    "persona": 2500,
+    "estudiante": 2000,
+    "tutor": 60,
+    "aula": 120,
+    "aula_programa": 120,
+    "matricula": 4000,
+    "periodo_academico": 4,
+    "semana_programa": 40,
+    "horario_aula": 300,
+    "tutor_aula_horario": 300,
+    "asistencia_clase": 3000,
+    "asistencia_detalle": 40000,
+    "nota": 8000,
+    "nota_final": 4000,
+}
+LOTE = 1000
+
+
+def usuario(rol, n=0):
+    """Login de la cuenta n del rol (la 0 es la que usa bench_rutas.py)."""
+    return f"bench_{rol.lower()}{n or ''}@bench.local"
+
+
+def usar():
+    """Apunta la configuración de este proceso a la BD de prueba."""
+    os.environ["GE_DB_NAME"] = NOMBRE
+    DB_CONFIG["database"] = NOMBRE
+
+
+# ============================
+# 🧱 ESQUEMA
+# ============================
+
+def _tablas(cursor):
+    cursor.execute(f"SHOW FULL TABLES FROM `{ORIGEN}`;")
+    tablas, vistas = [], []
+    for nombre, tipo in cursor.fetchall():
+        (vistas if tipo == "VIEW" else tablas).append(nombre)
+    return tablas, vistas
+
+
+def _copiar_esquema(cursor, tablas, vistas):
+    cursor.execute(f"DROP DATABASE IF EXISTS `{NOMBRE}`;")
+    cursor.execute(f"CREATE DATABASE `{NOMBRE}`;")
+    cursor.execute(f"USE `{NOMBRE}`;")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+    for tabla in tablas:
+        cursor.execute(f"SHOW CREATE TABLE `{ORIGEN}`.`{tabla}`;")
+        cursor.execute(cursor.fetchone()[1])
+    for vista in vistas:
+        cursor.execute(f"SHOW CREATE VIEW `{ORIGEN}`.`{vista}`;")
+        ddl = re.sub(r"DEFINER=\S+ ", "", cursor.fetchone()[1])
+        cursor.execute(ddl.replace(f"`{ORIGEN}`.", ""))
+
+
+# ============================
+# 🎲 DATOS SINTÉTICOS
+# ============================
+
+def _columnas(cursor, tabla):
+    cursor.execute("""
+        SELECT column_name, data_type, column_type, character_maximum_length,
+               numeric_precision, numeric_scale, extra
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s
+        ORDER BY ordinal_position;
+    """, (NOMBRE, tabla))
+    return [c for c in cursor.fetchall()
+            if "auto_increment" not in c[6] and "GENERATED" not in c[6].upper()]
+
+
+def _llaves_foraneas(cursor):
+    """{tabla: {columna: (tabla_padre, columna_padre)}}"""
+    cursor.execute("""
+        SELECT table_name, column_name, referenced_table_name, referenced_column_name
+        FROM information_schema.key_column_usage
+        WHERE table_schema = %s AND referenced_table_name IS NOT NULL;
+    """, (NOMBRE,))
+    llaves = {}
+    for tabla, columna, padre, columna_padre in cursor.fetchall():
+        llaves.setdefault(tabla, {})[columna] = (padre, columna_padre)
+    return llaves
+
+
+def _ordenar(tablas, llaves):
+    """Padres antes que hijos (los ciclos se rompen en el orden original)."""
+    pendientes, orden = list(tablas), []
+    while pendientes:
+        listas = [t for t in pendientes
+                  if all(p == t or p not in pendientes for p, _ in llaves.get(t, {}).values())]
+        siguiente = listas[0] if listas else pendientes[0]
+        orden.append(siguiente)
+        pendientes.remove(siguiente)
+    return orden
+
+
+def _generador(columna, i, rng, hoy):
+    nombre, tipo, tipo_columna, largo, precision, escala, _ = columna
+    if tipo in ("enum", "set"):
+        return rng.choice(re.findall(r"'((?:[^']|'')*)'", tipo_columna))
+    if tipo_columna.startswith("tinyint(1)") or tipo == "bit":
+        return 1 if rng.random() < 0.9 else 0
+    if tipo in ("tinyint", "smallint", "mediumint", "int", "bigint"):
+        return rng.randint(1, 100)
+    if tipo in ("decimal", "float", "double"):
+        tope = min(5.0, 10 ** ((precision or 3) - (escala or 0)) - 1)
+        return round(rng.uniform(0, tope), escala or 2)
+    if tipo == "date":
+        return hoy + timedelta(days=rng.randint(-180, 180))
+    if tipo in ("datetime", "timestamp"):
+        return datetime.combine(hoy + timedelta(days=rng.randint(-180, 180)),
+                                time(rng.randint(6, 17), rng.choice((0, 30))))
+    if tipo == "time":
+        return time(rng.randint(6, 17), rng.choice((0, 30)))
+    if tipo == "year":
+        return hoy.year
+    if tipo in ("blob", "tinyblob", "mediumblob", "longblob", "binary", "varbinary"):
+        return b""
+    if "mail" in nombre or nombre == "username":
+        texto = f"{nombre}{i}@bench.local"
+    else:
+        texto = f"{nombre} {i}"
+    return texto[-largo:] if largo else texto
+
+
+def _insertar(cursor, tabla, columnas, n, rng, padres, llaves, fijos=None, desde=1):
+    fijos = fijos or {}
+    hoy = date.today()
+    nombres = [c[0] for c in columnas]
+    sql = (f"INSERT IGNORE INTO `{tabla}` ({', '.join(f'`{c}`' for c in nombres)}) "
+           f"VALUES ({', '.join(['%s'] * len(nombres))})")
+    filas = []
+    for i in range(desde, desde + n):
+        fila = []
+        for columna in columnas:
+            nombre = columna[0]
+            if nombre in fijos:
+                fila.append(fijos[nombre])
+            elif nombre in llaves and padres.get(llaves[nombre]):
+                fila.append(rng.choice(padres[llaves[nombre]]))
+            else:
+                fila.append(_generador(columna, i, rng, hoy))
+        filas.append(fila)
+        if len(filas) >= LOTE:
+            cursor.executemany(sql, filas)
+            filas = []
+    if filas:
+        cursor.executemany(sql, filas)
+
+
+def _cargar_llaves(cursor, tabla, llaves, padres):
+    """Deja a mano los valores de `tabla` que referencian sus tablas hijas."""
+    referenciadas = {c for refs in llaves.values() for t, c in refs.values() if t == tabla}
+    for columna in referenciadas:
+        cursor.execute(f"SELECT `{columna}` FROM `{tabla}`;")
+        padres[(tabla, columna)] = [fila[0] for fila in cursor.fetchall()]
+
+
+def _llenar(cursor, tablas, escala, semilla):
+    rng = random.Random(semilla)
+    llaves = _llaves_foraneas(cursor)
+    padres = {}
+    for tabla in _ordenar(tablas, llaves):
+        if tabla in CATALOGOS:
+            cursor.execute(f"INSERT INTO `{tabla}` SELECT * FROM `{ORIGEN}`.`{tabla}`;")
+        else:
+            n = max(1, int(FILAS.get(tabla, FILAS_DEFECTO) * escala))
+            _insertar(cursor, tabla, _columnas(cursor, tabla), n, rng, padres, llaves.get(tabla, {}))
+        _cargar_llaves(cursor, tabla, llaves, padres)
+    return rng, llaves, padres
+
+
+def _crear_usuarios(cursor, rng, llaves, padres):
+    hash_clave = contrasenas.generar_hash(CLAVE)
+    k = 900000      # índices lejos de los sintéticos para no chocar con valores únicos
+    for rol in ROLES:
+        cursor.execute("SELECT id_rol FROM rol WHERE nombre_rol = %s;", (rol,))
+        fila = cursor.fetchone()
+        if fila is None:
+            print(f"  (sin rol {rol} en el catálogo; no se crean sus usuarios)")
+            continue
+        for n in range(CUENTAS[rol]):
+            k += 1
+            _insertar(cursor, "persona", _columnas(cursor, "persona"), 1, rng, padres,
+                      llaves.get("persona", {}), desde=k)
+            cursor.execute("SELECT MAX(id_persona) FROM persona;")
+            id_persona = cursor.fetchone()[0]
+            _insertar(cursor, "usuario_sistema", _columnas(cursor, "usuario_sistema"), 1, rng,
+                      padres, llaves.get("usuario_sistema", {}), desde=k,
+                      fijos={"username": usuario(rol, n), "password_hash": hash_clave,
+                             "activo": 1, "id_persona": id_persona, "id_rol": fila[0]})
+
+
+def crear(escala=1.0, semilla=SEMILLA):
+    if NOMBRE == ORIGEN:
+        sys.exit("GE_BENCH_DB_NAME no puede ser la misma BD de config.py.")
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        tablas, vistas = _tablas(cursor)
+        _copiar_esquema(cursor, tablas, vistas)
+        rng, llaves, padres = _llenar(cursor, tablas, escala, semilla)
+        _crear_usuarios(cursor, rng, llaves, padres)
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+        conn.commit()
+        for tabla in tablas:
+            cursor.execute(f"ANALYZE TABLE `{tabla}`;")
+            cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"BD de prueba {NOMBRE}: {len(tablas)} tablas, {len(vistas)} vistas, escala {escala}.")
+
+
+def primer_id(tabla, columna):
+    """Menor valor de la llave (para armar URLs con datos que existen)."""
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT MIN(`{columna}`) FROM `{tabla}`;")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def id_usuario(rol):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id_usuario FROM usuario_sistema WHERE username = %s;", (usuario(rol),))
+        fila = cursor.fetchone()
+        return fila[0] if fila else None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    crear(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
@@ -0,0 +1,257 @@
+# busqueda.py
+#
+# Índice en memoria para el autocompletado (/api/buscar).
+# Se arma una vez por proceso (en producción en el maestro, antes del
+# fork; ver arranque.py) con estudiantes, tutores e instituciones y
+# después se actualiza en caliente cuando se registra uno nuevo, así cada
+# tecla se responde sin ir a MySQL.
+#
+# - Prefijo: lista ordenada de palabras + bisect.
+# - Aproximado (errores de digitación): vecindario de borrados de 1 letra
+#   (estilo SymSpell) sobre el vocabulario, que es mucho más pequeño que el
+#   número de personas porque los nombres se repiten.
+
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+
+import arranque
+
+TIPOS = ("estudiante", "tutor", "institucion")
+
+# Cada tipo solo se muestra a quien puede ver su listado (mismos permisos)
+ENDPOINT_POR_TIPO = {
+    "estudiante": "estudiantes_list",
+    "tutor": "tutores_list",
+    "institucion": "instituciones_list",
+}
+
+# Cada cuánto se reconstruye desde la BD para ver lo que insertaron otros workers
+TTL_SEGUNDOS = 900
+# Máximo de candidatos que se evalúan antes de ordenar (prefijos muy cortos
+# o apellidos muy comunes)
+MAX_CANDIDATOS = 5000
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'Peña Gómez' -> 'pena gomez'."""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def palabras(texto):
+    return [p for p in normalizar(texto).replace(",", " ").replace(".", " ").split() if p]
+
+
+def _borrados(palabra):
+    return {palabra[:i] + palabra[i + 1:] for i in range(len(palabra))}
+
+
+def _puntaje(tokens, consulta, es_aproximado):
+    """Menor es mejor: primero exactos, luego más palabras completas, luego posición."""
+    exactas = sum(1 for q in consulta if q in tokens)
+    posicion = next((i for i, t in enumerate(tokens) if t.startswith(consulta[0])), len(tokens))
+    return (1 if es_aproximado else 0, -exactas, posicion)
+
+
+class IndiceBusqueda:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._limpiar()
+        self.construido = 0.0
+
+    def _limpiar(self):
+        self._entradas = {}      # (tipo, id) -> dict con etiqueta/detalle/palabras
+        self._vocabulario = {}   # palabra -> set de (tipo, id)
+        self._ordenadas = []     # palabras del vocabulario, ordenadas
+        self._vecinos = {}       # palabra con una letra borrada -> set de palabras
+
+    # ----------------- carga -----------------
+
+    def vencido(self):
+        return time.monotonic() - self.construido > TTL_SEGUNDOS
+
+    def reconstruir(self, registros):
+        """`registros` es un iterable de (tipo, id, etiqueta, detalle, documento)."""
+        with self._lock:
+            self._limpiar()
+            for tipo, id_, etiqueta, detalle, documento in registros:
+                self.agregar(tipo, id_, etiqueta, detalle, documento)
+            self.construido = time.monotonic()
+
+    def agregar(self, tipo, id_, etiqueta, detalle=None, documento=None):
+        """Agrega (o reemplaza) un registro sin reconstruir el índice."""
+        clave = (tipo, id_)
+        with self._lock:
+            if clave in self._entradas:
+                self.quitar(tipo, id_)
+            tokens = palabras(etiqueta)
+            if documento:
+                tokens.append(normalizar(documento).replace(" ", ""))
+            self._entradas[clave] = {
+                "tipo": tipo,
+                "id": id_,
+                "etiqueta": etiqueta,
+                "detalle": detalle,
+                "documento": documento,
+                "palabras": tokens,
+                "orden": normalizar(etiqueta),
+            }
+            for t in tokens:
+                if t not in self._vocabulario:
+                    self._vocabulario[t] = set()
+                    bisect.insort(self._ordenadas, t)
+                    if not t.isdigit():
+                        for b in _borrados(t):
+                            self._vecinos.setdefault(b, set()).add(t)
+                self._vocabulario[t].add(clave)
+
+    def quitar(self, tipo, id_):
+        with self._lock:
+            entrada = self._entradas.pop((tipo, id_), None)
+            if not entrada:
+                return
+            for t in entrada["palabras"]:
+                claves = self._vocabulario.get(t)
+                if claves is None:
+                    continue
+                claves.discard((tipo, id_))
+                if not claves:
+                    self._olvidar(t)
+
+    def _olvidar(self, palabra):
+        """Saca del vocabulario una palabra que ya no tiene registros."""
+        del self._vocabulario[palabra]
+        i = bisect.bisect_left(self._ordenadas, palabra)
+        if i < len(self._ordenadas) and self._ordenadas[i] == palabra:
+            del self._ordenadas[i]
+        if not palabra.isdigit():
+            for b in _borrados(palabra):
+                vecinas = self._vecinos.get(b)
+                if vecinas is not None:
+                    vecinas.discard(palabra)
+                    if not vecinas:
+                        del self._vecinos[b]
+
+    # ----------------- consulta -----------------
+
+    def _por_prefijo(self, prefijo):
+        i = bisect.bisect_left(self._ordenadas, prefijo)
+        encontrados = set()
+        while i < len(self._ordenadas) and self._ordenadas[i].startswith(prefijo):
+            for clave in self._vocabulario[self._ordenadas[i]]:
+                encontrados.add(clave)
+                if len(encontrados) >= MAX_CANDIDATOS:
+                    return encontrados
+            i += 1
+        return encontrados
+
+    def _aproximadas(self, palabra):
+        """Palabras del vocabulario a distancia de edición 1 (aprox.)."""
+        cercanas = set(self._vecinos.get(palabra, ()))
+        for b in _borrados(palabra):
+            if b in self._vocabulario:
+                cercanas.add(b)
+            cercanas |= self._vecinos.get(b, set())
+        cercanas.discard(palabra)
+        return cercanas
+
+    def buscar(self, texto, tipos=TIPOS, limite=10):
+        consulta = palabras(texto)
+        if not consulta:
+            return []
+
+        with self._lock:
+            # 1. Coincidencias por prefijo: se parte de la palabra más larga
+            #    (la más selectiva) y se exige que las demás también coincidan
+            principal, *resto = sorted(consulta, key=len, reverse=True)
+            candidatos = {
+                c for c in self._por_prefijo(principal)
+                if all(any(t.startswith(q) for t in self._entradas[c]["palabras"]) for q in resto)
+            }
+
+            # 2. Si faltan resultados, tolerar un error en las palabras largas
+            aproximados = set()
+            if len(candidatos) < limite:
+                for q in consulta:
+                    if len(q) >= 4 and not q.isdigit():
+                        for p in self._aproximadas(q):
+                            aproximados |= self._vocabulario.get(p, set())
+                aproximados -= candidatos
+
+            resultados = []
+            for clave, es_aproximado in [(c, False) for c in candidatos] + [(c, True) for c in aproximados]:
+                entrada = self._entradas.get(clave)
+                if not entrada or entrada["tipo"] not in tipos:
+                    continue
+                puntaje = _puntaje(entrada["palabras"], consulta, es_aproximado)
+                resultados.append((puntaje, entrada["orden"], entrada, es_aproximado))
+
+        mejores = heapq.nsmallest(limite, resultados, key=lambda r: (r[0], r[1]))
+        return [
+            {
+                "tipo": e["tipo"],
+                "id": e["id"],
+                "etiqueta": e["etiqueta"],
+                "detalle": e["detalle"],
+                "documento": e["documento"],
+                "aproximado": aprox,
+            }
+            for _, _, e, aprox in mejores
+        ]
+
+
+# Un índice por proceso (cada worker arma el suyo)
+indice = IndiceBusqueda()
+_reconstruyendo = threading.Lock()
+
+
+@arranque.al_iniciar_worker
+def _despues_del_fork():
+    # El índice armado en el maestro se hereda tal cual; solo el lock se
+    # renueva por si el fork ocurrió con una reconstrucción en curso.
+    global _reconstruyendo
+    _reconstruyendo = threading.Lock()
+
+
+def _reemplazar(cargar):
+    global indice
+    registros = cargar()
+    if registros is None:
+        return
+    nuevo = IndiceBusqueda()
+    nuevo.reconstruir(registros)
+    indice = nuevo
+
+
+def _reemplazar_en_segundo_plano(cargar):
+    try:
+        _reemplazar(cargar)
+    finally:
+        _reconstruyendo.release()
+
+
+def obtener_indice(cargar):
+    """
+    Retorna el índice del worker. La primera vez se arma en la misma
+    petición; cuando vence se arma uno nuevo en un hilo aparte y mientras
+    tanto se sigue respondiendo con el anterior.
+    `cargar` retorna la lista de registros (o None si falla la BD).
+    """
+    if indice.construido == 0:
+        with _reconstruyendo:
+            if indice.construido == 0:
+                _reemplazar(cargar)
+    elif indice.vencido() and _reconstruyendo.acquire(blocking=False):
+        threading.Thread(target=_reemplazar_en_segundo_plano, args=(cargar,),
+                         daemon=True).start()
+    return indice
+
+
+def agregar(tipo, id_, etiqueta, detalle=None, documento=None):
+    """Registra un alta reciente en el índice (si ya está construido)."""
+    if indice.construido:
+        indice.agregar(tipo, id_, etiqueta, detalle, documento)
@@ -0,0 +1,49 @@
+# cache.py
+#
+# Caché en memoria con vencimiento, compartida entre los hilos de un worker.
+# Lleva la cuenta de aciertos y fallos para poder ver si está sirviendo.
+
+import threading
+import time
+
+# Cachés con nombre, para exponer sus contadores en /metrics
+instancias = []
+
+
+class CacheTTL:
+    """Diccionario con vencimiento por entrada, seguro entre hilos del worker."""
+
+    def __init__(self, ttl_segundos, nombre=None):
+        self.ttl = ttl_segundos
+        self.nombre = nombre
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = {}
+        self._lock = threading.Lock()
+        if nombre:
+            instancias.append(self)
+
+    def get(self, clave):
+        with self._lock:
+            item = self._datos.get(clave)
+            if item and time.monotonic() - item[1] < self.ttl:
+                self.aciertos += 1
+                return item[0]
+            self.fallos += 1
+        return None
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic())
+
+    def invalidar(self, clave=None):
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+    def estadisticas(self):
+        with self._lock:
+            return {"entradas": len(self._datos), "aciertos": self.aciertos,
+                    "fallos": self.fallos}
@@ -0,0 +1,187 @@
+# compresion.py
+#
+# Compresión dinámica de respuestas a nivel WSGI (gzip o brotli según
+# Accept-Encoding). Los reportes y listados son HTML muy repetitivo y de
+# varios MB, así que comprimidos pesan una fracción.
+#
+# - No se comprimen respuestas pequeñas, tipos ya comprimidos (imágenes,
+#   PDF, zip...) ni las que ya traen Content-Encoding (p. ej. /static/dist).
+# - Funciona con respuestas en streaming: cada bloque se comprime y se
+#   envía con un flush, así el navegador sigue mostrando la página a
+#   medida que llega.
+# - Cada vista puede ajustar o desactivar la compresión con
+#   @compresion.opciones(...).
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli solo se ofrece gzip
+    brotli = None
+
+from flask import request
+
+from config import (COMPRESION_MINIMO_BYTES, COMPRESION_NIVEL_GZIP,
+                    COMPRESION_CALIDAD_BROTLI)
+
+CLAVE_ENVIRON = "globalenglish.compresion"
+
+TIPOS_COMPRIMIBLES = (
+    "text/", "application/json", "application/javascript",
+    "application/xml", "image/svg+xml", "text/calendar",
+)
+
+
+def opciones(activa=True, minimo_bytes=None, nivel_gzip=None, calidad_brotli=None):
+    """Decorador para ajustar la compresión de una vista en particular."""
+    def decorator(f):
+        f._compresion = {
+            "activa": activa,
+            "minimo_bytes": minimo_bytes,
+            "nivel_gzip": nivel_gzip,
+            "calidad_brotli": calidad_brotli,
+        }
+        return f
+    return decorator
+
+
+def _codificacion_aceptada(cabecera, ofrecidas=None):
+    """
+    Elige la primera de `ofrecidas` (por defecto 'br' si hay brotli, luego
+    'gzip') que Accept-Encoding acepta, o None. Respeta q=0, y "*" solo
+    cuenta para las codificaciones que no aparecen con su nombre.
+    """
+    if ofrecidas is None:
+        ofrecidas = ("br", "gzip") if brotli is not None else ("gzip",)
+    aceptadas = {}
+    for parte in (cabecera or "").split(","):
+        nombre, _, params = parte.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if nombre:
+            aceptadas[nombre.strip().lower()] = q
+    for codificacion in ofrecidas:
+        q = aceptadas[codificacion] if codificacion in aceptadas else aceptadas.get("*", 0)
+        if q > 0:
+            return codificacion
+    return None
+
+
+class _Gzip:
+    def __init__(self, nivel):
+        self._z = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def bloque(self, datos):
+        return self._z.compress(datos) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def fin(self):
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, calidad):
+        self._c = brotli.Compressor(quality=calidad)
+
+    def bloque(self, datos):
+        return self._c.process(datos) + self._c.flush()
+
+    def fin(self):
+        return self._c.finish()
+
+
+class CompresionMiddleware:
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        codificacion = _codificacion_aceptada(environ.get("HTTP_ACCEPT_ENCODING"))
+        if codificacion is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.wsgi_app(environ, start_response)
+
+        estado = {}
+
+        def start_response_compresion(status, headers, exc_info=None):
+            compresor = self._decidir(environ, status, headers, codificacion)
+            if compresor is not None:
+                headers = [(k, v) for k, v in headers if k.lower() != "content-length"]
+                headers.append(("Content-Encoding", codificacion))
+                vary = [v for k, v in headers if k.lower() == "vary"]
+                headers = [(k, v) for k, v in headers if k.lower() != "vary"]
+                headers.append(("Vary", ", ".join(vary + ["Accept-Encoding"])))
+            estado["compresor"] = compresor
+            return start_response(status, headers, exc_info)
+
+        cuerpo = self.wsgi_app(environ, start_response_compresion)
+        if "compresor" in estado and estado["compresor"] is None:
+            # Nada que comprimir: se devuelve el cuerpo tal cual (conserva
+            # wsgi.file_wrapper para los archivos estáticos)
+            return cuerpo
+        return self._comprimir(cuerpo, estado)
+
+    def _decidir(self, environ, status, headers, codificacion):
+        ajustes = environ.get(CLAVE_ENVIRON) or {}
+        if not ajustes.get("activa", True):
+            return None
+        if not status.startswith("2") or status.startswith("204"):
+            return None
+
+        cabeceras = {k.lower(): v for k, v in headers}
+        if "content-encoding" in cabeceras:
+            return None
+        if "no-transform" in cabeceras.get("cache-control", ""):
+            return None
+        tipo = cabeceras.get("content-type", "").split(";")[0].strip().lower()
+        if not tipo.startswith(TIPOS_COMPRIMIBLES):
+            return None
+
+        # Sin Content-Length es una respuesta en streaming: se comprime siempre
+        minimo = ajustes.get("minimo_bytes")
+        minimo = COMPRESION_MINIMO_BYTES if minimo is None else minimo
+        largo = cabeceras.get("content-length")
+        if largo is not None and largo.isdigit() and int(largo) < minimo:
+            return None
+
+        if codificacion == "br":
+            calidad = ajustes.get("calidad_brotli")
+            return _Brotli(COMPRESION_CALIDAD_BROTLI if calidad is None else calidad)
+        nivel = ajustes.get("nivel_gzip")
+        return _Gzip(COMPRESION_NIVEL_GZIP if nivel is None else nivel)
+
+    @staticmethod
+    def _comprimir(cuerpo, estado):
+        try:
+            compresor = None
+            for datos in cuerpo:
+                compresor = estado.get("compresor")
+                if compresor is None:
+                    yield datos
+                elif datos:
+                    salida = compresor.bloque(datos)
+                    if salida:
+                        yield salida
+            compresor = estado.get("compresor")
+            if compresor is not None:
+                yield compresor.fin()
+        finally:
+            if hasattr(cuerpo, "close"):
+                cuerpo.close()
+
+
+def registrar(app):
+    """Instala el middleware y pasa al WSGI los ajustes de cada vista."""
+
+    @app.after_request
+    def _marcar_compresion(resp):
+        vista = app.view_functions.get(request.endpoint)
+        ajustes = getattr(vista, "_compresion", None)
+        if ajustes is not None:
+            request.environ[CLAVE_ENVIRON] = ajustes
+        return resp
+
+    app.wsgi_app = CompresionMiddleware(app.wsgi_app)
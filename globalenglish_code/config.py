@@ -1,9 +1,119 @@
 # config.py
+#
+# Toda la configuración sale de variables de entorno (prefijo GE_), con
+# valores por defecto pensados para desarrollo local. En producción se
+# definen al menos GE_SECRET_KEY y GE_DB_PASSWORD (ver servidor.py).
+import os
+import tempfile
+
+
+def _env(nombre, defecto=None):
+    valor = os.environ.get(nombre)
+    return defecto if valor is None or valor == "" else valor
+
+
+def _entero(nombre, defecto):
+    return int(_env(nombre, defecto))
+
+
+def _decimal(nombre, defecto):
+    return float(_env(nombre, defecto))
+
+
+def _booleano(nombre, defecto):
+    return str(_env(nombre, defecto)).strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+
 
 DB_CONFIG = {
-    "host": "127.0.0.1",
-    "port": 3306,
-    "user": "root",        
-    "password": "Pedrinche@2020", 
-    "database": "globalenglish",
+    "host": _env("GE_DB_HOST", "127.0.0.1"),
+    "port": _entero("GE_DB_PORT", 3306),
+    "user": _env("GE_DB_USER", "root"),
+    "password": _env("GE_DB_PASSWORD", ""),
+    "database": _env("GE_DB_NAME", "globalenglish"),
 }
+
+# Conexiones por worker en el pool de consultas_paralelas.py, y cuántas
+# consultas independientes de una misma página corren a la vez
+DB_POOL_TAMANO = _entero("GE_DB_POOL", 8)
+CONSULTAS_PARALELAS = _entero("GE_CONSULTAS_PARALELAS", 4)
+
+# Réplicas de lectura (ver replicas.py): "host:puerto,host:puerto", con el
+# mismo usuario, clave y BD que DB_CONFIG salvo GE_DB_REPLICA_USER/PASSWORD.
+# Una réplica con más de GE_DB_REPLICA_RETRASO_MAX segundos de retraso no
+# se usa; el retraso se vuelve a consultar cada GE_DB_REPLICA_VERIFICAR s.
+DB_REPLICAS = [
+    (host, int(puerto or 3306))
+    for host, _, puerto in (
+        r.strip().partition(":") for r in _env("GE_DB_REPLICAS", "").split(",") if r.strip()
+    )
+]
+DB_REPLICA_USUARIO = _env("GE_DB_REPLICA_USER", DB_CONFIG["user"])
+DB_REPLICA_CLAVE = _env("GE_DB_REPLICA_PASSWORD", DB_CONFIG["password"])
+DB_REPLICA_RETRASO_MAXIMO = _decimal("GE_DB_REPLICA_RETRASO_MAX", 5.0)
+DB_REPLICA_VERIFICAR_SEGUNDOS = _decimal("GE_DB_REPLICA_VERIFICAR", 2.0)
+
+# Firma de la cookie de sesión. Sin GE_SECRET_KEY el servidor de
+# desarrollo usa una clave aleatoria por proceso (las sesiones no
+# sobreviven a un reinicio) y el de producción se niega a arrancar.
+SECRET_KEY = _env("GE_SECRET_KEY")
+DEBUG = _booleano("GE_DEBUG", False)
+
+
+# Servidor de producción (ver servidor.py)
+SERVIDOR_BIND = _env("GE_BIND", "0.0.0.0:8000")
+SERVIDOR_WORKERS = _entero("GE_WORKERS", 2 * (os.cpu_count() or 1) + 1)
+SERVIDOR_HILOS = _entero("GE_HILOS", 4)              # hilos por worker
+SERVIDOR_TIMEOUT = _entero("GE_TIMEOUT", 60)
+SERVIDOR_MAX_PETICIONES = _entero("GE_MAX_PETICIONES", 5000)  # reciclar workers
+# Tiempo máximo para importar la app y precalentarla (plantillas, índice
+# de búsqueda, permisos). Si se pasa se avisa en el log; con
+# GE_ARRANQUE_ESTRICTO=1 el arranque falla.
+ARRANQUE_PRESUPUESTO_SEGUNDOS = _decimal("GE_ARRANQUE_PRESUPUESTO", 5.0)
+ARRANQUE_ESTRICTO = _booleano("GE_ARRANQUE_ESTRICTO", False)
+
+
+# Política de hash de contraseñas (ver contrasenas.py).
+# Si se cambia el método o el costo, las cuentas se re-hashean solas
+# en su siguiente login correcto.
+PASSWORD_HASH_METODO = _env("GE_PASSWORD_HASH_METODO", "scrypt:32768:8:1")
+PASSWORD_SALT_LENGTH = 16
+PASSWORD_VERIFICADORES = _entero("GE_PASSWORD_VERIFICADORES", 4)  # verificaciones simultáneas (≈ núcleos)
+PASSWORD_COLA_MAXIMA = 64       # logins esperando antes de responder "ocupado"
+PASSWORD_ESPERA_SEGUNDOS = 5
+
+
+# Plantillas (ver plantillas.py)
+JINJA_BYTECODE_DIR = _env("GE_JINJA_BYTECODE_DIR",
+                          os.path.join(tempfile.gettempdir(), "globalenglish_jinja"))
+FRAGMENTOS_TTL_SEGUNDOS = _entero("GE_FRAGMENTOS_TTL", 3600)
+
+
+# Listados y reportes grandes en streaming (ver streaming.py)
+RENDER_EN_STREAMING = _booleano("GE_RENDER_EN_STREAMING", True)
+STREAMING_BLOQUE_BYTES = 16 * 1024
+
+# Compresión de respuestas (ver compresion.py)
+COMPRESION_MINIMO_BYTES = _entero("GE_COMPRESION_MINIMO_BYTES", 1024)
+COMPRESION_NIVEL_GZIP = _entero("GE_COMPRESION_NIVEL_GZIP", 6)
+COMPRESION_CALIDAD_BROTLI = _entero("GE_COMPRESION_CALIDAD_BROTLI", 5)
+
+# Métricas Prometheus en /metrics (ver metricas.py). Sin token solo se
+# responde a peticiones desde la misma máquina.
+METRICAS_DIR = _env("GE_METRICAS_DIR",
+                    os.path.join(tempfile.gettempdir(), "globalenglish_metricas"))
+METRICAS_INTERVALO_SEGUNDOS = _decimal("GE_METRICAS_INTERVALO", 5.0)
+METRICAS_TOKEN = _env("GE_METRICAS_TOKEN")
+
+# Perfilado de peticiones (ver perfilador.py). PERFILADOR_TASA es la
+# probabilidad de perfilar una petición cualquiera (0.001 = 1 de cada mil).
+PERFILES_DIR = _env("GE_PERFILES_DIR",
+                    os.path.join(tempfile.gettempdir(), "globalenglish_perfiles"))
+PERFILADOR_TASA = _decimal("GE_PERFILADOR_TASA", 0.0)
+PERFILADOR_INTERVALO_MS = _decimal("GE_PERFILADOR_INTERVALO_MS", 5.0)
+PERFILES_MAXIMO = _entero("GE_PERFILES_MAXIMO", 200)
+
+# Logging JSON (ver registro.py). GE_LOG_TASA_INFO < 1 guarda los
+# registros INFO solo de esa fracción de peticiones (errores siempre).
+REGISTRO_NIVEL = _env("GE_LOG_NIVEL", "INFO").upper()
+REGISTRO_TASA_INFO = _decimal("GE_LOG_TASA_INFO", 1.0)
+REGISTRO_COLA_MAXIMA = _entero("GE_LOG_COLA", 10000)
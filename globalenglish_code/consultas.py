@@ -0,0 +1,377 @@
+# consultas.py
+#
+# Consultas de los listados y reportes, compartidas por las páginas HTML
+# y por la API JSON (/api/v1, ver api.py). Cada función recibe los
+# filtros (request.args) y retorna una Consulta, así las dos salidas usan
+# exactamente las mismas columnas, los mismos filtros y el mismo SQL.
+# Los filtros de los reportes se declaran tipados (ver filtros.py).
+
+import re
+
+import paginacion
+from filtros import Contiene, Igual, Rango, aplicar, escapar_like
+
+_ALIAS = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\.")
+
+
+def _alias_usados(*textos):
+    return {alias for texto in textos if texto for alias in _ALIAS.findall(texto)}
+
+
+class Union:
+    """
+    Un JOIN de la Consulta. Con podable=True se omite cuando ni los campos
+    pedidos, ni los filtros, ni el orden usan su alias; solo vale para un
+    LEFT JOIN a una llave única, que no cambia cuántas filas salen.
+    """
+
+    def __init__(self, alias, sql, podable=False):
+        self.alias = alias
+        self.sql = sql
+        self.podable = podable
+        self.requiere = _alias_usados(sql) - {alias}
+
+
+class Consulta:
+    """
+    SELECT armado por partes.
+    - campos:  lista de (alias, expresión SQL), en el orden de la salida.
+    - desde:   FROM completo, o solo la tabla base si hay uniones.
+    - uniones: lista de Union en orden; las podables que nada usa se dejan
+               fuera (la API con ?campos= o una página por cursor pide
+               menos columnas y se ahorra esos JOIN).
+    - orden:   ORDER BY del listado completo (el que usa la página HTML).
+    - clave:   alias que identifican una fila de forma única y nunca son
+               NULL; se usan para paginar por cursor.
+    """
+
+    def __init__(self, campos, desde, orden, clave, agrupar=None, uniones=()):
+        self.campos = campos
+        self.desde = desde
+        self.uniones = list(uniones)
+        self.orden = orden
+        self.clave = clave
+        self.agrupar = agrupar
+        self.condiciones = []
+        self.params = []
+        self._expresiones = dict(campos)
+
+    @property
+    def nombres_campos(self):
+        return [alias for alias, _ in self.campos]
+
+    def filtrar(self, condicion, *params):
+        self.condiciones.append(condicion)
+        self.params.extend(params)
+
+    def where(self):
+        """Solo los filtros: retorna (sql, params)."""
+        return " AND ".join(["1 = 1"] + self.condiciones), list(self.params)
+
+    def sql(self, campos=None, clave=None, despues=None, descendente=False, limite=None):
+        """
+        Sin limite: el listado completo en el orden de la página HTML.
+        Con limite: una página ordenada por la clave (por defecto self.clave),
+        empezando después del cursor `despues` si se indica.
+        Retorna (sql, params).
+        """
+        campos = campos or self.nombres_campos
+        select = ",\n                ".join(
+            f"{self._expresiones[alias]} AS {alias}" for alias in campos
+        )
+        where, params = self.where()
+
+        if limite is None:
+            orden = self.orden
+        else:
+            columnas = [self._expresiones[alias] for alias in (clave or self.clave)]
+            if despues is not None:
+                cond, p = paginacion.condicion_keyset(columnas, despues, descendente)
+                where += " AND " + cond
+                params += p
+            orden = paginacion.orden_sql(columnas, descendente)
+
+        partes = [
+            f"SELECT\n                {select}",
+            f"FROM {self._desde(_alias_usados(select, where, orden, self.agrupar))}",
+            f"WHERE {where}",
+        ]
+        if self.agrupar:
+            partes.append(f"GROUP BY {self.agrupar}")
+        partes.append(f"ORDER BY {orden}")
+        if limite is not None:
+            partes.append("LIMIT %s")
+            params.append(limite)
+        return "\n            ".join(partes), params
+
+    def _desde(self, usados):
+        """FROM con las uniones fijas y las podables que algo usa (o requiere)."""
+        necesarios = set(usados)
+        for union in reversed(self.uniones):
+            if union.alias in necesarios or not union.podable:
+                necesarios |= union.requiere
+        return "\n            ".join(
+            [self.desde] + [u.sql for u in self.uniones if u.alias in necesarios or not u.podable]
+        )
+
+
+def _texto(args, nombre):
+    return (args.get(nombre) or "").strip()
+
+
+SEMANAS = Rango("f_semana_ini", "f_semana_fin", "sp.numero_semana", int)
+
+
+# ============================
+# 📋 LISTADOS
+# ============================
+
+def instituciones(args=None):
+    return Consulta(
+        campos=[
+            ("id_institucion", "id_institucion"),
+            ("nombre", "nombre"),
+            ("codigo_dane", "codigo_dane"),
+            ("jornada", "jornada"),
+            ("activa", "activa"),
+        ],
+        desde="institucion",
+        orden="nombre",
+        clave=["id_institucion"],
+    )
+
+
+def sedes(args=None):
+    return Consulta(
+        campos=[
+            ("id_sede", "s.id_sede"),
+            ("nombre_sede", "s.nombre_sede"),
+            ("direccion", "s.direccion"),
+            ("es_principal", "s.es_principal"),
+            ("institucion", "i.nombre"),
+        ],
+        desde="""sede s
+            INNER JOIN institucion i ON s.id_institucion = i.id_institucion""",
+        orden="i.nombre, s.nombre_sede",
+        clave=["id_sede"],
+    )
+
+
+def tutores(args=None):
+    consulta = Consulta(
+        campos=[
+            ("id_persona", "p.id_persona"),
+            ("nombres", "p.nombres"),
+            ("apellidos", "p.apellidos"),
+            ("email", "p.email"),
+            ("telefono", "p.telefono"),
+            ("numero_documento", "p.numero_documento"),
+            ("tipo_documento", "td.nombre"),
+        ],
+        desde="""persona p
+            LEFT JOIN tipo_documento td
+                ON p.id_tipo_documento = td.id_tipo_documento""",
+        orden="p.apellidos, p.nombres",
+        clave=["id_persona"],
+    )
+    consulta.filtrar("p.tipo_perfil_contrato = 'TUTOR'")
+    return consulta
+
+
+def estudiantes(args):
+    consulta = Consulta(
+        campos=[
+            ("id_estudiante", "e.id_estudiante"),
+            ("apellidos", "e.apellidos"),
+            ("nombres", "e.nombres"),
+            ("tipo_doc", "td.nombre"),
+            ("numero_documento", "e.numero_documento"),
+            ("nombre_completo", "CONCAT(e.apellidos, ', ', e.nombres)"),
+            ("numero_grado", "g.numero_grado"),
+            ("fecha_nacimiento", "e.fecha_nacimiento"),
+            ("correo", "e.correo"),
+            ("telefono", "e.telefono"),
+            ("institucion", "i.nombre"),
+        ],
+        desde="""estudiante e
+            JOIN tipo_documento td ON td.id_tipo_documento = e.id_tipo_documento
+            LEFT JOIN grado g       ON g.id_grado = e.id_grado_actual
+            LEFT JOIN institucion i ON i.id_institucion = e.id_institucion""",
+        orden="e.apellidos, e.nombres, e.id_estudiante",
+        clave=["id_estudiante"],
+    )
+    # Los filtros solo tocan columnas de `estudiante e` (el conteo de
+    # estudiantes_list los reutiliza sin los JOIN)
+    f_institucion = args.get("f_institucion", type=int)
+    f_grado = args.get("f_grado", type=int)
+    f_documento = _texto(args, "f_documento")
+    if f_institucion:
+        consulta.filtrar("e.id_institucion = %s", f_institucion)
+    if f_grado:
+        consulta.filtrar("e.id_grado_actual = %s", f_grado)
+    if f_documento:
+        # Prefijo: así sigue usando el índice de numero_documento
+        consulta.filtrar("e.numero_documento LIKE %s", escapar_like(f_documento) + "%")
+    return consulta
+
+
+def periodos(args=None):
+    return Consulta(
+        campos=[
+            ("id_periodo", "id_periodo"),
+            ("nombre_periodo", "nombre_periodo"),
+            ("fecha_inicio", "fecha_inicio"),
+            ("fecha_fin", "fecha_fin"),
+            ("anio", "anio"),
+            ("activo", "(CURDATE() BETWEEN fecha_inicio AND fecha_fin)"),
+        ],
+        desde="periodo_academico",
+        orden="fecha_inicio",
+        clave=["id_periodo"],
+    )
+
+
+# ============================
+# 📊 REPORTES
+# ============================
+
+def reporte_asistencia_aula(args):
+    consulta = Consulta(
+        campos=[
+            ("id_clase", "ac.id_clase"),
+            ("semana", "sp.numero_semana"),
+            ("fecha_clase", "ac.fecha_clase"),
+            ("institucion", "i.nombre_institucion"),
+            ("sede", "s.nombre_sede"),
+            ("aula", "a.nombre_aula"),
+            ("es_festivo", "ac.es_festivo"),
+            ("se_dicto", "ac.se_dicto"),
+            ("horas_dictadas", "ac.horas_dictadas"),
+            ("horas_no_dictadas", "ac.horas_no_dictadas"),
+            ("motivo", "m.nombre_motivo"),
+            ("fecha_reposicion", "ac.fecha_reposicion"),
+            ("tutor", "CONCAT(pt.nombres, ' ', pt.apellidos)"),
+        ],
+        desde="asistencia_clase ac",
+        uniones=[
+            Union("a", "JOIN aula_programa a ON ac.id_aula = a.id_aula"),
+            Union("i", "JOIN institucion i ON a.id_institucion = i.id_institucion"),
+            Union("s", "LEFT JOIN sede s ON a.id_sede = s.id_sede", podable=True),
+            Union("sp", "LEFT JOIN semana_programa sp ON ac.id_semana = sp.id_semana", podable=True),
+            Union("m", "LEFT JOIN motivo_inasistencia m ON ac.id_motivo_no_dictada = m.id_motivo",
+                  podable=True),
+            Union("pt", "LEFT JOIN persona pt ON ac.id_tutor = pt.id_persona", podable=True),
+        ],
+        orden="sp.numero_semana, ac.fecha_clase, i.nombre_institucion, s.nombre_sede, a.nombre_aula",
+        clave=["id_clase"],
+    )
+    return aplicar(consulta, FILTROS_ASISTENCIA_AULA, args)
+
+
+FILTROS_ASISTENCIA_AULA = [
+    Contiene("f_institucion", "i.nombre_institucion"),
+    Contiene("f_sede", "s.nombre_sede"),
+    Contiene("f_aula", "a.nombre_aula"),
+    SEMANAS,
+]
+
+
+def reporte_asistencia_estudiante(args):
+    consulta = Consulta(
+        campos=[
+            ("id_clase", "ad.id_clase"),
+            ("id_estudiante", "ad.id_estudiante"),
+            ("semana", "sp.numero_semana"),
+            ("fecha_clase", "ac.fecha_clase"),
+            ("estudiante", "CONCAT(e.nombres, ' ', e.apellidos)"),
+            ("documento", "e.numero_documento"),
+            ("institucion", "i.nombre_institucion"),
+            ("sede", "s.nombre_sede"),
+            ("aula", "a.nombre_aula"),
+            ("programa", "a.programa"),
+            ("estado_asistencia", "ad.estado_asistencia"),
+            ("motivo_inasistencia", "ad.justificacion"),
+            ("fecha_reposicion", "ac.fecha_reposicion"),
+            ("tutor", "CONCAT(pt.nombres, ' ', pt.apellidos)"),
+        ],
+        desde="asistencia_detalle ad",
+        uniones=[
+            Union("ac", "JOIN asistencia_clase ac ON ad.id_clase = ac.id_clase"),
+            Union("a", "JOIN aula_programa a ON ac.id_aula = a.id_aula"),
+            Union("i", "JOIN institucion i ON a.id_institucion = i.id_institucion"),
+            Union("s", "LEFT JOIN sede s ON a.id_sede = s.id_sede", podable=True),
+            Union("e", "JOIN estudiante e ON ad.id_estudiante = e.id_estudiante"),
+            Union("sp", "LEFT JOIN semana_programa sp ON ac.id_semana = sp.id_semana", podable=True),
+            Union("pt", "LEFT JOIN persona pt ON ac.id_tutor = pt.id_persona", podable=True),
+        ],
+        orden="sp.numero_semana, ac.fecha_clase, estudiante",
+        clave=["id_clase", "id_estudiante"],
+    )
+    return aplicar(consulta, FILTROS_ASISTENCIA_ESTUDIANTE, args)
+
+
+FILTROS_ASISTENCIA_ESTUDIANTE = [
+    Igual("f_documento", "e.numero_documento"),
+    Contiene("f_nombre", "CONCAT(e.nombres, ' ', e.apellidos)"),
+    Contiene("f_institucion", "i.nombre_institucion"),
+    Igual("f_grado", "e.grado"),
+    Igual("f_programa", "a.programa"),
+    SEMANAS,
+]
+
+
+def reporte_boletin(args):
+    # Una fila por estudiante, aula y período, con la nota final que
+    # notas.py mantiene en nota_final a partir de las notas por componente
+    # (las notas antiguas por asignatura, sin componente, no salen; ver
+    # sql/009_nota_por_componente.sql)
+    consulta = Consulta(
+        campos=[
+            ("id_estudiante", "e.id_estudiante"),
+            ("id_periodo", "nf.id_periodo"),
+            ("id_aula", "nf.id_aula"),
+            ("numero_documento", "e.numero_documento"),
+            ("estudiante", "CONCAT(e.nombres, ' ', e.apellidos)"),
+            ("nombre_institucion", "i.nombre_institucion"),
+            ("nombre_aula", "a.nombre_aula"),
+            ("grado", "e.grado"),
+            ("nombre_periodo", "per.nombre_periodo"),
+            ("nombre_programa", "tp.nombre"),
+            ("nota_final", "nf.nota_final"),
+        ],
+        desde="""nota_final nf
+            JOIN estudiante e ON nf.id_estudiante = e.id_estudiante
+            JOIN aula_programa a ON nf.id_aula = a.id_aula
+            JOIN institucion i ON a.id_institucion = i.id_institucion
+            JOIN tipo_programa tp ON a.id_tipo_programa = tp.id_tipo_programa
+            JOIN periodo_academico per ON nf.id_periodo = per.id_periodo""",
+        orden="e.apellidos, e.nombres, per.fecha_inicio, a.nombre_aula",
+        clave=["id_estudiante", "id_periodo", "id_aula"],
+    )
+    return aplicar(consulta, FILTROS_BOLETIN, args)
+
+
+FILTROS_BOLETIN = [
+    Igual("f_documento", "e.numero_documento"),
+    Igual("f_periodo", "per.id_periodo", int),
+    Contiene("f_institucion", "i.nombre_institucion"),
+    Igual("f_grado", "e.grado"),
+]
+
+
+def reporte_comparativo_programa(args=None):
+    return Consulta(
+        campos=[
+            ("id_aula", "a.id_aula"),
+            ("nombre_aula", "a.nombre_aula"),
+            ("nombre_institucion", "i.nombre_institucion"),
+            ("total_estudiantes", "COUNT(DISTINCT e.id_estudiante)"),
+        ],
+        desde="""aula_programa a
+            LEFT JOIN institucion i ON a.id_institucion = i.id_institucion
+            LEFT JOIN matricula m ON m.id_aula = a.id_aula
+            LEFT JOIN estudiante e ON e.id_estudiante = m.id_estudiante""",
+        agrupar="a.id_aula, a.nombre_aula, i.nombre_institucion",
+        orden="i.nombre_institucion, a.nombre_aula",
+        clave=["id_aula"],
+    )
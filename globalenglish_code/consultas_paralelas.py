@@ -0,0 +1,150 @@
+# consultas_paralelas.py
+#
+# Carga en paralelo de consultas independientes (los combos de un
+# formulario, por ejemplo). En lugar de ejecutarlas una tras otra en la
+# misma conexión, cada una corre en un hilo con su propia conexión del
+# pool, así la página tarda lo que la consulta más lenta y no la suma.
+#
+# mysql-connector es bloqueante, así que el "puente" es un pool de hilos;
+# consultar_async() expone lo mismo para código asyncio.
+#
+#   datos = consultas_paralelas.consultar({
+#       "aulas":    ("SELECT ... FROM aula_programa ...", None),
+#       "periodos": ("SELECT ... WHERE anio = %s", (2025,)),
+#   })
+#   datos["aulas"]  -> lista de dicts
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+import arranque
+import metricas
+from config import DB_CONFIG, DB_POOL_TAMANO, CONSULTAS_PARALELAS
+
+_pool = None
+_pool_lock = threading.Lock()
+_hilos = None
+_en_uso = 0             # conexiones del pool prestadas ahora mismo
+
+
+@arranque.al_iniciar_worker
+def reiniciar():
+    """
+    Cada worker arma su propio pool y sus hilos: las conexiones abiertas
+    antes del fork no se pueden compartir entre procesos.
+    """
+    global _pool, _hilos, _en_uso
+    _pool = None
+    _en_uso = 0
+    _hilos = ThreadPoolExecutor(max_workers=CONSULTAS_PARALELAS,
+                                thread_name_prefix="consulta")
+
+
+reiniciar()
+
+
+def _obtener_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Sin reset de sesión al devolver: borraría las sentencias
+                # preparadas de repositorio.py. En autocommit, una lectura no
+                # deja abierta una transacción con una foto vieja de los datos.
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name="globalenglish", pool_size=DB_POOL_TAMANO,
+                    pool_reset_session=False, **dict(DB_CONFIG, autocommit=True)
+                )
+    return _pool
+
+
+def conexion():
+    """
+    Conexión del pool (se devuelve con devolver()). Si el pool está
+    agotado se abre una conexión normal en vez de esperar.
+    Lanza mysql.connector.Error si no se puede conectar.
+    """
+    global _en_uso
+    try:
+        conn = _obtener_pool().get_connection()
+        origen = "pool"
+    except PoolError:
+        origen = "directa"
+        try:
+            conn = mysql.connector.connect(**DB_CONFIG)
+        except mysql.connector.Error:
+            metricas.contar("ge_db_conexiones_fallidas_total", origen=origen)
+            raise
+    except mysql.connector.Error:
+        metricas.contar("ge_db_conexiones_fallidas_total", origen="pool")
+        raise
+    metricas.contar("ge_db_conexiones_total", origen=origen)
+    if origen == "pool":
+        with _pool_lock:
+            _en_uso += 1
+    return conn
+
+
+def devolver(conn):
+    """Devuelve al pool una conexión de conexion()."""
+    global _en_uso
+    if isinstance(conn, pooling.PooledMySQLConnection):
+        with _pool_lock:
+            _en_uso -= 1
+    conn.close()
+
+
+@metricas.colector
+def _medidores_pool():
+    return [
+        ("gauge", "ge_db_pool_en_uso", {}, _en_uso),
+        ("gauge", "ge_db_pool_tamano", {}, DB_POOL_TAMANO if _pool is not None else 0),
+    ]
+
+
+def _ejecutar(sql, params):
+    conn = conexion()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, params or ())
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    finally:
+        devolver(conn)
+
+
+def consultar(consultas):
+    """
+    Ejecuta a la vez las consultas {nombre: (sql, params)} y retorna
+    {nombre: filas}. Si alguna falla se lanza su mysql.connector.Error
+    (las demás terminan y devuelven su conexión al pool igual).
+    """
+    inicio = time.perf_counter()
+    try:
+        if len(consultas) == 1:
+            (nombre, (sql, params)), = consultas.items()
+            return {nombre: _ejecutar(sql, params)}
+        futuros = {nombre: _hilos.submit(_ejecutar, sql, params)
+                   for nombre, (sql, params) in consultas.items()}
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+    finally:
+        # Tiempo de pared de todo el grupo: es lo que la petición espera
+        metricas.sql(time.perf_counter() - inicio, consultas=len(consultas))
+
+
+async def consultar_async(consultas):
+    """Igual que consultar(), para usar con await desde código asyncio."""
+    loop = asyncio.get_running_loop()
+    nombres = list(consultas)
+    resultados = await asyncio.gather(*(
+        loop.run_in_executor(_hilos, _ejecutar, *consultas[nombre]) for nombre in nombres
+    ))
+    return dict(zip(nombres, resultados))
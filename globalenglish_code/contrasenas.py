@@ -0,0 +1,94 @@
+# contrasenas.py
+#
+# Política de hash de contraseñas.
+# - El método y sus parámetros (costo) se definen en config.py; si se suben,
+#   las cuentas viejas siguen funcionando y se re-hashean solas en el
+#   siguiente login correcto.
+# - La verificación (que es costosa a propósito) corre en un pool de hilos
+#   acotado: si llegan muchos logins a la vez (7 a.m.), esperan en una cola
+#   limitada en lugar de acaparar todos los hilos del servidor.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+import arranque
+
+from config import (PASSWORD_HASH_METODO, PASSWORD_SALT_LENGTH,
+                    PASSWORD_VERIFICADORES, PASSWORD_COLA_MAXIMA,
+                    PASSWORD_ESPERA_SEGUNDOS)
+
+
+class SistemaOcupado(Exception):
+    """Hay demasiados logins en cola; se le pide al usuario reintentar."""
+
+
+_pool = None
+_cupos = None
+
+
+@arranque.al_iniciar_worker
+def iniciar_pool():
+    """Crea el pool de verificación (de nuevo en cada worker: los hilos no sobreviven al fork)."""
+    global _pool, _cupos
+    _pool = ThreadPoolExecutor(max_workers=PASSWORD_VERIFICADORES,
+                               thread_name_prefix="verificar-pwd")
+    _cupos = threading.BoundedSemaphore(PASSWORD_VERIFICADORES + PASSWORD_COLA_MAXIMA)
+
+
+iniciar_pool()
+
+
+def _metodo_guardado():
+    """
+    Prefijo que Werkzeug guarda para el método configurado. Un método
+    abreviado ("scrypt", "pbkdf2:sha256") se guarda con sus parámetros por
+    defecto ("scrypt:32768:8:1", "pbkdf2:sha256:600000"); se calcula una
+    vez al importar con un hash de prueba.
+    """
+    return generate_password_hash("x", method=PASSWORD_HASH_METODO).partition("$")[0]
+
+
+_METODO = _metodo_guardado()
+
+
+def generar_hash(password):
+    """Hash con los parámetros vigentes de la política."""
+    return generate_password_hash(password, method=PASSWORD_HASH_METODO,
+                                  salt_length=PASSWORD_SALT_LENGTH)
+
+
+def necesita_rehash(password_hash):
+    """
+    True si el hash guardado se generó con otro método/costo.
+    Werkzeug guarda "metodo$sal$hash", p. ej. "scrypt:32768:8:1$...".
+    """
+    metodo, _, resto = (password_hash or "").partition("$")
+    sal = resto.partition("$")[0]
+    return metodo != _METODO or len(sal) != PASSWORD_SALT_LENGTH
+
+
+def verificar(password_hash, password):
+    """
+    Verifica la contraseña en el pool acotado.
+    Lanza SistemaOcupado si la cola está llena o la espera se agota.
+    """
+    if not password_hash or password is None:
+        return False
+
+    if not _cupos.acquire(timeout=PASSWORD_ESPERA_SEGUNDOS):
+        raise SistemaOcupado()
+    try:
+        futuro = _pool.submit(check_password_hash, password_hash, password)
+    except RuntimeError:
+        _cupos.release()
+        raise
+    # El cupo se libera cuando el hilo termina de verdad, no cuando nos
+    # cansamos de esperar; así la cola nunca supera el límite.
+    futuro.add_done_callback(lambda _: _cupos.release())
+
+    try:
+        return futuro.result(timeout=PASSWORD_ESPERA_SEGUNDOS)
+    except FuturesTimeout:
+        raise SistemaOcupado()
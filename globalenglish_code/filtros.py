@@ -0,0 +1,98 @@
+# filtros.py
+#
+# Filtros tipados de los reportes (los f_* de request.args). Cada filtro
+# sabe leer y convertir su parámetro y qué condición SQL aporta; aplicar()
+# los recorre en el orden en que se declararon, así que el SQL final no
+# depende del orden de los parámetros en la URL. Con k filtros un reporte
+# tiene a lo más 2^k formas de WHERE (menos en la práctica), y un rango
+# siempre produce la misma forma venga con uno o con los dos extremos.
+#
+# Un valor vacío o que no se puede convertir (?f_semana_ini=abc) se
+# ignora, igual que request.args.get(..., type=int).
+
+from abc import ABC, abstractmethod
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+def _texto(args, parametro):
+    return (args.get(parametro) or "").strip()
+
+
+def _convertir(texto, tipo):
+    if not texto:
+        return None
+    try:
+        return tipo(texto)
+    except ValueError:
+        return None
+
+
+def escapar_like(texto):
+    """Para que un % o _ escrito por el usuario se busque literal."""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Filtro(ABC):
+    """Un filtro de reporte: valor(args) -> valor tipado o None; condicion(valor) -> (sql, params)."""
+
+    def __init__(self, parametro, expresion, tipo=str):
+        self.parametro = parametro
+        self.expresion = expresion
+        self.tipo = tipo
+
+    def valor(self, args):
+        return _convertir(_texto(args, self.parametro), self.tipo)
+
+    @abstractmethod
+    def condicion(self, valor):
+        ...
+
+
+class Igual(Filtro):
+
+    def condicion(self, valor):
+        return f"{self.expresion} = %s", [valor]
+
+
+class Contiene(Filtro):
+
+    def condicion(self, valor):
+        return f"{self.expresion} LIKE %s", [f"%{escapar_like(valor)}%"]
+
+
+class Rango(Filtro):
+    """
+    Dos parámetros (desde, hasta), cualquiera opcional. Siempre produce
+    `expresion BETWEEN %s AND %s`; el extremo que falta se llena con el
+    mínimo o el máximo del tipo.
+    """
+
+    def __init__(self, parametro_desde, parametro_hasta, expresion, tipo=int,
+                 minimo=INT_MIN, maximo=INT_MAX):
+        super().__init__(parametro_desde, expresion, tipo)
+        self.parametro_hasta = parametro_hasta
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def valor(self, args):
+        desde = _convertir(_texto(args, self.parametro), self.tipo)
+        hasta = _convertir(_texto(args, self.parametro_hasta), self.tipo)
+        if desde is None and hasta is None:
+            return None
+        return (self.minimo if desde is None else desde,
+                self.maximo if hasta is None else hasta)
+
+    def condicion(self, valor):
+        return f"{self.expresion} BETWEEN %s AND %s", list(valor)
+
+
+def aplicar(consulta, filtros, args):
+    """Agrega a la Consulta las condiciones de los filtros presentes en args."""
+    for filtro in filtros:
+        valor = filtro.valor(args)
+        if valor is not None:
+            sql, params = filtro.condicion(valor)
+            consulta.filtrar(sql, *params)
+    return consulta
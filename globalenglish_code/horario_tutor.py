@@ -0,0 +1,213 @@
+# horario_tutor.py
+#
+# Caché por tutor del horario semanal (aulas + horarios asignados).
+# El horario casi no cambia durante el día, pero el tutor abre
+# "Mis aulas y horarios" muchas veces; aquí lo materializamos una vez
+# por tutor y lo reutilizamos hasta que cambie alguna asignación.
+#
+# La caché es de cada worker. Para que un cambio se note en todos, cada
+# cambio sube horario_version en la BD (desde la app o con los triggers de
+# sql/008_horario_version.sql) y cada worker revisa esa versión como mucho
+# cada REFRESCO_SEGUNDOS, igual que permisos.py; si cambió, descarta todo.
+
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import metricas
+
+# Tiempo máximo que vive una entrada aunque nadie la invalide
+# (por si alguien cambia asignaciones directamente en la BD).
+TTL_SEGUNDOS = 300
+REFRESCO_SEGUNDOS = 10
+
+# Zona de las horas de horario_aula (Colombia, sin horario de verano)
+ZONA_HORARIA = "America/Bogota"
+_DESFASE_ZONA = "-0500"
+
+_cache = {}
+_version = None
+_revisado = 0.0
+_lock = threading.Lock()
+
+# dia_semana puede venir como número (1 = lunes) o como nombre en español
+DIAS_ICS = {
+    1: "MO", 2: "TU", 3: "WE", 4: "TH", 5: "FR", 6: "SA", 7: "SU",
+    "LUNES": "MO", "MARTES": "TU", "MIERCOLES": "WE", "MIÉRCOLES": "WE",
+    "JUEVES": "TH", "VIERNES": "FR", "SABADO": "SA", "SÁBADO": "SA",
+    "DOMINGO": "SU",
+}
+_OFFSET_DIA = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+
+def _hora_a_texto(valor):
+    """MySQL devuelve las columnas TIME como timedelta; las pasamos a 'HH:MM'."""
+    if isinstance(valor, timedelta):
+        minutos = int(valor.total_seconds()) // 60
+        return f"{minutos // 60:02d}:{minutos % 60:02d}"
+    if hasattr(valor, "strftime"):
+        return valor.strftime("%H:%M")
+    return str(valor) if valor is not None else None
+
+
+def _normalizar(fila):
+    fila = dict(fila)
+    fila["hora_inicio"] = _hora_a_texto(fila.get("hora_inicio"))
+    fila["hora_fin"] = _hora_a_texto(fila.get("hora_fin"))
+    return fila
+
+
+def _revisar_version(leer_version, ahora):
+    """Vacía la caché si otro worker (o la BD) cambió horario_version."""
+    global _version, _revisado
+    with _lock:
+        if ahora - _revisado < REFRESCO_SEGUNDOS:
+            return
+        _revisado = ahora
+    version = leer_version()
+    if version is None:
+        return
+    with _lock:
+        if version != _version:
+            _cache.clear()
+            _version = version
+
+
+def obtener(id_tutor, cargar, leer_version):
+    """
+    Retorna la entrada en caché del tutor: {"filas", "etag", "generado"}.
+    `cargar` es una función sin argumentos que consulta la BD; solo se
+    llama si no hay entrada vigente. Si retorna None (error de BD) no se
+    guarda nada en caché. `leer_version()` retorna horario_version (None si
+    no se pudo leer).
+    """
+    ahora = time.monotonic()
+    _revisar_version(leer_version, ahora)
+    with _lock:
+        entrada = _cache.get(id_tutor)
+        if entrada and ahora - entrada["creado"] < TTL_SEGUNDOS:
+            metricas.contar("ge_cache_aciertos_total", cache="horario_tutor")
+            return entrada
+
+    metricas.contar("ge_cache_fallos_total", cache="horario_tutor")
+    filas = cargar()
+    if filas is None:
+        return None
+
+    filas = [_normalizar(f) for f in filas]
+    cuerpo = json.dumps(filas, sort_keys=True, default=str).encode("utf-8")
+    entrada = {
+        "filas": filas,
+        "etag": hashlib.sha1(cuerpo).hexdigest(),
+        "generado": datetime.now(),
+        "creado": ahora,
+        "ics": None,
+    }
+    with _lock:
+        _cache[id_tutor] = entrada
+    return entrada
+
+
+def invalidar(id_tutor=None):
+    """
+    Borra el horario de un tutor, o de todos si no se indica cuál, en este
+    worker. Los demás se enteran por horario_version: quien cambia datos
+    del horario debe subirla en la misma transacción.
+    """
+    global _revisado
+    with _lock:
+        if id_tutor is None:
+            _cache.clear()
+        else:
+            _cache.pop(id_tutor, None)
+        _revisado = 0.0
+
+
+# ============================
+# 📅 EXPORTAR A iCALENDAR
+# ============================
+
+def _escapar_ics(texto):
+    texto = str(texto or "")
+    return (texto.replace("\\", "\\\\").replace(";", "\\;")
+                 .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _plegar(linea):
+    """Parte una línea de más de 75 octetos (RFC 5545 §3.1) sin cortar caracteres UTF-8."""
+    partes, actual, octetos, limite = [], [], 0, 75
+    for caracter in linea:
+        n = len(caracter.encode("utf-8"))
+        if octetos + n > limite:
+            partes.append("".join(actual))
+            # la continuación empieza con un espacio, que también cuenta
+            actual, octetos, limite = [], 0, 74
+        actual.append(caracter)
+        octetos += n
+    partes.append("".join(actual))
+    return "\r\n ".join(partes)
+
+
+def _dia_ics(dia_semana):
+    if isinstance(dia_semana, str):
+        clave = dia_semana.strip().upper()
+        if clave.isdigit():
+            return DIAS_ICS.get(int(clave))
+        return DIAS_ICS.get(clave)
+    return DIAS_ICS.get(dia_semana)
+
+
+def generar_ics(id_tutor, entrada):
+    """
+    Arma el calendario (RFC 5545) con un evento semanal recurrente por
+    cada bloque de horario. Se guarda dentro de la misma entrada de caché
+    para no regenerarlo en cada consulta del cliente de calendario.
+    """
+    if entrada.get("ics"):
+        return entrada["ics"]
+
+    lunes = date.today() - timedelta(days=date.today().weekday())
+    # DTSTAMP va siempre en UTC (generado es hora local del servidor)
+    marca = entrada["generado"].astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    lineas = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//GLOBALENGLISH//Horario tutor//ES",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:GLOBALENGLISH - Mis clases",
+        "BEGIN:VTIMEZONE",
+        f"TZID:{ZONA_HORARIA}",
+        "BEGIN:STANDARD",
+        "DTSTART:19700101T000000",
+        f"TZOFFSETFROM:{_DESFASE_ZONA}",
+        f"TZOFFSETTO:{_DESFASE_ZONA}",
+        "TZNAME:-05",
+        "END:STANDARD",
+        "END:VTIMEZONE",
+    ]
+    for i, fila in enumerate(entrada["filas"]):
+        dia = _dia_ics(fila.get("dia_semana"))
+        if not dia or not fila.get("hora_inicio") or not fila.get("hora_fin"):
+            continue
+        fecha = lunes + timedelta(days=_OFFSET_DIA[dia])
+        inicio = fila["hora_inicio"].replace(":", "")[:4] + "00"
+        fin = fila["hora_fin"].replace(":", "")[:4] + "00"
+        resumen = f"{fila.get('nombre_aula')} - {fila.get('institucion')}"
+        lineas += [
+            "BEGIN:VEVENT",
+            f"UID:tutor{id_tutor}-aula{fila.get('id_aula')}-{i}@globalenglish",
+            f"DTSTAMP:{marca}",
+            f"DTSTART;TZID={ZONA_HORARIA}:{fecha:%Y%m%d}T{inicio}",
+            f"DTEND;TZID={ZONA_HORARIA}:{fecha:%Y%m%d}T{fin}",
+            f"RRULE:FREQ=WEEKLY;BYDAY={dia}",
+            f"SUMMARY:{_escapar_ics(resumen)}",
+            f"LOCATION:{_escapar_ics(fila.get('sede'))}",
+            "END:VEVENT",
+        ]
+    lineas.append("END:VCALENDAR")
+
+    entrada["ics"] = "\r\n".join(map(_plegar, lineas)) + "\r\n"
+    return entrada["ics"]
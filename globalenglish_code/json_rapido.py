@@ -0,0 +1,63 @@
+# json_rapido.py
+#
+# Serialización JSON rápida para la API y para jsonify().
+# Con orjson (extensión en Rust) serializar una página de miles de filas
+# cuesta una fracción de lo que cuesta con el módulo json estándar.
+# orjson es opcional: sin él se usa json con el mismo manejo de tipos.
+#
+# Tipos de MySQL que json no sabe serializar:
+#   date / datetime -> "2024-03-01" / "2024-03-01T07:30:00" (ISO 8601)
+#   Decimal         -> número (las notas y horas tienen pocos decimales)
+#   timedelta       -> "HH:MM:SS" (columnas TIME de MySQL)
+#   bytes / set     -> texto / lista
+
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa json estándar
+    orjson = None
+
+
+def _por_defecto(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, timedelta):
+        segundos = int(valor.total_seconds())
+        signo = "-" if segundos < 0 else ""
+        h, resto = divmod(abs(segundos), 3600)
+        return f"{signo}{h:02d}:{resto // 60:02d}:{resto % 60:02d}"
+    if isinstance(valor, (datetime, date)):  # solo llega aquí con json estándar
+        return valor.isoformat()
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.decode("utf-8", "replace")
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    raise TypeError(f"Tipo no serializable a JSON: {type(valor).__name__}")
+
+
+def dumps(obj):
+    """Serializa a bytes UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_por_defecto, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """Hace que jsonify() use dumps() de este módulo."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def registrar(app):
+    app.json = ProveedorJSON(app)
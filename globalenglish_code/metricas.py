@@ -0,0 +1,441 @@
+# metricas.py
+#
+# Métricas en formato Prometheus en /metrics, sin dependencias externas.
+#
+# Cada worker acumula en memoria (contadores e histogramas bajo un lock,
+# unos microsegundos por petición) y cada METRICAS_INTERVALO_SEGUNDOS
+# vuelca una foto a un archivo propio (<pid>.json) en METRICAS_DIR.
+# /metrics lo atiende cualquier worker: primero escribe su propia foto y
+# luego suma las de todos. Así el resultado es el del servidor completo y
+# no el del worker que contestó.
+# - Contadores e histogramas de workers que ya terminaron (reciclados por
+#   GE_MAX_PETICIONES) se siguen sumando, para que los totales no bajen.
+# - Los medidores (gauges) solo se suman de workers vivos.
+#
+# Qué se mide:
+#   ge_http_peticiones_total{endpoint,metodo,estado}
+#   ge_http_duracion_segundos{endpoint}          (hasta que la vista retorna;
+#                                                 en streaming es el primer byte)
+#   ge_sql_segundos_por_peticion{endpoint}       (execute + fetch)
+#   ge_sql_consultas_total / ge_sql_segundos_total
+#   ge_db_conexiones_total{origen} / ge_db_conexiones_fallidas_total{origen}
+#   ge_db_pool_en_uso / ge_db_pool_tamano
+#   ge_cache_aciertos_total{cache} / ge_cache_fallos_total{cache} / ge_cache_entradas{cache}
+#   ge_plantilla_render_segundos{plantilla}
+#   ge_proceso_memoria_bytes{pid} / ge_proceso_hilos{pid} / ge_db_conexiones_abiertas{pid}
+#   ge_log_descartados_total
+#   ge_sql_preparadas_total{resultado}           (ver repositorio.py)
+#   ge_db_replica_retraso_segundos{replica,pid} / ge_db_lecturas_primaria_total{motivo}
+#                                                (ver replicas.py)
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+import arranque
+import cache
+from config import METRICAS_DIR, METRICAS_INTERVALO_SEGUNDOS, METRICAS_TOKEN
+
+log = logging.getLogger(__name__)
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+AYUDA = {
+    "ge_http_peticiones_total": ("counter", "Peticiones atendidas."),
+    "ge_http_duracion_segundos": ("histogram", "Duración de la vista (en streaming, hasta el primer byte)."),
+    "ge_sql_segundos_por_peticion": ("histogram", "Tiempo en SQL por petición."),
+    "ge_sql_consultas_total": ("counter", "Consultas SQL ejecutadas."),
+    "ge_sql_segundos_total": ("counter", "Tiempo total en SQL."),
+    "ge_db_conexiones_total": ("counter", "Conexiones a MySQL obtenidas."),
+    "ge_db_conexiones_fallidas_total": ("counter", "Intentos de conexión a MySQL fallidos."),
+    "ge_db_pool_en_uso": ("gauge", "Conexiones del pool prestadas en este momento."),
+    "ge_db_pool_tamano": ("gauge", "Tamaño configurado del pool (suma de workers)."),
+    "ge_cache_aciertos_total": ("counter", "Aciertos de caché."),
+    "ge_cache_fallos_total": ("counter", "Fallos de caché."),
+    "ge_cache_entradas": ("gauge", "Entradas guardadas en caché."),
+    "ge_plantilla_render_segundos": ("histogram", "Tiempo de render por plantilla."),
+    "ge_log_descartados_total": ("counter", "Registros de log descartados por cola llena."),
+    "ge_db_conexiones_abiertas": ("gauge", "Conexiones directas abiertas sin cerrar, por worker."),
+    "ge_proceso_memoria_bytes": ("gauge", "Memoria residente (RSS) del worker."),
+    "ge_proceso_hilos": ("gauge", "Hilos vivos en el worker."),
+    "ge_sql_preparadas_total": ("counter", "Sentencias preparadas: nuevas vs. reusadas de la caché por conexión."),
+    "ge_db_replica_retraso_segundos": ("gauge", "Último retraso medido de cada réplica (-1: no replica o no responde)."),
+    "ge_db_lecturas_primaria_total": ("counter", "Lecturas enviables a réplica que fueron a la primaria, por motivo."),
+}
+
+_lock = threading.Lock()
+_contadores = {}    # (nombre, labels) -> valor
+_histogramas = {}   # (nombre, labels) -> [conteo por bucket..., suma, n]
+_colectores = []    # funciones que retornan [(tipo, nombre, labels, valor)]
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def contar(nombre, valor=1, **labels):
+    clave = (nombre, _labels(labels))
+    with _lock:
+        _contadores[clave] = _contadores.get(clave, 0) + valor
+
+
+def observar(nombre, segundos, **labels):
+    clave = (nombre, _labels(labels))
+    with _lock:
+        h = _histogramas.get(clave)
+        if h is None:
+            h = _histogramas[clave] = [0] * (len(BUCKETS_SEGUNDOS) + 2)
+        for i, limite in enumerate(BUCKETS_SEGUNDOS):
+            if segundos <= limite:
+                h[i] += 1
+                break
+        h[-2] += segundos
+        h[-1] += 1
+
+
+def valor(nombre, **labels):
+    """Valor actual de un contador de este proceso (lo usan los benchmarks)."""
+    with _lock:
+        return _contadores.get((nombre, _labels(labels)), 0)
+
+
+def colector(f):
+    """
+    Decorador: f() se llama al volcar la foto y retorna una lista de
+    ("counter" | "gauge", nombre, {labels}, valor). Sirve para valores que
+    ya se llevan en otro lado (contadores de las cachés, tamaño del pool).
+    """
+    _colectores.append(f)
+    return f
+
+
+@colector
+def _caches():
+    valores = []
+    for c in cache.instancias:
+        e = c.estadisticas()
+        valores += [
+            ("counter", "ge_cache_aciertos_total", {"cache": c.nombre}, e["aciertos"]),
+            ("counter", "ge_cache_fallos_total", {"cache": c.nombre}, e["fallos"]),
+            ("gauge", "ge_cache_entradas", {"cache": c.nombre}, e["entradas"]),
+        ]
+    return valores
+
+
+def _memoria_residente():
+    """RSS del proceso en bytes (Linux; en otros sistemas el pico, vía getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@colector
+def _proceso():
+    # Con el pid como label cada worker es su propia serie: así se ve cuál crece
+    pid = {"pid": os.getpid()}
+    return [
+        ("gauge", "ge_proceso_memoria_bytes", pid, _memoria_residente()),
+        ("gauge", "ge_proceso_hilos", pid, threading.active_count()),
+        ("gauge", "ge_db_conexiones_abiertas", pid, _abiertas),
+    ]
+
+
+# ============================
+# 🗄️ SQL
+# ============================
+
+def sql(segundos, consultas=1):
+    """Registra tiempo en SQL (global y, si hay petición en curso, de la petición)."""
+    if consultas:
+        contar("ge_sql_consultas_total", consultas)
+    contar("ge_sql_segundos_total", segundos)
+    if has_request_context():
+        g._metricas_sql = g.get("_metricas_sql", 0.0) + segundos
+
+
+class _CursorMedido:
+    """Cursor de mysql-connector que mide execute y fetch*; el resto pasa directo."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @staticmethod
+    def _medir(consultas, metodo, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            sql(time.perf_counter() - t0, consultas)
+
+    def execute(self, operacion, *args, **kwargs):
+        if has_request_context():
+            g._ultimo_sql = operacion   # para la huella SQL en los logs (registro.py)
+        return self._medir(1, self._cursor.execute, operacion, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._medir(1, self._cursor.executemany, *args, **kwargs)
+
+    def fetchone(self):
+        return self._medir(0, self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._medir(0, self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._medir(0, self._cursor.fetchall)
+
+
+def medir_cursor(cursor):
+    """Envuelve un cursor obtenido por fuera de ConexionMedida (p. ej. del pool)."""
+    return _CursorMedido(cursor)
+
+
+_abiertas = 0           # ConexionMedida creadas y aún sin close()
+
+
+class ConexionMedida:
+    """
+    Envuelve una conexión para que sus cursores midan el tiempo en SQL.
+    También lleva la cuenta de conexiones abiertas: si crece sin carga,
+    alguna vista no está cerrando la suya.
+    """
+
+    def __init__(self, conn):
+        global _abiertas
+        self._conn = conn
+        self._cerrada = False
+        with _lock:
+            _abiertas += 1
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+    def cursor(self, *args, **kwargs):
+        return _CursorMedido(self._conn.cursor(*args, **kwargs))
+
+    def close(self):
+        global _abiertas
+        if not self._cerrada:
+            self._cerrada = True
+            with _lock:
+                _abiertas -= 1
+        return self._conn.close()
+
+
+# ============================
+# 🌐 PETICIONES
+# ============================
+
+def _al_iniciar_peticion():
+    g._metricas_inicio = time.perf_counter()
+
+
+def _registrar_peticion(estado):
+    inicio = g.pop("_metricas_inicio", None)
+    if inicio is None:
+        return
+    endpoint = request.endpoint or "sin_ruta"
+    contar("ge_http_peticiones_total", endpoint=endpoint, metodo=request.method, estado=estado)
+    observar("ge_http_duracion_segundos", time.perf_counter() - inicio, endpoint=endpoint)
+    observar("ge_sql_segundos_por_peticion", g.pop("_metricas_sql", 0.0), endpoint=endpoint)
+
+
+def _al_responder(resp):
+    _registrar_peticion(resp.status_code)
+    return resp
+
+
+def _al_terminar(exc):
+    # Solo llega con la marca de inicio si la vista lanzó una excepción
+    if exc is not None:
+        _registrar_peticion(500)
+
+
+# ============================
+# 📁 FOTOS POR WORKER Y AGREGACIÓN
+# ============================
+
+def _archivo(pid):
+    return os.path.join(METRICAS_DIR, f"{pid}.json")
+
+
+def _foto():
+    with _lock:
+        contadores = dict(_contadores)
+        histogramas = {clave: list(h) for clave, h in _histogramas.items()}
+    medidores = {}
+    for f in _colectores:
+        try:
+            for tipo, nombre, labels, valor in f():
+                clave = (nombre, _labels(labels))
+                destino = contadores if tipo == "counter" else medidores
+                destino[clave] = destino.get(clave, 0) + valor
+        except Exception as e:  # una métrica rota no debe tumbar /metrics
+            log.exception("Error en colector de métricas %s: %s", f.__name__, e)
+    return {
+        "pid": os.getpid(),
+        "contadores": [[n, list(l), v] for (n, l), v in contadores.items()],
+        "histogramas": [[n, list(l), h] for (n, l), h in histogramas.items()],
+        "medidores": [[n, list(l), v] for (n, l), v in medidores.items()],
+    }
+
+
+def volcar():
+    """Escribe la foto de este worker (escritura atómica: tmp + rename)."""
+    os.makedirs(METRICAS_DIR, exist_ok=True)
+    destino = _archivo(os.getpid())
+    temporal = f"{destino}.{threading.get_ident()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(_foto(), f, separators=(",", ":"))
+    os.replace(temporal, destino)
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _agregar():
+    contadores, histogramas, medidores = {}, {}, {}
+    for ruta in glob.glob(os.path.join(METRICAS_DIR, "*.json")):
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                foto = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for n, l, v in foto["contadores"]:
+            clave = (n, tuple(map(tuple, l)))
+            contadores[clave] = contadores.get(clave, 0) + v
+        for n, l, h in foto["histogramas"]:
+            clave = (n, tuple(map(tuple, l)))
+            acumulado = histogramas.get(clave)
+            histogramas[clave] = h if acumulado is None else [a + b for a, b in zip(acumulado, h)]
+        if _vivo(foto["pid"]):
+            for n, l, v in foto["medidores"]:
+                clave = (n, tuple(map(tuple, l)))
+                medidores[clave] = medidores.get(clave, 0) + v
+    return contadores, histogramas, medidores
+
+
+def _escapar(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    partes = [f'{k}="{_escapar(v)}"' for k, v in tuple(labels) + tuple(extra)]
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def texto_prometheus():
+    contadores, histogramas, medidores = _agregar()
+    por_nombre = {}
+    for (n, l), v in list(contadores.items()) + list(medidores.items()):
+        por_nombre.setdefault(n, []).append((l, v))
+    for (n, l), h in histogramas.items():
+        por_nombre.setdefault(n, []).append((l, h))
+
+    lineas = []
+    for nombre in sorted(por_nombre):
+        tipo, ayuda = AYUDA.get(nombre, ("untyped", nombre))
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for labels, valor in sorted(por_nombre[nombre]):
+            if tipo != "histogram":
+                lineas.append(f"{nombre}{_fmt_labels(labels)} {_numero(valor)}")
+                continue
+            acumulado = 0
+            for limite, n in zip(BUCKETS_SEGUNDOS, valor):
+                acumulado += n
+                lineas.append(f"{nombre}_bucket{_fmt_labels(labels, [('le', repr(limite))])} {acumulado}")
+            lineas.append(f"{nombre}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {valor[-1]}")
+            lineas.append(f"{nombre}_sum{_fmt_labels(labels)} {_numero(valor[-2])}")
+            lineas.append(f"{nombre}_count{_fmt_labels(labels)} {valor[-1]}")
+    return "\n".join(lineas) + "\n"
+
+
+def _permitido():
+    if METRICAS_TOKEN:
+        return request.headers.get("Authorization") == f"Bearer {METRICAS_TOKEN}"
+    # Sin token solo se responde a la misma máquina (p. ej. un agente local)
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+
+def vista_metricas():
+    if not _permitido():
+        return Response("forbidden\n", status=403, mimetype="text/plain")
+    volcar()
+    return Response(texto_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+# ============================
+# 🔁 CICLO DE VIDA
+# ============================
+
+def _volcar_periodicamente():
+    while True:
+        time.sleep(METRICAS_INTERVALO_SEGUNDOS)
+        try:
+            volcar()
+        except OSError as e:
+            log.error("Error escribiendo métricas: %s", e)
+
+
+_hilo_volcado = None
+
+
+def _iniciar_hilo():
+    global _hilo_volcado
+    _hilo_volcado = threading.Thread(target=_volcar_periodicamente, name="metricas", daemon=True)
+    _hilo_volcado.start()
+
+
+@arranque.al_iniciar_worker
+def _despues_del_fork():
+    # Lo medido en el maestro durante el precalentamiento no es de este worker
+    global _abiertas
+    with _lock:
+        _abiertas = 0
+        _contadores.clear()
+        _histogramas.clear()
+    _iniciar_hilo()
+
+
+def limpiar():
+    """Borra las fotos de una ejecución anterior (se llama al arrancar el maestro)."""
+    for ruta in glob.glob(os.path.join(METRICAS_DIR, "*.json")):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+def registrar(app):
+    app.before_request(_al_iniciar_peticion)
+    app.after_request(_al_responder)
+    app.teardown_request(_al_terminar)
+    app.add_url_rule("/metrics", "metricas", vista_metricas)
+    if _hilo_volcado is None:
+        _iniciar_hilo()
@@ -0,0 +1,359 @@
+# notas.py
+#
+# Guardado de notas por componente: la planilla de un aula (todo el
+# listado de una vez) y la importación de un CSV de toda una institución.
+# Las dos terminan en guardar(): un INSERT ... ON DUPLICATE KEY UPDATE
+# por cada LOTE filas, todos dentro de una sola transacción. Una planilla
+# de 40 estudiantes es una sentencia y un CSV de miles de filas, unas
+# pocas; o se guarda todo o nada. En la planilla, vaciar una celda borra
+# esa nota (y la nota final del estudiante se recalcula o se borra). La llave única que resuelve el
+# "ON DUPLICATE" es la de sql/005_notas_componente.sql.
+#
+# La nota final se guarda una vez por estudiante, aula y período, en la
+# tabla nota_final (sql/010_nota_final.sql), y se mantiene al guardar: en
+# la misma transacción se recalcula solo la de los estudiantes tocados
+# (sus pocas filas de componentes), no la de todo el curso. Si cambian
+# los porcentajes de un programa, recalcular_programa() lo hace para todos
+# sus estudiantes en una sola sentencia. Para comprobarlo contra un
+# cálculo desde cero:
+#     python notas.py              # lista diferencias; sale con 1 si hay
+#     python notas.py --corregir   # además recalcula todo
+#
+# Las lecturas (planilla actual, matrículas de la institución) están en
+# repositorio.py; el boletín (consultas.reporte_boletin) lee nota_final.
+# Las filas de nota no llevan id_asignatura (nullable desde
+# sql/009_nota_por_componente.sql).
+
+import argparse
+import csv
+import io
+import itertools
+import sys
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from mysql.connector import Error
+
+NOTA_MINIMA = Decimal("0.0")
+NOTA_MAXIMA = Decimal("5.0")
+LOTE = 500                  # filas por INSERT (el paquete queda muy por debajo de max_allowed_packet)
+ERRORES_MAXIMOS = 20        # los que se muestran de un CSV con problemas
+
+COLUMNAS = ("id_estudiante", "id_aula", "id_periodo", "id_componente", "valor")
+
+# Encabezados aceptados en el CSV -> columna
+_ENCABEZADOS = {
+    "documento": "documento", "numero_documento": "documento",
+    "nota": "nota", "valor": "nota",
+    "id_aula": "id_aula", "aula": "id_aula",
+}
+
+
+class NotaInvalida(ValueError):
+    pass
+
+
+def convertir(texto):
+    """'4,5' o '4.5' -> Decimal('4.5'); vacío -> None. Lanza NotaInvalida."""
+    texto = (texto or "").strip().replace(",", ".")
+    if not texto:
+        return None
+    try:
+        valor = Decimal(texto)
+    except InvalidOperation:
+        raise NotaInvalida(f"«{texto}» no es un número") from None
+    if not NOTA_MINIMA <= valor <= NOTA_MAXIMA:
+        raise NotaInvalida(f"{texto} está fuera del rango {NOTA_MINIMA}–{NOTA_MAXIMA}")
+    return valor.quantize(Decimal("0.01"))
+
+
+def _sql_lote(n):
+    fila = "(" + ", ".join(["%s"] * len(COLUMNAS)) + ")"
+    return (
+        f"INSERT INTO nota ({', '.join(COLUMNAS)}) VALUES "
+        + ", ".join([fila] * n)
+        + " ON DUPLICATE KEY UPDATE valor = VALUES(valor)"
+    )
+
+
+def _sql_borrar(n):
+    return ("DELETE FROM nota WHERE (id_estudiante, id_aula, id_periodo, id_componente) IN ("
+            + ", ".join(["(%s, %s, %s, %s)"] * n) + ")")
+
+
+def guardar(conn, filas, borrar=()):
+    """
+    Inserta o actualiza las filas (id_estudiante, id_aula, id_periodo,
+    id_componente, valor), borra las notas de `borrar` (id_estudiante,
+    id_aula, id_periodo, id_componente) y recalcula la nota final de esos
+    estudiantes, en una sola transacción. Retorna cuántas filas se
+    enviaron. Si algo falla deshace todo y lanza mysql.connector.Error.
+    """
+    borrar = list(borrar)
+    if not filas and not borrar:
+        return 0
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        for i in range(0, len(filas), LOTE):
+            lote = filas[i:i + LOTE]
+            cursor.execute(_sql_lote(len(lote)), [valor for fila in lote for valor in fila])
+        for i in range(0, len(borrar), LOTE):
+            lote = borrar[i:i + LOTE]
+            cursor.execute(_sql_borrar(len(lote)), [valor for fila in lote for valor in fila])
+        recalcular_estudiantes(cursor, {fila[:3] for fila in filas} | {fila[:3] for fila in borrar})
+        if borrar:
+            _quitar_sin_notas(cursor, {fila[:3] for fila in borrar})
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(filas)
+
+
+# ============================
+# 🧮 NOTA FINAL
+# ============================
+# nota_final = Σ valor × porcentaje / 100 sobre los componentes con nota
+# del estudiante en el aula y el período (uno sin nota cuenta como 0),
+# redondeada a 2 decimales. Se guarda una sola vez por grupo, en la tabla
+# nota_final.
+
+_SQL_RECALCULAR = """
+    INSERT INTO nota_final (id_estudiante, id_aula, id_periodo, nota_final)
+    SELECT x.id_estudiante, x.id_aula, x.id_periodo,
+           ROUND(SUM(x.valor * c.porcentaje) / 100, 2)
+    FROM nota x
+    JOIN componente_nota c ON c.id_componente = x.id_componente
+    WHERE {filtro}
+    GROUP BY x.id_estudiante, x.id_aula, x.id_periodo
+    ON DUPLICATE KEY UPDATE nota_final = VALUES(nota_final)
+"""
+
+
+def recalcular_estudiantes(cursor, claves):
+    """
+    nota_final de los grupos (id_estudiante, id_aula, id_periodo) dados.
+    El índice ix_nota_estudiante_aula_periodo (sql/010) lleva a las pocas
+    filas de cada grupo, así que el costo depende de cuántos estudiantes
+    cambiaron y no del tamaño del curso.
+    """
+    claves = list(claves)
+    for i in range(0, len(claves), LOTE):
+        lote = claves[i:i + LOTE]
+        filtro = ("(x.id_estudiante, x.id_aula, x.id_periodo) IN ("
+                  + ", ".join(["(%s, %s, %s)"] * len(lote)) + ")")
+        cursor.execute(_SQL_RECALCULAR.format(filtro=filtro),
+                       [v for clave in lote for v in clave])
+
+
+def _quitar_sin_notas(cursor, claves):
+    """Borra la nota_final de los grupos dados que se quedaron sin notas por componente."""
+    claves = list(claves)
+    for i in range(0, len(claves), LOTE):
+        lote = claves[i:i + LOTE]
+        cursor.execute(f"""
+            DELETE f FROM nota_final f
+            WHERE (f.id_estudiante, f.id_aula, f.id_periodo) IN (
+                      {", ".join(["(%s, %s, %s)"] * len(lote))})
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM nota x
+                  JOIN componente_nota c ON c.id_componente = x.id_componente
+                  WHERE x.id_estudiante = f.id_estudiante
+                    AND x.id_aula = f.id_aula
+                    AND x.id_periodo = f.id_periodo)
+        """, [v for clave in lote for v in clave])
+
+
+def recalcular_programa(cursor, id_tipo_programa):
+    """
+    nota_final de todos los estudiantes con notas en componentes del
+    programa, en una sola sentencia (tras cambiar sus porcentajes). Corre
+    en la transacción de quien llama.
+    """
+    cursor.execute(_SQL_RECALCULAR.format(filtro="c.id_tipo_programa = %s"), (id_tipo_programa,))
+
+
+def _calcular(valores_y_porcentajes):
+    total = sum(Decimal(str(valor)) * Decimal(str(porcentaje))
+                for valor, porcentaje in valores_y_porcentajes)
+    return (total / 100).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def verificar(conn):
+    """
+    Recalcula desde cero, en Python y sin usar _SQL_RECALCULAR, la
+    nota_final de cada grupo y la compara con la guardada (None si falta).
+    Retorna [(id_estudiante, id_aula, id_periodo, guardada, calculada)].
+    """
+    cursor = conn.cursor()      # sin buffer: la tabla se recorre una vez
+    try:
+        cursor.execute("""
+            SELECT n.id_estudiante, n.id_aula, n.id_periodo,
+                   n.valor, c.porcentaje, f.nota_final
+            FROM nota n
+            JOIN componente_nota c ON c.id_componente = n.id_componente
+            LEFT JOIN nota_final f ON f.id_estudiante = n.id_estudiante
+                                  AND f.id_aula = n.id_aula
+                                  AND f.id_periodo = n.id_periodo
+            ORDER BY n.id_estudiante, n.id_aula, n.id_periodo
+        """)
+        diferencias = []
+        for clave, filas in itertools.groupby(cursor, key=lambda f: f[:3]):
+            filas = list(filas)
+            calculada = _calcular((f[3], f[4]) for f in filas)
+            guardada = filas[0][5]
+            if guardada != calculada:
+                diferencias.append((*clave, guardada, calculada))
+        return diferencias
+    finally:
+        cursor.close()
+
+
+def recalcular_todo(conn):
+    """
+    Recalcula toda la tabla nota_final en una transacción. Sin
+    start_transaction(): la conexión no usa autocommit y quien llama
+    (main, tras verificar) puede tener ya una abierta; el commit la cierra.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_SQL_RECALCULAR.format(filtro="1 = 1"))
+        filas = cursor.rowcount
+        conn.commit()
+        return filas
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# ============================
+# 📋 PLANILLA
+# ============================
+
+def leer_planilla(formulario, estudiantes):
+    """
+    Notas del formulario de la planilla (campos nota_<id_estudiante>),
+    solo de los estudiantes de la lista. Retorna ({id_estudiante: valor},
+    {ids con el campo enviado vacío}, {id_estudiante: error}); quien llama
+    borra la nota ya registrada de los vacíos.
+    """
+    valores, vacios, errores = {}, set(), {}
+    for e in estudiantes:
+        id_estudiante = e["id_estudiante"]
+        campo = f"nota_{id_estudiante}"
+        try:
+            valor = convertir(formulario.get(campo))
+        except NotaInvalida as ex:
+            errores[id_estudiante] = str(ex)
+            continue
+        if valor is not None:
+            valores[id_estudiante] = valor
+        elif campo in formulario:
+            vacios.add(id_estudiante)
+    return valores, vacios, errores
+
+
+# ============================
+# 📥 IMPORTACIÓN CSV
+# ============================
+
+def _texto_csv(datos):
+    try:
+        return datos.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return datos.decode("latin-1")     # CSV guardado desde Excel en Windows
+
+
+def _campo(registro, indice, nombre):
+    i = indice.get(nombre)
+    return registro[i].strip() if i is not None and i < len(registro) else ""
+
+
+def leer_csv(datos, matriculas):
+    """
+    Lee un CSV con columnas documento y nota (y opcionalmente id_aula, para
+    estudiantes matriculados en más de un aula de la institución), separado
+    por coma o punto y coma. `matriculas` son las filas de
+    repositorio.matriculas_institucion().
+    Retorna ([(id_estudiante, id_aula, valor)], [errores]).
+    """
+    texto = _texto_csv(datos)
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(io.StringIO(texto), dialecto)
+
+    encabezado = [_ENCABEZADOS.get(c.strip().lower()) for c in next(lector, [])]
+    if "documento" not in encabezado or "nota" not in encabezado:
+        return [], ["El archivo debe tener las columnas «documento» y «nota»."]
+    indice = {columna: i for i, columna in enumerate(encabezado) if columna}
+
+    aulas_por_documento = {}
+    for m in matriculas:
+        aulas_por_documento.setdefault(str(m["numero_documento"]), {})[m["id_aula"]] = m["id_estudiante"]
+
+    filas, errores, vistos = [], [], set()
+    for linea, registro in enumerate(lector, start=2):
+        if not any(c.strip() for c in registro):
+            continue
+        documento = _campo(registro, indice, "documento")
+        aula = _campo(registro, indice, "id_aula")
+        aulas = aulas_por_documento.get(documento)
+        try:
+            valor = convertir(_campo(registro, indice, "nota"))
+            if not aulas:
+                raise NotaInvalida(f"el documento {documento or '(vacío)'} no está matriculado en la institución")
+            if aula:
+                id_aula = int(aula) if aula.isdigit() else None
+                if id_aula not in aulas:
+                    raise NotaInvalida(f"el documento {documento} no está matriculado en el aula {aula}")
+            elif len(aulas) == 1:
+                id_aula, = aulas
+            else:
+                raise NotaInvalida(f"el documento {documento} está en varias aulas; indique id_aula")
+            if valor is None:
+                continue
+            if (documento, id_aula) in vistos:
+                raise NotaInvalida(f"el documento {documento} está repetido")
+        except NotaInvalida as ex:
+            errores.append(f"Línea {linea}: {ex}.")
+            continue
+        vistos.add((documento, id_aula))
+        filas.append((aulas[id_aula], id_aula, valor))
+
+    return filas, errores
+
+
+def main():
+    import mysql.connector
+    from config import DB_CONFIG
+
+    parser = argparse.ArgumentParser(description="Verifica nota_final contra un cálculo desde cero.")
+    parser.add_argument("--corregir", action="store_true", help="recalcular toda la tabla si hay diferencias")
+    parser.add_argument("--mostrar", type=int, default=ERRORES_MAXIMOS, help="diferencias a listar")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        diferencias = verificar(conn)
+        for id_estudiante, id_aula, id_periodo, guardada, calculada in diferencias[:args.mostrar]:
+            print(f"estudiante {id_estudiante} aula {id_aula} período {id_periodo}: "
+                  f"guardada {guardada}, calculada {calculada}")
+        print(f"{len(diferencias)} grupo(s) con nota_final distinta.")
+        if diferencias and args.corregir:
+            print(f"Recalculada nota_final ({recalcular_todo(conn)} fila(s) afectadas).")
+            diferencias = verificar(conn)
+            print(f"Después de corregir: {len(diferencias)} grupo(s) distintos.")
+    finally:
+        conn.close()
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
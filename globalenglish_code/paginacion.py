@@ -0,0 +1,54 @@
+# paginacion.py
+#
+# Paginación "keyset" (por cursor) para listados grandes.
+# En vez de LIMIT/OFFSET (que obliga a MySQL a recorrer y descartar
+# todas las filas anteriores) se filtra por la clave de la última fila
+# mostrada, así cada página cuesta lo mismo sin importar qué tan atrás esté.
+
+import base64
+import json
+from datetime import date, datetime
+
+
+def codificar_cursor(valores):
+    """Convierte la clave de una fila (lista de valores) en un token para la URL."""
+    valores = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+    crudo = json.dumps(valores, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(token, n_columnas):
+    """Retorna la lista de valores del cursor, o None si el token no es válido."""
+    if not token:
+        return None
+    try:
+        relleno = "=" * (-len(token) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(token + relleno))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != n_columnas:
+        return None
+    return valores
+
+
+def condicion_keyset(columnas, valores, descendente=False):
+    """
+    Arma la condición "fila > cursor" para una clave compuesta.
+
+    Se expande como a > x OR (a = x AND (b > y OR (b = y AND c > z)))
+    en lugar de (a, b, c) > (x, y, z) porque así MySQL sí usa el
+    índice compuesto como rango.
+    Retorna (sql, params).
+    """
+    op = "<" if descendente else ">"
+    sql = f"{columnas[-1]} {op} %s"
+    params = [valores[-1]]
+    for col, val in zip(reversed(columnas[:-1]), reversed(valores[:-1])):
+        sql = f"{col} {op} %s OR ({col} = %s AND ({sql}))"
+        params = [val, val] + params
+    return f"({sql})", params
+
+
+def orden_sql(columnas, descendente=False):
+    sentido = "DESC" if descendente else "ASC"
+    return ", ".join(f"{c} {sentido}" for c in columnas)
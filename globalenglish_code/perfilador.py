@@ -0,0 +1,244 @@
+# perfilador.py
+#
+# Perfilado por muestreo de peticiones individuales, para encontrar por
+# qué una página es lenta en producción sin poder reproducirlo en local.
+#
+# Se activa en una petición:
+#   - con la cabecera "X-Perfilar: 1" o el parámetro ?_perfilar=1, solo si
+#     el usuario tiene permiso sobre la página de perfiles (administrador);
+#   - al azar, con probabilidad PERFILADOR_TASA (0 = apagado).
+#
+# Mientras dura la petición (incluido el cuerpo en streaming) un hilo
+# toma cada PERFILADOR_INTERVALO_MS la pila del hilo que la atiende. Como
+# se mira la pila completa se ve todo: Python, espera de MySQL (frames de
+# mysql.connector) y render de Jinja (frames con el nombre de la plantilla).
+# Las peticiones sin perfilar no pagan nada más que un if.
+#
+# Cada perfil se guarda en PERFILES_DIR en formato "folded"
+# (una pila por línea: "raíz;...;hoja N"), que abren flamegraph.pl,
+# speedscope e inferno, más un .json con endpoint, ruta y duración.
+
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import g, request, session
+
+import arranque
+from config import (PERFILES_DIR, PERFILADOR_TASA, PERFILADOR_INTERVALO_MS,
+                    PERFILES_MAXIMO)
+
+log = logging.getLogger(__name__)
+
+CABECERA = "X-Perfilar"
+PARAMETRO = "_perfilar"
+PROFUNDIDAD_MAXIMA = 200
+
+
+class Perfil:
+    """Muestras de la pila de un hilo: pila colapsada -> número de veces vista."""
+
+    def __init__(self, hilo_id):
+        self.hilo_id = hilo_id
+        self.pilas = {}
+        self.muestras = 0
+        self.inicio = time.perf_counter()
+
+    def muestrear(self, frame):
+        partes = []
+        while frame is not None and len(partes) < PROFUNDIDAD_MAXIMA:
+            codigo = frame.f_code
+            archivo = os.path.basename(codigo.co_filename)
+            partes.append(f"{codigo.co_name} ({archivo}:{codigo.co_firstlineno})".replace(";", ","))
+            frame = frame.f_back
+        pila = ";".join(reversed(partes))
+        self.pilas[pila] = self.pilas.get(pila, 0) + 1
+        self.muestras += 1
+
+
+# ============================
+# 🧵 HILO MUESTREADOR
+# ============================
+# Un solo hilo por worker atiende todos los perfiles activos y duerme
+# cuando no hay ninguno.
+
+_activos = {}           # hilo_id -> Perfil
+_lock = threading.Lock()
+_hay_trabajo = threading.Event()
+_hilo = None
+
+
+def _muestrear_siempre():
+    intervalo = PERFILADOR_INTERVALO_MS / 1000.0
+    propio = threading.get_ident()
+    while True:
+        _hay_trabajo.wait()
+        frames = sys._current_frames()
+        with _lock:
+            perfiles = list(_activos.values())
+            if not perfiles:
+                _hay_trabajo.clear()
+                continue
+        for perfil in perfiles:
+            frame = frames.get(perfil.hilo_id)
+            if frame is not None and perfil.hilo_id != propio:
+                perfil.muestrear(frame)
+        del frames
+        time.sleep(intervalo)
+
+
+def _iniciar_hilo():
+    global _hilo
+    with _lock:
+        if _hilo is None:
+            _hilo = threading.Thread(target=_muestrear_siempre, name="perfilador", daemon=True)
+            _hilo.start()
+
+
+@arranque.al_iniciar_worker
+def _despues_del_fork():
+    # El hilo del maestro no existe en el worker: se crea al primer perfil
+    global _hilo, _lock, _hay_trabajo
+    _hilo = None
+    _lock = threading.Lock()
+    _hay_trabajo = threading.Event()
+    _activos.clear()
+
+
+def iniciar():
+    _iniciar_hilo()
+    perfil = Perfil(threading.get_ident())
+    with _lock:
+        _activos[perfil.hilo_id] = perfil
+    _hay_trabajo.set()
+    return perfil
+
+
+def detener(perfil):
+    with _lock:
+        _activos.pop(perfil.hilo_id, None)
+    return time.perf_counter() - perfil.inicio
+
+
+# ============================
+# 💾 ARCHIVOS
+# ============================
+
+def guardar(perfil, duracion, meta):
+    os.makedirs(PERFILES_DIR, exist_ok=True)
+    marca = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    nombre = f"{marca}_{meta['endpoint']}_{os.getpid()}"
+    with open(os.path.join(PERFILES_DIR, nombre + ".folded"), "w", encoding="utf-8") as f:
+        for pila, n in sorted(perfil.pilas.items()):
+            f.write(f"{pila} {n}\n")
+    meta = dict(meta, archivo=nombre, ms=round(duracion * 1000, 1),
+                muestras=perfil.muestras, fecha=datetime.now().isoformat(timespec="seconds"))
+    with open(os.path.join(PERFILES_DIR, nombre + ".json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    _podar()
+
+
+def _podar():
+    """Deja solo los PERFILES_MAXIMO perfiles más recientes."""
+    metas = sorted(n for n in os.listdir(PERFILES_DIR) if n.endswith(".json"))
+    for nombre in metas[:-PERFILES_MAXIMO]:
+        base = nombre[:-len(".json")]
+        for ext in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(PERFILES_DIR, base + ext))
+            except OSError:
+                pass
+
+
+def listar(endpoint=None, orden="fecha"):
+    """Metadatos de los perfiles guardados, los más recientes (o lentos) primero."""
+    perfiles = []
+    try:
+        nombres = os.listdir(PERFILES_DIR)
+    except OSError:
+        return []
+    for nombre in nombres:
+        if not nombre.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PERFILES_DIR, nombre), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if endpoint and meta.get("endpoint") != endpoint:
+            continue
+        perfiles.append(meta)
+    clave = "ms" if orden == "duracion" else "archivo"
+    return sorted(perfiles, key=lambda m: m.get(clave) or 0, reverse=True)
+
+
+def ruta_folded(nombre):
+    """Ruta del .folded de un perfil listado, o None si el nombre no es válido."""
+    if os.path.basename(nombre) != nombre or nombre.startswith("."):
+        return None
+    ruta = os.path.join(PERFILES_DIR, nombre + ".folded")
+    return ruta if os.path.exists(ruta) else None
+
+
+# ============================
+# 🌐 EN LA APP
+# ============================
+
+def _pedido_explicito():
+    return request.headers.get(CABECERA) == "1" or request.args.get(PARAMETRO) == "1"
+
+
+def registrar(app, puede_perfilar):
+    """
+    puede_perfilar(rol) -> bool decide quién puede pedir un perfil con la
+    cabecera o el parámetro (el muestreo al azar no depende del usuario).
+    """
+
+    @app.before_request
+    def _iniciar_perfil():
+        if _pedido_explicito():
+            if not puede_perfilar(session.get("rol")):
+                return
+            motivo = "pedido"
+        elif PERFILADOR_TASA > 0 and random.random() < PERFILADOR_TASA:
+            motivo = "muestreo"
+        else:
+            return
+        g._perfil = (iniciar(), motivo)
+
+    @app.after_request
+    def _terminar_perfil(resp):
+        datos = g.pop("_perfil", None)
+        if datos is None:
+            return resp
+        perfil, motivo = datos
+        meta = {
+            "endpoint": request.endpoint or "sin_ruta",
+            "ruta": request.full_path.rstrip("?"),
+            "metodo": request.method,
+            "estado": resp.status_code,
+            "usuario": session.get("user_id"),
+            "motivo": motivo,
+        }
+
+        # Se detiene cuando el servidor termina de enviar el cuerpo (en
+        # streaming eso es después de que la vista retornó)
+        def _al_cerrar():
+            try:
+                guardar(perfil, detener(perfil), meta)
+            except OSError as e:
+                log.error("Error guardando perfil: %s", e)
+
+        resp.call_on_close(_al_cerrar)
+        return resp
+
+    @app.teardown_request
+    def _perfil_fallido(exc):
+        datos = g.pop("_perfil", None)
+        if datos is not None:
+            detener(datos[0])
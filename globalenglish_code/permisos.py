@@ -0,0 +1,143 @@
+# permisos.py
+#
+# Autorización por rol guardada en BD (tablas permiso, rol_permiso,
+# menu_item y permisos_version; ver sql/003_permisos.sql).
+#
+# Cada worker compila las tablas en diccionarios en memoria:
+#   endpoint -> roles permitidos
+#   rol      -> menú ya armado para la barra de navegación
+# y solo vuelve a la BD cuando cambia permisos_version. La versión se
+# revisa como mucho cada REFRESCO_SEGUNDOS, así que en una petición normal
+# autorizar no cuesta ninguna consulta.
+
+import threading
+import time
+
+REFRESCO_SEGUNDOS = 10
+
+# Roles que cada vista declara en @role_required. Se usan cuando el
+# endpoint todavía no está en la tabla permiso (vistas nuevas) o cuando
+# no se pueden leer las tablas.
+_por_defecto = {}
+
+# Menú que se usa si no existe la tabla menu_item.
+# (grupo, etiqueta, endpoint, divisor_antes)
+MENU_POR_DEFECTO = [
+    ("Configuración", "Panel de configuración", "admin_config_dashboard", False),
+    ("Configuración", "Calendario del programa", "admin_semanas_list", False),
+    ("Configuración", "Tipos de documento", "admin_tiposdoc_list", False),
+    ("Configuración", "Duración estándar de hora", "admin_duraciones_list", False),
+    ("Configuración", "Roles y permisos", "roles_list", False),
+    ("Configuración", "Menús", "menus_list", False),
+    ("Configuración", "Perfiles de rendimiento", "admin_perfiles", False),
+    ("Instituciones", "Instituciones (IED)", "instituciones_list", False),
+    ("Instituciones", "Sedes", "sedes_list", False),
+    ("Instituciones", "Aulas del programa", "aulas_list", False),
+    ("Personas", "Tutores", "tutores_list", False),
+    ("Personas", "Estudiantes", "estudiantes_list", False),
+    ("Académico", "Períodos académicos", "periodos_list", False),
+    ("Académico", "Componentes de nota", "componentes_list", False),
+    ("Académico", "Registro de notas", "notas_registro", False),
+    ("Académico", "Importar notas (CSV)", "notas_importar", False),
+    ("Asistencia", "Mis aulas y horarios", "asistencia_mis_clases", False),
+    ("Asistencia", "Tomar asistencia", "asistencia_tomar", False),
+    ("Asistencia", "Reposiciones", "asistencia_reposiciones", False),
+    ("Asistencia", "Gestión de festivos", "festivos_list", True),
+    ("Asistencia", "Motivos de no asistencia", "motivos_inasistencia_list", False),
+    ("Reportes", "Asistencia por Aula", "reporte_asistencia_aula", False),
+    ("Reportes", "Asistencia por Estudiante", "reporte_asistencia_estudiante", False),
+    ("Reportes", "Boletín de notas", "reporte_boletin", False),
+    ("Reportes", "Inside vs Outside Classroom", "reporte_comparativo_programa", False),
+    ("Reportes", "Estudiantes en riesgo", "reporte_riesgo_asistencia", False),
+]
+
+
+def registrar_defecto(endpoint, roles):
+    _por_defecto[endpoint] = frozenset(roles)
+
+
+def roles_por_defecto():
+    return dict(_por_defecto)
+
+
+class Autorizacion:
+    """Permisos y menús ya compilados para una versión de las tablas."""
+
+    def __init__(self, version, permisos, menu):
+        # permisos: iterable de (nombre_rol, endpoint)
+        # menu: lista ordenada de (grupo, etiqueta, endpoint, divisor_antes)
+        self.version = version
+
+        por_endpoint = {}
+        for rol, endpoint in permisos:
+            por_endpoint.setdefault(endpoint, set()).add(rol)
+        self._por_endpoint = {e: frozenset(r) for e, r in por_endpoint.items()}
+
+        self._menu = list(menu)
+        self._menus = {}
+
+    def roles(self, endpoint):
+        """Roles permitidos para un endpoint (BD primero, luego el decorador)."""
+        return self._por_endpoint.get(endpoint, _por_defecto.get(endpoint, frozenset()))
+
+    def permite(self, rol, endpoint):
+        return rol in self.roles(endpoint)
+
+    def menu(self, rol):
+        """
+        Menú del rol como lista de {"grupo", "items": [{"etiqueta", "endpoint",
+        "divisor_antes"}]}. Se arma una vez por rol y versión.
+        """
+        if rol not in self._menus:
+            grupos = []
+            for grupo, etiqueta, endpoint, divisor_antes in self._menu:
+                if not self.permite(rol, endpoint):
+                    continue
+                if not grupos or grupos[-1]["grupo"] != grupo:
+                    grupos.append({"grupo": grupo, "items": []})
+                items = grupos[-1]["items"]
+                items.append({
+                    "etiqueta": etiqueta,
+                    "endpoint": endpoint,
+                    # un divisor al inicio del grupo no tiene sentido
+                    "divisor_antes": bool(divisor_antes and items),
+                })
+            self._menus[rol] = grupos
+        return self._menus[rol]
+
+
+_actual = Autorizacion(None, [], MENU_POR_DEFECTO)
+_revisado = 0.0
+_lock = threading.Lock()
+
+
+def obtener(leer_version, leer_tablas):
+    """
+    Retorna la Autorización vigente del worker.
+    - leer_version(): versión actual en BD (None si no se pudo leer).
+    - leer_tablas(): (permisos, menu) desde BD (None si no se pudo leer).
+    """
+    global _actual, _revisado
+
+    if time.monotonic() - _revisado < REFRESCO_SEGUNDOS:
+        return _actual
+
+    with _lock:
+        if time.monotonic() - _revisado < REFRESCO_SEGUNDOS:
+            return _actual
+
+        version = leer_version()
+        if version is not None and version != _actual.version:
+            tablas = leer_tablas()
+            if tablas is not None:
+                permisos, menu = tablas
+                _actual = Autorizacion(version, permisos, menu or MENU_POR_DEFECTO)
+        _revisado = time.monotonic()
+
+    return _actual
+
+
+def invalidar():
+    """Obliga a revisar la versión en la siguiente petición (tras editar permisos)."""
+    global _revisado
+    _revisado = 0.0
@@ -0,0 +1,109 @@
+# plantillas.py
+#
+# Ayudas para el render de plantillas Jinja:
+# - {% cache "nombre", clave1, clave2 %} ... {% endcache %}
+#   guarda el HTML de un fragmento que solo depende de las claves
+#   declaradas (p. ej. la barra de navegación, que solo cambia por rol).
+# - Caché de bytecode en disco, para que un worker recién arrancado no
+#   tenga que recompilar todas las plantillas en su primera petición.
+# - Contadores de tiempo de render por plantilla.
+
+import os
+import threading
+import time
+
+from flask import before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+import metricas
+from cache import CacheTTL
+from config import JINJA_BYTECODE_DIR, FRAGMENTOS_TTL_SEGUNDOS
+
+fragmentos = CacheTTL(FRAGMENTOS_TTL_SEGUNDOS, "fragmentos")
+
+
+class FragmentoCache(Extension):
+    """Etiqueta {% cache %}: el primer argumento es el nombre, el resto las claves."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        partes = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            partes.append(parser.parse_expression())
+        cuerpo = parser.parse_statements(["name:endcache"], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render_fragmento", [nodes.List(partes)]),
+            [], [], cuerpo
+        ).set_lineno(lineno)
+
+    def _render_fragmento(self, partes, caller):
+        clave = tuple(partes)
+        html = fragmentos.get(clave)
+        if html is None:
+            html = caller()
+            fragmentos.set(clave, html)
+        return html
+
+
+def bytecode_cache():
+    os.makedirs(JINJA_BYTECODE_DIR, exist_ok=True)
+    return FileSystemBytecodeCache(JINJA_BYTECODE_DIR, "ge_%s.cache")
+
+
+def precompilar(app):
+    """Carga todas las plantillas (desde el bytecode en disco si ya existe)."""
+    for nombre in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(nombre)
+
+
+# ============================
+# ⏱️ TIEMPO DE RENDER
+# ============================
+
+_metricas = {}          # plantilla -> [renders, segundos_total, segundos_max]
+_metricas_lock = threading.Lock()
+_local = threading.local()
+
+
+def _al_iniciar(sender, template, context, **extra):
+    pila = getattr(_local, "pila", None)
+    if pila is None:
+        pila = _local.pila = []
+    pila.append(time.perf_counter())
+
+
+def _al_terminar(sender, template, context, **extra):
+    pila = getattr(_local, "pila", None)
+    if not pila:
+        return
+    duracion = time.perf_counter() - pila.pop()
+    with _metricas_lock:
+        m = _metricas.setdefault(template.name, [0, 0.0, 0.0])
+        m[0] += 1
+        m[1] += duracion
+        m[2] = max(m[2], duracion)
+    metricas.observar("ge_plantilla_render_segundos", duracion, plantilla=template.name)
+
+
+def registrar(app):
+    """Instala la extensión, el bytecode cache y los contadores en la app."""
+    app.jinja_env.add_extension(FragmentoCache)
+    app.jinja_env.bytecode_cache = bytecode_cache()
+    before_render_template.connect(_al_iniciar, app)
+    template_rendered.connect(_al_terminar, app)
+
+
+def estadisticas():
+    with _metricas_lock:
+        por_plantilla = {
+            nombre: {
+                "renders": n,
+                "ms_promedio": round(total * 1000 / n, 3) if n else 0,
+                "ms_max": round(maximo * 1000, 3),
+            }
+            for nombre, (n, total, maximo) in sorted(_metricas.items())
+        }
+    return {"plantillas": por_plantilla, "fragmentos": fragmentos.estadisticas()}
@@ -0,0 +1,201 @@
+# registro.py
+#
+# Logging estructurado (una línea JSON por evento) que no frena las
+# peticiones:
+# - El hilo de la petición solo arma el registro con su contexto y lo
+#   deja en una cola acotada (QueueHandler). Dar formato y escribir a
+#   stdout lo hace un hilo aparte (QueueListener). Si la cola se llena,
+#   el registro se descarta y se cuenta en /metrics; nunca se espera.
+# - Cada línea lleva request_id (el de la cabecera X-Request-ID o uno
+#   nuevo, que se devuelve en la respuesta), endpoint, rol, usuario y la
+#   huella del último SQL ejecutado en la petición.
+# - Muestreo: los registros INFO/DEBUG (p. ej. la línea de acceso de cada
+#   petición exitosa) se guardan solo para una fracción REGISTRO_TASA_INFO
+#   de las peticiones, decidida una vez por petición para que sus líneas
+#   queden juntas. WARNING y ERROR se guardan siempre.
+#
+# En los módulos: log = logging.getLogger(__name__); log.error("...: %s", e)
+
+import atexit
+import copy
+import hashlib
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from flask import g, has_request_context, request, session
+
+import arranque
+import json_rapido
+import metricas
+from config import REGISTRO_NIVEL, REGISTRO_TASA_INFO, REGISTRO_COLA_MAXIMA
+
+CABECERA_ID = "X-Request-ID"
+
+# Atributos propios de LogRecord; el resto viene de extra={...}
+_ESTANDAR = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_CONTEXTO = ("request_id", "endpoint", "rol", "usuario", "sql_huella", "sql")
+
+
+# ============================
+# 🔏 HUELLA DE SQL
+# ============================
+
+_LITERALES = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b|%s")
+_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=512)
+def huella_sql(sql):
+    """
+    Normaliza el SQL (literales y parámetros -> ?, espacios colapsados) y
+    retorna (huella corta, texto normalizado recortado). Dos ejecuciones
+    de la misma consulta con distintos valores tienen la misma huella.
+    """
+    normal = _ESPACIOS.sub(" ", _LITERALES.sub("?", sql)).strip()
+    return hashlib.sha1(normal.encode("utf-8")).hexdigest()[:12], normal[:200]
+
+
+# ============================
+# 🧩 FILTROS Y FORMATO
+# ============================
+
+class _Contexto(logging.Filter):
+    """Copia al registro el contexto de la petición (corre en el hilo de la petición)."""
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        if record.levelno < logging.WARNING and not g.get("_log_muestreado", True):
+            return False
+        record.request_id = g.get("request_id")
+        record.endpoint = request.endpoint
+        record.rol = session.get("rol")
+        record.usuario = session.get("user_id")
+        ultimo_sql = g.get("_ultimo_sql")
+        if ultimo_sql:
+            record.sql_huella, record.sql = huella_sql(ultimo_sql)
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+
+    def format(self, record):
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for clave in _CONTEXTO:
+            valor = getattr(record, clave, None)
+            if valor is not None:
+                datos[clave] = valor
+        for clave, valor in vars(record).items():
+            if clave not in _ESTANDAR and clave not in _CONTEXTO and clave not in datos:
+                datos[clave] = valor
+        if record.exc_info:
+            datos["exc"] = "".join(traceback.format_exception(*record.exc_info))
+        try:
+            return json_rapido.dumps(datos).decode("utf-8")
+        except TypeError:
+            return json_rapido.dumps({k: str(v) for k, v in datos.items()}).decode("utf-8")
+
+
+class _ColaSinBloqueo(logging.handlers.QueueHandler):
+
+    def prepare(self, record):
+        # Solo se resuelve el mensaje; el formato JSON y el traceback se
+        # arman en el hilo del listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metricas.contar("ge_log_descartados_total")
+
+
+# ============================
+# 🔁 CONFIGURACIÓN
+# ============================
+
+_manejador = None
+_listener = None
+
+
+def _iniciar_listener():
+    global _listener
+    salida = logging.StreamHandler(sys.stdout)
+    salida.setFormatter(FormatoJSON())
+    _manejador.queue = queue.Queue(REGISTRO_COLA_MAXIMA)
+    _listener = logging.handlers.QueueListener(_manejador.queue, salida,
+                                               respect_handler_level=False)
+    _listener.start()
+
+
+@arranque.al_iniciar_worker
+def _despues_del_fork():
+    # El hilo del listener del maestro no existe en el worker
+    if _manejador is not None:
+        _iniciar_listener()
+
+
+def configurar():
+    """Instala el logging JSON en el logger raíz (una vez por proceso)."""
+    global _manejador
+    if _manejador is not None:
+        return
+    _manejador = _ColaSinBloqueo(queue.Queue(REGISTRO_COLA_MAXIMA))
+    _manejador.addFilter(_Contexto())
+    raiz = logging.getLogger()
+    for h in list(raiz.handlers):
+        raiz.removeHandler(h)
+    raiz.addHandler(_manejador)
+    raiz.setLevel(REGISTRO_NIVEL)
+    _iniciar_listener()
+    atexit.register(detener)
+
+
+def detener():
+    """Vacía la cola y detiene el hilo de escritura (se llama al salir)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+log_acceso = logging.getLogger("globalenglish.acceso")
+
+
+def registrar(app):
+    configurar()
+
+    @app.before_request
+    def _iniciar_contexto():
+        recibido = request.headers.get(CABECERA_ID, "")
+        g.request_id = recibido[:64] if recibido.isprintable() and recibido else uuid.uuid4().hex
+        g._log_muestreado = REGISTRO_TASA_INFO >= 1 or random.random() < REGISTRO_TASA_INFO
+        g._log_inicio = time.perf_counter()
+
+    @app.after_request
+    def _registrar_acceso(resp):
+        resp.headers[CABECERA_ID] = g.get("request_id", "")
+        nivel = logging.WARNING if resp.status_code >= 500 else logging.INFO
+        inicio = g.get("_log_inicio")
+        if inicio is not None and log_acceso.isEnabledFor(nivel):
+            ms = round((time.perf_counter() - inicio) * 1000, 1)
+            log_acceso.log(nivel, "%s %s %s", request.method, request.path, resp.status_code,
+                           extra={"estado": resp.status_code, "ms": ms})
+        return resp
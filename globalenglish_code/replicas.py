@@ -0,0 +1,195 @@
+# replicas.py
+#
+# Separación de lecturas y escrituras. Los reportes (reporte_*), los
+# listados (*_list) y la API JSON son lecturas pesadas que compiten con
+# el registro de asistencia en el servidor principal; si hay réplicas
+# configuradas (GE_DB_REPLICAS) esas peticiones leen de una réplica.
+# Todo lo demás (formularios, escrituras, login) sigue en la primaria.
+#
+# Reglas:
+# - Solo GET/HEAD de los endpoints de lectura van a una réplica.
+# - Lee lo que escribiste: tras un POST exitoso la sesión guarda la hora;
+#   mientras la réplica vaya más atrasada que ese tiempo (retraso + margen),
+#   las lecturas de esa sesión siguen en la primaria. Así la redirección
+#   de "guardar" al listado muestra el cambio recién hecho.
+# - Una réplica con más de DB_REPLICA_RETRASO_MAXIMO segundos de retraso,
+#   con la replicación detenida o que no responde, no se usa durante
+#   DB_REPLICA_VERIFICAR_SEGUNDOS; si no queda ninguna, se lee de la primaria.
+#
+# El retraso (Seconds_Behind_Source) se consulta en la misma conexión que
+# se acaba de abrir, como mucho una vez cada DB_REPLICA_VERIFICAR_SEGUNDOS
+# por réplica y worker. El usuario de la réplica necesita el privilegio
+# REPLICATION CLIENT para SHOW REPLICA STATUS.
+
+import itertools
+import logging
+import os
+import threading
+import time
+
+import mysql.connector
+from flask import g, has_request_context, request, session
+
+import arranque
+import metricas
+from config import (DB_CONFIG, DB_REPLICAS, DB_REPLICA_USUARIO, DB_REPLICA_CLAVE,
+                    DB_REPLICA_RETRASO_MAXIMO, DB_REPLICA_VERIFICAR_SEGUNDOS)
+
+log = logging.getLogger(__name__)
+
+MARGEN_SEGUNDOS = 1.0           # además del retraso medido, para leer lo escrito
+_CLAVE_SESION = "_escritura"
+
+_estado = {}                    # (host, puerto) -> {"retraso": s | None, "verificado": t}
+_lock = threading.Lock()
+_turno = itertools.count()
+
+
+@arranque.al_iniciar_worker
+def reiniciar():
+    """Cada worker mide el retraso por su cuenta (el lock no se hereda del fork)."""
+    global _lock
+    _lock = threading.Lock()
+    _estado.clear()
+
+
+# ============================
+# 🧭 QUÉ VA A LA RÉPLICA
+# ============================
+
+def _es_lectura():
+    if request.method not in ("GET", "HEAD") or not request.endpoint:
+        return False
+    return (request.blueprint == "api_v1"
+            or request.endpoint.startswith("reporte_")
+            or request.endpoint.endswith("_list"))
+
+
+def _al_iniciar_peticion():
+    g._replica_permitida = bool(DB_REPLICAS) and _es_lectura()
+
+
+def _al_responder(respuesta):
+    # Una escritura que salió bien: las próximas lecturas de esta sesión
+    # esperan a que las réplicas la tengan
+    if request.method not in ("GET", "HEAD", "OPTIONS") and respuesta.status_code < 400:
+        session[_CLAVE_SESION] = time.time()
+    return respuesta
+
+
+def registrar(app):
+    app.before_request(_al_iniciar_peticion)
+    app.after_request(_al_responder)
+
+
+# ============================
+# 🔌 CONEXIÓN
+# ============================
+
+def _retraso(conn):
+    """Segundos de retraso de la réplica, o None si no está replicando."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+            columna = "Seconds_Behind_Source"
+        except mysql.connector.Error:
+            # MySQL < 8.0.22 y MariaDB
+            cursor.execute("SHOW SLAVE STATUS")
+            columna = "Seconds_Behind_Master"
+        fila = cursor.fetchone()
+        cursor.fetchall()
+    finally:
+        cursor.close()
+    if not fila or fila.get(columna) is None:
+        return None
+    return float(fila[columna])
+
+
+def _vigente(estado, ahora):
+    return estado is not None and ahora - estado["verificado"] < DB_REPLICA_VERIFICAR_SEGUNDOS
+
+
+def _sirve(estado, tolerancia):
+    return estado["retraso"] is not None and estado["retraso"] <= tolerancia
+
+
+def _tolerancia():
+    """Retraso máximo aceptable para esta petición."""
+    escrito = session.get(_CLAVE_SESION)
+    if escrito is None:
+        return DB_REPLICA_RETRASO_MAXIMO
+    return min(DB_REPLICA_RETRASO_MAXIMO, time.time() - escrito - MARGEN_SEGUNDOS)
+
+
+def _conectar_replica(replica, tolerancia):
+    """Conexión a la réplica si sirve para esta petición, o None."""
+    host, puerto = replica
+    try:
+        conn = mysql.connector.connect(**dict(
+            DB_CONFIG, host=host, port=puerto,
+            user=DB_REPLICA_USUARIO, password=DB_REPLICA_CLAVE, connection_timeout=2,
+        ))
+    except mysql.connector.Error as e:
+        log.warning("Réplica %s:%s no disponible: %s", host, puerto, e)
+        with _lock:
+            _estado[replica] = {"retraso": None, "verificado": time.monotonic()}
+        return None
+
+    ahora = time.monotonic()
+    with _lock:
+        estado = _estado.get(replica)
+    if not _vigente(estado, ahora):
+        try:
+            estado = {"retraso": _retraso(conn), "verificado": ahora}
+        except mysql.connector.Error as e:
+            log.warning("No se pudo leer el retraso de %s:%s: %s", host, puerto, e)
+            estado = {"retraso": None, "verificado": ahora}
+        with _lock:
+            _estado[replica] = estado
+        if estado["retraso"] is None:
+            log.warning("Réplica %s:%s sin replicación activa; se lee de la primaria",
+                        host, puerto)
+    if not _sirve(estado, tolerancia):
+        conn.close()
+        return None
+    return conn
+
+
+def conectar():
+    """
+    Conexión para la petición actual: (conn, "replica" | "directa").
+    Lanza mysql.connector.Error si tampoco se puede conectar a la primaria.
+    """
+    if DB_REPLICAS and has_request_context() and g.get("_replica_permitida"):
+        tolerancia = _tolerancia()
+        if tolerancia < 0:
+            metricas.contar("ge_db_lecturas_primaria_total", motivo="escritura_reciente")
+        else:
+            ahora = time.monotonic()
+            inicio = next(_turno)
+            for i in range(len(DB_REPLICAS)):
+                replica = DB_REPLICAS[(inicio + i) % len(DB_REPLICAS)]
+                with _lock:
+                    estado = _estado.get(replica)
+                # Descartada hace poco: ni siquiera se intenta conectar
+                if _vigente(estado, ahora) and not _sirve(estado, tolerancia):
+                    continue
+                conn = _conectar_replica(replica, tolerancia)
+                if conn is not None:
+                    return conn, "replica"
+            metricas.contar("ge_db_lecturas_primaria_total", motivo="replicas_atrasadas")
+    return mysql.connector.connect(**DB_CONFIG), "directa"
+
+
+@metricas.colector
+def _medidores_replicas():
+    with _lock:
+        estados = dict(_estado)
+    # Con pid: los medidores se suman entre workers y cada uno mide el suyo
+    return [
+        ("gauge", "ge_db_replica_retraso_segundos",
+         {"replica": f"{host}:{puerto}", "pid": os.getpid()},
+         -1 if estado["retraso"] is None else estado["retraso"])
+        for (host, puerto), estado in estados.items()
+    ]
@@ -0,0 +1,227 @@
+# repositorio.py
+#
+# Acceso a datos: una función por consulta, en lugar de SQL suelto (y
+# repetido) en las vistas. Aquí están primero las consultas calientes
+# (login, horario del tutor, lista de un aula) y las que se repetían en
+# varias vistas (combos de instituciones, tipos de documento, grados),
+# más las lecturas del registro de notas (las escrituras, en notas.py).
+#
+# Cada consulta corre como sentencia preparada en el servidor
+# (cursor(prepared=True)) sobre una conexión del pool de
+# consultas_paralelas, y cada conexión guarda sus sentencias ya
+# preparadas: la primera vez MySQL analiza y planifica el SQL
+# (COM_STMT_PREPARE) y las siguientes solo lo ejecuta con otros
+# parámetros (COM_STMT_EXECUTE). Por eso el pool no resetea la sesión al
+# devolver una conexión: el reset borraría las sentencias preparadas.
+#
+# Las funciones lanzan mysql.connector.Error; la vista decide qué mostrar.
+
+import threading
+import weakref
+
+import consultas_paralelas
+import metricas
+
+_sentencias = weakref.WeakKeyDictionary()   # conexión física -> (connection_id, {sql: cursor})
+_lock = threading.Lock()
+
+
+# ============================
+# 🧰 EJECUCIÓN
+# ============================
+
+def _cursor_preparado(conn):
+    """
+    Retorna una función sql -> cursor preparado de esta conexión.
+    Una conexión del pool la usa un solo hilo a la vez, así que solo el
+    diccionario compartido necesita el lock.
+    """
+    # El pool entrega un envoltorio nuevo en cada préstamo; la conexión real es _cnx
+    fisica = getattr(conn, "_cnx", conn)
+    with _lock:
+        id_actual, cursores = _sentencias.get(fisica, (None, None))
+        # Si el pool reconectó, las sentencias del servidor ya no existen
+        if id_actual != fisica.connection_id:
+            cursores = {}
+            _sentencias[fisica] = (fisica.connection_id, cursores)
+
+    def obtener(sql):
+        cursor = cursores.get(sql)
+        if cursor is None:
+            metricas.contar("ge_sql_preparadas_total", resultado="nueva")
+            cursor = cursores[sql] = fisica.cursor(prepared=True)
+        else:
+            metricas.contar("ge_sql_preparadas_total", resultado="reusada")
+        return metricas.medir_cursor(cursor)
+
+    return obtener
+
+
+def _filas(sql, params=()):
+    conn = consultas_paralelas.conexion()
+    try:
+        cursor = _cursor_preparado(conn)(sql)
+        cursor.execute(sql, params)
+        columnas = cursor.column_names
+        return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+    finally:
+        consultas_paralelas.devolver(conn)
+
+
+def _fila(sql, params=()):
+    filas = _filas(sql, params)
+    return filas[0] if filas else None
+
+
+# ============================
+# 🔐 USUARIOS
+# ============================
+
+SQL_USUARIO_LOGIN = """
+    SELECT u.id_usuario, u.username, u.password_hash, r.nombre_rol
+    FROM usuario_sistema u
+    JOIN rol r ON u.id_rol = r.id_rol
+    JOIN persona p ON u.id_persona = p.id_persona
+    WHERE u.username = %s AND u.activo = 1
+"""
+
+
+def usuario_para_login(username):
+    """Usuario activo con su hash y rol, o None."""
+    return _fila(SQL_USUARIO_LOGIN, (username,))
+
+
+def roles():
+    return _filas("SELECT id_rol, nombre_rol FROM rol ORDER BY nombre_rol")
+
+
+# ============================
+# 🏫 INSTITUCIONES Y CATÁLOGOS
+# ============================
+
+def institucion(id_institucion):
+    return _fila("""
+        SELECT id_institucion, nombre
+        FROM institucion
+        WHERE id_institucion = %s
+    """, (id_institucion,))
+
+
+def instituciones_para_combo(solo_activas=False):
+    """(id_institucion, nombre) ordenadas por nombre, para los <select>."""
+    if solo_activas:
+        return _filas("""
+            SELECT id_institucion, nombre
+            FROM institucion
+            WHERE activa = 1
+            ORDER BY nombre
+        """)
+    return _filas("SELECT id_institucion, nombre FROM institucion ORDER BY nombre")
+
+
+def tipos_documento():
+    return _filas("SELECT id_tipo_documento, nombre FROM tipo_documento ORDER BY nombre")
+
+
+def grados():
+    return _filas("SELECT id_grado, numero_grado FROM grado ORDER BY numero_grado")
+
+
+# ============================
+# 🗓️ AULAS Y HORARIOS
+# ============================
+
+def aulas_de_institucion(id_institucion):
+    """Aulas de una institución con el nombre de su sede."""
+    return _filas("""
+        SELECT a.id_aula, a.grado, a.programa, a.jornada, a.activa,
+               s.nombre_sede AS sede
+        FROM aula a
+        INNER JOIN sede s ON a.id_sede = s.id_sede
+        WHERE a.id_institucion = %s
+        ORDER BY a.grado, a.programa
+    """, (id_institucion,))
+
+
+SQL_HORARIO_TUTOR = """
+    SELECT
+        a.id_aula,
+        a.nombre_aula,
+        i.nombre_institucion AS institucion,
+        s.nombre_sede AS sede,
+        h.dia_semana,
+        h.hora_inicio,
+        h.hora_fin
+    FROM tutor_aula_horario tah
+    JOIN aula_programa a ON tah.id_aula = a.id_aula
+    JOIN institucion i   ON a.id_institucion = i.id_institucion
+    JOIN sede s          ON a.id_sede = s.id_sede
+    JOIN horario_aula h  ON tah.id_horario = h.id_horario
+    WHERE tah.id_tutor = %s
+      AND tah.estado = 'ACTIVO'
+    ORDER BY
+        i.nombre_institucion,
+        s.nombre_sede,
+        a.nombre_aula,
+        h.dia_semana,
+        h.hora_inicio
+"""
+
+
+def horario_tutor(id_tutor):
+    """Aulas y horarios activos del tutor."""
+    return _filas(SQL_HORARIO_TUTOR, (id_tutor,))
+
+
+SQL_ESTUDIANTES_AULA = """
+    SELECT e.id_estudiante, e.numero_documento, e.apellidos, e.nombres
+    FROM matricula m
+    JOIN estudiante e ON e.id_estudiante = m.id_estudiante
+    WHERE m.id_aula = %s
+    ORDER BY e.apellidos, e.nombres, e.id_estudiante
+"""
+
+
+def estudiantes_de_aula(id_aula):
+    """Lista de clase: estudiantes matriculados en el aula."""
+    return _filas(SQL_ESTUDIANTES_AULA, (id_aula,))
+
+
+# ============================
+# 📘 NOTAS
+# ============================
+
+def contexto_planilla(id_aula, id_periodo, id_componente):
+    """Nombres de aula, período y componente de una planilla, o None si alguno no existe."""
+    return _fila("""
+        SELECT a.id_aula, a.nombre_aula, a.id_institucion,
+               p.nombre_periodo, c.nombre_componente
+        FROM aula_programa a
+        JOIN periodo_academico p ON p.id_periodo = %s
+        JOIN componente_nota c   ON c.id_componente = %s
+        WHERE a.id_aula = %s
+    """, (id_periodo, id_componente, id_aula))
+
+
+SQL_NOTAS_PLANILLA = """
+    SELECT id_estudiante, valor
+    FROM nota
+    WHERE id_aula = %s AND id_periodo = %s AND id_componente = %s
+"""
+
+
+def notas_planilla(id_aula, id_periodo, id_componente):
+    """{id_estudiante: valor} de las notas ya registradas en la planilla."""
+    filas = _filas(SQL_NOTAS_PLANILLA, (id_aula, id_periodo, id_componente))
+    return {f["id_estudiante"]: f["valor"] for f in filas}
+
+
+def matriculas_institucion(id_institucion):
+    """(numero_documento, id_estudiante, id_aula) de todos los matriculados en la institución."""
+    return _filas("""
+        SELECT e.numero_documento, m.id_estudiante, m.id_aula
+        FROM matricula m
+        JOIN aula_programa a ON a.id_aula = m.id_aula
+        JOIN estudiante e    ON e.id_estudiante = m.id_estudiante
+        WHERE a.id_institucion = %s
+    """, (id_institucion,))
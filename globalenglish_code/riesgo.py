@@ -0,0 +1,270 @@
+# riesgo.py
+#
+# Estudiantes en riesgo de deserción por inasistencia. Se carga el detalle
+# de asistencia de un período (asistencia_detalle, millones de filas) en
+# arreglos por columna, no en un dict por fila, y por estudiante se calcula:
+#   - tasa de ausencia total y en las últimas VENTANA_CLASES clases,
+#   - racha de ausencias consecutivas actual y máxima,
+#   - tendencia: pendiente de mínimos cuadrados de "faltó" contra el número
+#     de clase, llevada a una ventana (+0.3 = la tasa sube 30 puntos en
+#     VENTANA_CLASES clases).
+# Con numpy todo son operaciones sobre arreglos completos (ordenar, sumas
+# acumuladas, sumas por segmento); sin numpy se hace un solo recorrido en
+# Python con los mismos resultados, más lento.
+#
+# Un estudiante queda en riesgo si su tasa reciente llega a UMBRAL_TASA o
+# su racha actual a UMBRAL_RACHA; el puntaje ordena la lista. La
+# institución y el tutor de cada estudiante son los de su última clase.
+
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sin numpy se calcula con un recorrido en Python
+    np = None
+
+import filas
+
+ESTADOS_AUSENCIA = ("AUSENTE",)
+VENTANA_CLASES = 8
+MINIMO_CLASES = 3           # con menos clases no hay con qué juzgar
+UMBRAL_TASA = 0.25
+UMBRAL_RACHA = 3
+LOTE_LECTURA = 50_000
+
+CAMPOS = (
+    "id_estudiante", "id_institucion", "id_tutor", "clases", "ausencias",
+    "tasa", "tasa_reciente", "racha_actual", "racha_maxima", "tendencia",
+    "puntaje", "en_riesgo",
+)
+Resultado = filas.clase(CAMPOS)
+
+
+class Columnas:
+    """Detalle de asistencia en arreglos paralelos (uno por columna)."""
+
+    __slots__ = ("estudiante", "dia", "ausente", "institucion", "tutor")
+
+    def __init__(self):
+        self.estudiante = array("q")
+        self.dia = array("q")           # TO_DAYS(fecha_clase)
+        self.ausente = array("b")       # 1 si faltó
+        self.institucion = array("q")
+        self.tutor = array("q")         # 0 si la clase no tiene tutor
+
+    def __len__(self):
+        return len(self.estudiante)
+
+    def agregar(self, lote):
+        """Agrega filas (estudiante, dia, ausente, institucion, tutor)."""
+        estudiante, dia, ausente, institucion, tutor = zip(*lote)
+        self.estudiante.extend(estudiante)
+        self.dia.extend(dia)
+        self.ausente.extend(ausente)
+        self.institucion.extend(institucion)
+        self.tutor.extend(tutor)
+
+
+# ============================
+# 📥 CARGA
+# ============================
+
+def _sql_detalle():
+    estados = ", ".join(["%s"] * len(ESTADOS_AUSENCIA))
+    # Sin ORDER BY: ordenar millones de filas es más barato en calcular()
+    return f"""
+        SELECT ad.id_estudiante,
+               TO_DAYS(ac.fecha_clase),
+               COALESCE(ad.estado_asistencia IN ({estados}), 0),
+               a.id_institucion,
+               COALESCE(ac.id_tutor, 0)
+        FROM asistencia_detalle ad
+        JOIN asistencia_clase ac  ON ad.id_clase = ac.id_clase
+        JOIN aula_programa a      ON ac.id_aula = a.id_aula
+        JOIN periodo_academico p  ON p.id_periodo = %s
+        WHERE ac.fecha_clase BETWEEN p.fecha_inicio AND p.fecha_fin
+    """
+
+
+def cargar(conn, id_periodo):
+    """Columnas con el detalle de asistencia del período."""
+    columnas = Columnas()
+    cursor = conn.cursor()      # tuplas y sin buffer: se leen por lotes
+    try:
+        cursor.execute(_sql_detalle(), (*ESTADOS_AUSENCIA, id_periodo))
+        while True:
+            lote = cursor.fetchmany(LOTE_LECTURA)
+            if not lote:
+                break
+            columnas.agregar(lote)
+    finally:
+        cursor.close()
+    return columnas
+
+
+# ============================
+# 🧮 CÁLCULO
+# ============================
+
+def _puntaje(tasa_reciente, racha_actual, tendencia):
+    return round(0.5 * tasa_reciente
+                 + 0.3 * min(racha_actual / UMBRAL_RACHA, 1.0)
+                 + 0.2 * min(max(tendencia, 0.0), 1.0), 4)
+
+
+def _resultado(id_estudiante, id_institucion, id_tutor, clases, ausencias, reciente,
+               racha_actual, racha_maxima, pendiente):
+    tendencia = round(pendiente * VENTANA_CLASES, 4)
+    return Resultado(
+        id_estudiante, id_institucion, id_tutor, clases, ausencias,
+        round(ausencias / clases, 4), round(reciente, 4), racha_actual, racha_maxima,
+        tendencia, _puntaje(reciente, racha_actual, tendencia),
+        reciente >= UMBRAL_TASA or racha_actual >= UMBRAL_RACHA,
+    )
+
+
+def _calcular_numpy(c):
+    est = np.frombuffer(c.estudiante, dtype=np.int64)
+    dia = np.frombuffer(c.dia, dtype=np.int64)
+    orden = np.lexsort((dia, est))      # por estudiante y, dentro, por fecha
+    est = est[orden]
+    aus = np.frombuffer(c.ausente, dtype=np.int8)[orden].astype(np.int64)
+    inst = np.frombuffer(c.institucion, dtype=np.int64)[orden]
+    tut = np.frombuffer(c.tutor, dtype=np.int64)[orden]
+
+    n = len(est)
+    inicio = np.flatnonzero(np.concatenate(([True], est[1:] != est[:-1])))
+    fin = np.concatenate((inicio[1:], [n])) - 1
+    clases = fin - inicio + 1
+
+    acumulado = np.concatenate(([0], np.cumsum(aus)))
+    ausencias = acumulado[fin + 1] - acumulado[inicio]
+    ventana = np.minimum(clases, VENTANA_CLASES)
+    reciente = (acumulado[fin + 1] - acumulado[fin + 1 - ventana]) / ventana
+
+    # Racha que termina en cada fila: distancia a la última clase asistida
+    # (o al inicio del estudiante)
+    idx = np.arange(n)
+    marca = np.where(aus == 0, idx, -1)
+    marca[inicio] = np.maximum(marca[inicio], inicio - 1)
+    racha = idx - np.maximum.accumulate(marca)
+    racha_maxima = np.maximum.reduceat(racha, inicio)
+
+    # Pendiente de mínimos cuadrados de aus contra x = número de clase del estudiante
+    x = idx - np.repeat(inicio, clases)
+    sx = np.add.reduceat(x, inicio)
+    sxx = np.add.reduceat(x * x, inicio)
+    sxy = np.add.reduceat(x * aus, inicio)
+    denominador = clases * sxx - sx * sx
+    pendiente = np.where(
+        denominador > 0,
+        (clases * sxy - sx * ausencias) / np.where(denominador > 0, denominador, 1),
+        0.0,
+    )
+
+    return [
+        _resultado(*valores)
+        for valores in zip(est[inicio].tolist(), inst[fin].tolist(), tut[fin].tolist(),
+                           clases.tolist(), ausencias.tolist(), reciente.tolist(),
+                           racha[fin].tolist(), racha_maxima.tolist(), pendiente.tolist())
+    ]
+
+
+def _calcular_python(c):
+    est, dia, aus = c.estudiante, c.dia, c.ausente
+    orden = sorted(range(len(est)), key=lambda i: (est[i], dia[i]))
+    resultados = []
+    i, n = 0, len(orden)
+    while i < n:
+        id_estudiante = est[orden[i]]
+        marcas = []
+        while i < n and est[orden[i]] == id_estudiante:
+            marcas.append(aus[orden[i]])
+            i += 1
+        ultima = orden[i - 1]
+
+        clases = len(marcas)
+        ventana = min(clases, VENTANA_CLASES)
+        racha = racha_maxima = 0
+        sx = sxx = sxy = 0
+        for x, a in enumerate(marcas):
+            racha = racha + 1 if a else 0
+            racha_maxima = max(racha_maxima, racha)
+            sx += x
+            sxx += x * x
+            sxy += x * a
+        ausencias = sum(marcas)
+        denominador = clases * sxx - sx * sx
+        pendiente = (clases * sxy - sx * ausencias) / denominador if denominador > 0 else 0.0
+        resultados.append(_resultado(
+            id_estudiante, c.institucion[ultima], c.tutor[ultima], clases, ausencias,
+            sum(marcas[-ventana:]) / ventana, racha, racha_maxima, pendiente,
+        ))
+    return resultados
+
+
+def calcular(columnas, usar_numpy=True):
+    """Un Resultado por estudiante (con al menos MINIMO_CLASES clases), en orden de id."""
+    if not len(columnas):
+        return []
+    if usar_numpy and np is not None:
+        resultados = _calcular_numpy(columnas)
+    else:
+        resultados = _calcular_python(columnas)
+    return [r for r in resultados if r.clases >= MINIMO_CLASES]
+
+
+# ============================
+# 📋 LISTAS
+# ============================
+
+def ranking(resultados, por, limite=None):
+    """
+    Estudiantes en riesgo agrupados por "id_institucion" o "id_tutor":
+    {id: [Resultado, ...]} con cada lista de mayor a menor puntaje.
+    """
+    grupos = {}
+    for r in resultados:
+        if r.en_riesgo:
+            grupos.setdefault(getattr(r, por), []).append(r)
+    for clave, lista in grupos.items():
+        lista.sort(key=lambda r: (-r.puntaje, r.id_estudiante))
+        if limite:
+            del lista[limite:]
+    return grupos
+
+
+def nombres(conn, ids_estudiantes, ids_tutores):
+    """({id_estudiante: (documento, nombre)}, {id_tutor: nombre}) para mostrar la lista."""
+    estudiantes, tutores = {}, {}
+    cursor = conn.cursor()
+    try:
+        if ids_estudiantes:
+            cursor.execute(f"""
+                SELECT id_estudiante, numero_documento, CONCAT(apellidos, ', ', nombres)
+                FROM estudiante
+                WHERE id_estudiante IN ({", ".join(["%s"] * len(ids_estudiantes))})
+            """, list(ids_estudiantes))
+            estudiantes = {i: (documento, nombre) for i, documento, nombre in cursor.fetchall()}
+        if ids_tutores:
+            cursor.execute(f"""
+                SELECT id_persona, CONCAT(nombres, ' ', apellidos)
+                FROM persona
+                WHERE id_persona IN ({", ".join(["%s"] * len(ids_tutores))})
+            """, list(ids_tutores))
+            tutores = dict(cursor.fetchall())
+    finally:
+        cursor.close()
+    return estudiantes, tutores
+
+
+def analizar(conn, id_periodo):
+    """cargar() + calcular(), con los tiempos de cada paso (para el log y el benchmark)."""
+    t0 = time.perf_counter()
+    columnas = cargar(conn, id_periodo)
+    t1 = time.perf_counter()
+    resultados = calcular(columnas)
+    t2 = time.perf_counter()
+    return resultados, {"filas": len(columnas), "carga_s": round(t1 - t0, 3),
+                        "calculo_s": round(t2 - t1, 3), "numpy": np is not None}
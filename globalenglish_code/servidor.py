@@ -0,0 +1,64 @@
+# servidor.py
+#
+# Servidor de producción:  python servidor.py
+#
+# gunicorn con GE_WORKERS procesos preforkeados y GE_HILOS hilos cada uno.
+# La app se importa y precalienta una vez en el maestro (preload_app) y
+# después cada worker corre arranque.iniciar_worker() (pools, hilos).
+# Los workers se reciclan cada GE_MAX_PETICIONES peticiones (con algo de
+# azar para que no se reinicien todos a la vez).
+#
+# Variables mínimas: GE_SECRET_KEY y GE_DB_PASSWORD (ver config.py).
+# Requiere gunicorn (pip install gunicorn); no corre en Windows.
+# Para desarrollo sigue sirviendo: python app.py
+
+import sys
+
+from config import (SERVIDOR_BIND, SERVIDOR_WORKERS, SERVIDOR_HILOS,
+                    SERVIDOR_TIMEOUT, SERVIDOR_MAX_PETICIONES)
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    sys.exit("Falta gunicorn: pip install gunicorn")
+
+
+def _post_fork(server, worker):
+    import arranque
+    arranque.iniciar_worker()
+
+
+def opciones():
+    return {
+        "bind": SERVIDOR_BIND,
+        "workers": SERVIDOR_WORKERS,
+        "worker_class": "gthread",
+        "threads": SERVIDOR_HILOS,
+        "preload_app": True,
+        "timeout": SERVIDOR_TIMEOUT,
+        "graceful_timeout": SERVIDOR_TIMEOUT,
+        "max_requests": SERVIDOR_MAX_PETICIONES,
+        "max_requests_jitter": max(1, SERVIDOR_MAX_PETICIONES // 10),
+        "post_fork": _post_fork,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+
+class Servidor(BaseApplication):
+
+    def __init__(self, opciones):
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self):
+        for clave, valor in self.opciones.items():
+            self.cfg.set(clave, valor)
+
+    def load(self):
+        from wsgi import app
+        return app
+
+
+if __name__ == "__main__":
+    Servidor(opciones()).run()
@@ -0,0 +1,16 @@
+-- Índices para el listado paginado de estudiantes (/estudiantes).
+-- Cada orden permitido en ORDENES_ESTUDIANTE (app.py) y cada filtro
+-- tiene un índice que empieza por sus columnas, terminando en la PK,
+-- para que la paginación por cursor sea un rango sobre el índice.
+
+CREATE INDEX ix_estudiante_nombre
+    ON estudiante (apellidos, nombres, id_estudiante);
+
+CREATE INDEX ix_estudiante_documento
+    ON estudiante (numero_documento, id_estudiante);
+
+CREATE INDEX ix_estudiante_institucion_nombre
+    ON estudiante (id_institucion, apellidos, nombres, id_estudiante);
+
+CREATE INDEX ix_estudiante_grado_nombre
+    ON estudiante (id_grado_actual, apellidos, nombres, id_estudiante);
@@ -0,0 +1,8 @@
+-- Índices para los totales por institución de /aulas y para el
+-- despliegue paginado de aulas (/api/instituciones/<id>/aulas).
+
+CREATE INDEX ix_aula_programa_institucion_estado
+    ON aula_programa (id_institucion, estado);
+
+CREATE INDEX ix_matricula_aula_estudiante
+    ON matricula (id_aula, id_estudiante);
@@ -0,0 +1,164 @@
+-- Permisos por rol y menú de navegación en BD (ver permisos.py).
+-- Los datos iniciales reproducen los roles que hoy declara cada
+-- @role_required en app.py y el menú que antes estaba fijo en base.html.
+-- Cualquier cambio hecho desde /admin/roles o /admin/menus sube
+-- permisos_version y los workers recargan en pocos segundos.
+
+CREATE TABLE permiso (
+    id_permiso   INT AUTO_INCREMENT PRIMARY KEY,
+    endpoint     VARCHAR(100) NOT NULL,
+    descripcion  VARCHAR(200) NULL,
+    UNIQUE KEY uq_permiso_endpoint (endpoint)
+);
+
+CREATE TABLE rol_permiso (
+    id_rol      INT NOT NULL,
+    id_permiso  INT NOT NULL,
+    PRIMARY KEY (id_rol, id_permiso),
+    CONSTRAINT fk_rol_permiso_rol     FOREIGN KEY (id_rol)     REFERENCES rol (id_rol),
+    CONSTRAINT fk_rol_permiso_permiso FOREIGN KEY (id_permiso) REFERENCES permiso (id_permiso)
+        ON DELETE CASCADE
+);
+
+CREATE TABLE menu_item (
+    id_menu_item   INT AUTO_INCREMENT PRIMARY KEY,
+    grupo          VARCHAR(60)  NOT NULL,
+    orden_grupo    INT          NOT NULL,
+    etiqueta       VARCHAR(100) NOT NULL,
+    endpoint       VARCHAR(100) NOT NULL,
+    orden          INT          NOT NULL,
+    divisor_antes  TINYINT(1)   NOT NULL DEFAULT 0,
+    activo         TINYINT(1)   NOT NULL DEFAULT 1
+);
+
+CREATE TABLE permisos_version (
+    id       TINYINT PRIMARY KEY,
+    version  INT NOT NULL
+);
+
+INSERT INTO permisos_version (id, version) VALUES (1, 1);
+
+-- ----------------- Permisos -----------------
+INSERT INTO permiso (endpoint, descripcion) VALUES
+    ('admin_nuevo_usuario', NULL),
+    ('aulas_list', 'Aulas del programa'),
+    ('api_aulas_institucion', NULL),
+    ('aulas_institucion_list', NULL),
+    ('toggle_aula', NULL),
+    ('aulas_new', NULL),
+    ('deshabilitar_aula', NULL),
+    ('habilitar_aula', NULL),
+    ('admin_semanas_list', 'Calendario del programa'),
+    ('admin_semanas_new', NULL),
+    ('admin_tiposdoc_list', 'Tipos de documento'),
+    ('admin_tiposdoc_new', NULL),
+    ('admin_duraciones_list', 'Duración estándar de hora'),
+    ('instituciones_list', 'Instituciones (IED)'),
+    ('admin_duraciones_new', NULL),
+    ('aulas_por_institucion', NULL),
+    ('institucion_deshabilitar', NULL),
+    ('institucion_habilitar', NULL),
+    ('admin_config_dashboard', 'Panel de configuración'),
+    ('roles_list', 'Roles y permisos'),
+    ('menus_list', 'Menús'),
+    ('sedes_list', 'Sedes'),
+    ('sedes_new', NULL),
+    ('sedes_edit', NULL),
+    ('sedes_delete', NULL),
+    ('tutores_list', 'Tutores'),
+    ('tutores_new', NULL),
+    ('estudiantes_list', 'Estudiantes'),
+    ('estudiantes_new', NULL),
+    ('periodos_list', 'Períodos académicos'),
+    ('periodos_new', NULL),
+    ('componentes_list', 'Componentes de nota'),
+    ('componentes_new', NULL),
+    ('notas_registro', 'Registro de notas'),
+    ('asistencia_mis_clases', 'Mis aulas y horarios'),
+    ('api_asistencia_mis_clases', NULL),
+    ('asistencia_tomar', 'Tomar asistencia'),
+    ('asistencia_reposiciones', 'Reposiciones'),
+    ('festivos_list', 'Gestión de festivos'),
+    ('motivos_inasistencia_list', 'Motivos de no asistencia'),
+    ('reporte_asistencia_aula', 'Asistencia por Aula'),
+    ('reporte_asistencia_estudiante', 'Asistencia por Estudiante'),
+    ('reporte_boletin', 'Boletín de notas'),
+    ('reporte_comparativo_programa', 'Inside vs Outside Classroom');
+
+-- ----------------- Roles por permiso -----------------
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint IN (
+        'admin_nuevo_usuario', 'aulas_list', 'api_aulas_institucion',
+        'aulas_institucion_list', 'toggle_aula', 'aulas_new',
+        'deshabilitar_aula', 'habilitar_aula', 'admin_semanas_list',
+        'admin_semanas_new', 'admin_tiposdoc_list', 'admin_tiposdoc_new',
+        'admin_duraciones_list', 'instituciones_list', 'admin_duraciones_new',
+        'aulas_por_institucion', 'institucion_deshabilitar', 'institucion_habilitar',
+        'admin_config_dashboard', 'roles_list', 'menus_list',
+        'sedes_list', 'sedes_new', 'sedes_edit',
+        'sedes_delete', 'tutores_list', 'tutores_new',
+        'estudiantes_list', 'estudiantes_new', 'periodos_list',
+        'periodos_new', 'componentes_list', 'componentes_new',
+        'notas_registro', 'asistencia_mis_clases', 'api_asistencia_mis_clases',
+        'asistencia_tomar', 'asistencia_reposiciones', 'festivos_list',
+        'motivos_inasistencia_list', 'reporte_asistencia_aula', 'reporte_asistencia_estudiante',
+        'reporte_boletin', 'reporte_comparativo_programa'
+    )
+WHERE r.nombre_rol = 'ADMINISTRADOR';
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint IN (
+        'aulas_list', 'api_aulas_institucion', 'aulas_institucion_list',
+        'toggle_aula', 'aulas_new', 'deshabilitar_aula',
+        'habilitar_aula', 'instituciones_list', 'aulas_por_institucion',
+        'institucion_deshabilitar', 'institucion_habilitar', 'sedes_list',
+        'sedes_new', 'sedes_edit', 'sedes_delete',
+        'tutores_list', 'tutores_new', 'estudiantes_list',
+        'estudiantes_new', 'periodos_list', 'periodos_new',
+        'componentes_list', 'componentes_new', 'notas_registro',
+        'asistencia_mis_clases', 'api_asistencia_mis_clases', 'asistencia_tomar',
+        'asistencia_reposiciones', 'festivos_list', 'motivos_inasistencia_list',
+        'reporte_asistencia_aula', 'reporte_asistencia_estudiante', 'reporte_boletin',
+        'reporte_comparativo_programa'
+    )
+WHERE r.nombre_rol = 'ADMINISTRATIVO';
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint IN (
+        'notas_registro', 'asistencia_mis_clases', 'api_asistencia_mis_clases',
+        'asistencia_tomar', 'asistencia_reposiciones', 'reporte_asistencia_estudiante',
+        'reporte_boletin'
+    )
+WHERE r.nombre_rol = 'TUTOR';
+
+-- ----------------- Menú -----------------
+INSERT INTO menu_item (grupo, orden_grupo, etiqueta, endpoint, orden, divisor_antes) VALUES
+    ('Configuración', 1, 'Panel de configuración', 'admin_config_dashboard', 10, 0),
+    ('Configuración', 1, 'Calendario del programa', 'admin_semanas_list', 20, 0),
+    ('Configuración', 1, 'Tipos de documento', 'admin_tiposdoc_list', 30, 0),
+    ('Configuración', 1, 'Duración estándar de hora', 'admin_duraciones_list', 40, 0),
+    ('Configuración', 1, 'Roles y permisos', 'roles_list', 50, 0),
+    ('Configuración', 1, 'Menús', 'menus_list', 60, 0),
+    ('Instituciones', 2, 'Instituciones (IED)', 'instituciones_list', 10, 0),
+    ('Instituciones', 2, 'Sedes', 'sedes_list', 20, 0),
+    ('Instituciones', 2, 'Aulas del programa', 'aulas_list', 30, 0),
+    ('Personas', 3, 'Tutores', 'tutores_list', 10, 0),
+    ('Personas', 3, 'Estudiantes', 'estudiantes_list', 20, 0),
+    ('Académico', 4, 'Períodos académicos', 'periodos_list', 10, 0),
+    ('Académico', 4, 'Componentes de nota', 'componentes_list', 20, 0),
+    ('Académico', 4, 'Registro de notas', 'notas_registro', 30, 0),
+    ('Asistencia', 5, 'Mis aulas y horarios', 'asistencia_mis_clases', 10, 0),
+    ('Asistencia', 5, 'Tomar asistencia', 'asistencia_tomar', 20, 0),
+    ('Asistencia', 5, 'Reposiciones', 'asistencia_reposiciones', 30, 0),
+    ('Asistencia', 5, 'Gestión de festivos', 'festivos_list', 40, 1),
+    ('Asistencia', 5, 'Motivos de no asistencia', 'motivos_inasistencia_list', 50, 0),
+    ('Reportes', 6, 'Asistencia por Aula', 'reporte_asistencia_aula', 10, 0),
+    ('Reportes', 6, 'Asistencia por Estudiante', 'reporte_asistencia_estudiante', 20, 0),
+    ('Reportes', 6, 'Boletín de notas', 'reporte_boletin', 30, 0),
+    ('Reportes', 6, 'Inside vs Outside Classroom', 'reporte_comparativo_programa', 40, 0);
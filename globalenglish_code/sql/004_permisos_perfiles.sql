@@ -0,0 +1,17 @@
+-- Página de perfiles de rendimiento (ver perfilador.py): permiso para
+-- ADMINISTRADOR y entrada en el menú de Configuración.
+
+INSERT INTO permiso (endpoint, descripcion) VALUES
+    ('admin_perfiles', 'Perfiles de rendimiento'),
+    ('admin_perfil_descargar', NULL);
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint IN ('admin_perfiles', 'admin_perfil_descargar')
+WHERE r.nombre_rol = 'ADMINISTRADOR';
+
+INSERT INTO menu_item (grupo, orden_grupo, etiqueta, endpoint, orden, divisor_antes) VALUES
+    ('Configuración', 1, 'Perfiles de rendimiento', 'admin_perfiles', 70, 0);
+
+UPDATE permisos_version SET version = version + 1 WHERE id = 1;
@@ -0,0 +1,28 @@
+-- Registro de notas por componente (ver notas.py): una fila de `nota` por
+-- estudiante, aula, período y componente. La llave única es la que usa el
+-- guardado por lote (INSERT ... ON DUPLICATE KEY UPDATE) y, por su orden,
+-- también sirve para leer la planilla de un aula.
+
+CREATE UNIQUE INDEX ux_nota_aula_periodo_componente_estudiante
+    ON nota (id_aula, id_periodo, id_componente, id_estudiante);
+
+INSERT INTO permiso (endpoint, descripcion) VALUES
+    ('notas_planilla', 'Planilla de notas del aula'),
+    ('notas_importar', 'Importar notas (CSV)');
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint = 'notas_planilla'
+WHERE r.nombre_rol IN ('ADMINISTRADOR', 'ADMINISTRATIVO', 'TUTOR');
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint = 'notas_importar'
+WHERE r.nombre_rol IN ('ADMINISTRADOR', 'ADMINISTRATIVO');
+
+INSERT INTO menu_item (grupo, orden_grupo, etiqueta, endpoint, orden, divisor_antes) VALUES
+    ('Académico', 4, 'Importar notas (CSV)', 'notas_importar', 40, 0);
+
+UPDATE permisos_version SET version = version + 1 WHERE id = 1;
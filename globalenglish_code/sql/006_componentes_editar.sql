@@ -0,0 +1,13 @@
+-- Edición de componentes de nota: cambiar un porcentaje recalcula la
+-- nota_final del programa (ver notas.recalcular_programa).
+
+INSERT INTO permiso (endpoint, descripcion) VALUES
+    ('componentes_edit', NULL);
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint = 'componentes_edit'
+WHERE r.nombre_rol IN ('ADMINISTRADOR', 'ADMINISTRATIVO');
+
+UPDATE permisos_version SET version = version + 1 WHERE id = 1;
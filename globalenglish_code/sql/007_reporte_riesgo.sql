@@ -0,0 +1,21 @@
+-- Reporte de estudiantes en riesgo por inasistencia (ver riesgo.py):
+-- permiso para ADMINISTRADOR y ADMINISTRATIVO y entrada en el menú de
+-- Reportes. El índice deja leer el detalle de un período por rango de
+-- fechas sin recorrer todas las clases.
+
+CREATE INDEX ix_asistencia_clase_fecha
+    ON asistencia_clase (fecha_clase, id_clase);
+
+INSERT INTO permiso (endpoint, descripcion) VALUES
+    ('reporte_riesgo_asistencia', 'Estudiantes en riesgo por inasistencia');
+
+INSERT INTO rol_permiso (id_rol, id_permiso)
+SELECT r.id_rol, p.id_permiso
+FROM rol r
+JOIN permiso p ON p.endpoint = 'reporte_riesgo_asistencia'
+WHERE r.nombre_rol IN ('ADMINISTRADOR', 'ADMINISTRATIVO');
+
+INSERT INTO menu_item (grupo, orden_grupo, etiqueta, endpoint, orden, divisor_antes) VALUES
+    ('Reportes', 6, 'Estudiantes en riesgo', 'reporte_riesgo_asistencia', 50, 0);
+
+UPDATE permisos_version SET version = version + 1 WHERE id = 1;
@@ -0,0 +1,26 @@
+-- Versión del horario de los tutores (ver horario_tutor.py). Cada worker
+-- guarda el horario en caché y lo descarta cuando esta versión cambia.
+-- La app la sube al editar o borrar sedes; los triggers la suben con
+-- cualquier cambio de asignaciones u horarios, también los hechos
+-- directamente en la BD.
+
+CREATE TABLE horario_version (
+    id       TINYINT PRIMARY KEY,
+    version  INT NOT NULL
+);
+
+INSERT INTO horario_version (id, version) VALUES (1, 1);
+
+CREATE TRIGGER tr_tutor_aula_horario_ins AFTER INSERT ON tutor_aula_horario
+    FOR EACH ROW UPDATE horario_version SET version = version + 1 WHERE id = 1;
+CREATE TRIGGER tr_tutor_aula_horario_upd AFTER UPDATE ON tutor_aula_horario
+    FOR EACH ROW UPDATE horario_version SET version = version + 1 WHERE id = 1;
+CREATE TRIGGER tr_tutor_aula_horario_del AFTER DELETE ON tutor_aula_horario
+    FOR EACH ROW UPDATE horario_version SET version = version + 1 WHERE id = 1;
+
+CREATE TRIGGER tr_horario_aula_ins AFTER INSERT ON horario_aula
+    FOR EACH ROW UPDATE horario_version SET version = version + 1 WHERE id = 1;
+CREATE TRIGGER tr_horario_aula_upd AFTER UPDATE ON horario_aula
+    FOR EACH ROW UPDATE horario_version SET version = version + 1 WHERE id = 1;
+CREATE TRIGGER tr_horario_aula_del AFTER DELETE ON horario_aula
+    FOR EACH ROW UPDATE horario_version SET version = version + 1 WHERE id = 1;
@@ -0,0 +1,11 @@
+-- Las notas que guardan la planilla y la importación (ver notas.py) son
+-- por componente y no llevan asignatura, así que id_asignatura pasa a
+-- aceptar NULL.
+--
+-- El boletín (consultas.reporte_boletin) lee solo nota_final, que se arma
+-- con las filas que tienen id_componente (sql/010). Las filas anteriores,
+-- por asignatura y sin componente, se conservan en `nota` pero ya no
+-- salen en el boletín: no hay cómo repartirlas entre componentes, y
+-- habría que registrarlas de nuevo por la planilla o el CSV.
+
+ALTER TABLE nota MODIFY id_asignatura INT NULL;
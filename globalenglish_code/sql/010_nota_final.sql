@@ -0,0 +1,27 @@
+-- Nota final guardada una sola vez por estudiante, aula y período (ver
+-- notas.py). Antes se repetía en cada fila de componente de `nota`, y un
+-- boletín que leyera `nota` fila a fila la mostraba una vez por
+-- componente. El boletín lee de aquí (consultas.reporte_boletin).
+--
+-- El índice sobre nota empieza por (id_estudiante, id_aula, id_periodo):
+-- el recálculo tras guardar filtra por esos grupos, y la llave única de
+-- sql/005 (id_aula, id_periodo, id_componente, id_estudiante) solo le
+-- servía hasta el aula y el período, es decir, todo el curso.
+
+CREATE TABLE nota_final (
+    id_estudiante  INT NOT NULL,
+    id_aula        INT NOT NULL,
+    id_periodo     INT NOT NULL,
+    nota_final     DECIMAL(5, 2) NOT NULL,
+    PRIMARY KEY (id_estudiante, id_aula, id_periodo)
+);
+
+CREATE INDEX ix_nota_estudiante_aula_periodo
+    ON nota (id_estudiante, id_aula, id_periodo);
+
+INSERT INTO nota_final (id_estudiante, id_aula, id_periodo, nota_final)
+SELECT x.id_estudiante, x.id_aula, x.id_periodo,
+       ROUND(SUM(x.valor * c.porcentaje) / 100, 2)
+FROM nota x
+JOIN componente_nota c ON c.id_componente = x.id_componente
+GROUP BY x.id_estudiante, x.id_aula, x.id_periodo;
@@ -0,0 +1,45 @@
+/* ==== Autocompletado con /api/buscar ====
+   Uso: <input data-buscar="estudiante" data-campo="documento">
+   - data-buscar: tipos separados por coma (estudiante, tutor, institucion)
+   - data-campo:  qué valor se copia al input ("etiqueta" o "documento")
+*/
+(function () {
+  var URL_BUSCAR = "/api/buscar";
+
+  function conectar(input) {
+    var lista = document.createElement("datalist");
+    lista.id = "buscar-" + input.name;
+    input.setAttribute("list", lista.id);
+    input.setAttribute("autocomplete", "off");
+    input.parentNode.appendChild(lista);
+
+    var campo = input.dataset.campo || "etiqueta";
+    var temporizador = null;
+    var ultimo = "";
+
+    input.addEventListener("input", function () {
+      clearTimeout(temporizador);
+      temporizador = setTimeout(function () {
+        var q = input.value.trim();
+        if (q.length < 2 || q === ultimo) return;
+        ultimo = q;
+
+        var url = URL_BUSCAR + "?limite=8&tipos=" + encodeURIComponent(input.dataset.buscar) +
+                  "&q=" + encodeURIComponent(q);
+        fetch(url, { credentials: "same-origin" })
+          .then(function (r) { return r.ok ? r.json() : { resultados: [] }; })
+          .then(function (datos) {
+            lista.innerHTML = "";
+            datos.resultados.forEach(function (r) {
+              var op = document.createElement("option");
+              op.value = r[campo] || r.etiqueta;
+              op.label = r.etiqueta + (r.detalle ? " · " + r.detalle : "");
+              lista.appendChild(op);
+            });
+          });
+      }, 150);
+    });
+  }
+
+  document.querySelectorAll("input[data-buscar]").forEach(conectar);
+})();
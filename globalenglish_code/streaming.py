@@ -0,0 +1,69 @@
+# streaming.py
+#
+# Render en streaming para listados y reportes grandes.
+# En vez de traer todas las filas (fetchall) y armar toda la página en
+# memoria, las filas se leen de MySQL una a una (cursor sin buffer) a
+# medida que Jinja va generando el HTML, y el navegador empieza a
+# mostrar la tabla de inmediato. La memoria del worker ya no crece con
+# el número de filas. Las filas son las compactas de filas.py (no dicts):
+# con el streaming apagado la lista completa ocupa bastante menos.
+
+import logging
+
+from flask import Response, render_template, stream_template
+from mysql.connector import Error
+
+import filas
+from config import RENDER_EN_STREAMING, STREAMING_BLOQUE_BYTES
+
+log = logging.getLogger(__name__)
+
+
+def iterar_filas(conn, cursor):
+    """
+    Generador de filas compactas sobre un cursor de tuplas ya ejecutado
+    (sin buffer). Cierra el cursor y la conexión al terminar, aunque el
+    cliente se desconecte a mitad de la página.
+    """
+    try:
+        yield from filas.iterar(cursor)
+    except Error as e:
+        log.error("Error leyendo filas en streaming: %s", e)
+    finally:
+        try:
+            cursor.close()
+        except Error:
+            pass
+        conn.close()
+
+
+def _en_bloques(partes):
+    """Junta los pedacitos que produce Jinja en bloques de ~16 KB."""
+    try:
+        bloque, tam = [], 0
+        for parte in partes:
+            bloque.append(parte)
+            tam += len(parte)
+            if tam >= STREAMING_BLOQUE_BYTES:
+                yield "".join(bloque)
+                bloque, tam = [], 0
+        if bloque:
+            yield "".join(bloque)
+    finally:
+        if hasattr(partes, "close"):
+            partes.close()
+
+
+def render_listado(nombre_plantilla, **contexto):
+    """
+    Igual que render_template, pero en streaming si RENDER_EN_STREAMING
+    está activo. Con el modo apagado los generadores se leen completos
+    (filas.juntar) y la página se arma completa como antes.
+    """
+    if not RENDER_EN_STREAMING:
+        contexto = {k: filas.juntar(v) if hasattr(v, "__next__") else v
+                    for k, v in contexto.items()}
+        return render_template(nombre_plantilla, **contexto)
+
+    return Response(_en_bloques(stream_template(nombre_plantilla, **contexto)),
+                    mimetype="text/html")
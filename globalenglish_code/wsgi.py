@@ -0,0 +1,14 @@
+# wsgi.py
+#
+# Punto de entrada WSGI de producción ("wsgi:app"), usado por servidor.py.
+# Con preload se importa una sola vez, en el proceso maestro.
+
+import arranque  # primero: desde aquí se mide el arranque en frío
+
+with arranque.medir("importar app.py"):
+    from app import crear_app
+
+from config import ARRANQUE_PRESUPUESTO_SEGUNDOS, ARRANQUE_ESTRICTO  # noqa: E402
+
+app = crear_app()
+arranque.verificar_presupuesto(ARRANQUE_PRESUPUESTO_SEGUNDOS, ARRANQUE_ESTRICTO)
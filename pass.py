@@ -1,3 +1,10 @@
-from werkzeug.security import generate_password_hash
-generate_password_hash("Pedrinche@2020")
-print("la contraseña hash es: ", generate_password_hash("Pedrinche@2020"))
\ No newline at end of file
+import os
+import sys
+from getpass import getpass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "globalenglish_code"))
+
+from contrasenas import generar_hash  # usa la misma política que el login
+
+password = sys.argv[1] if len(sys.argv) > 1 else getpass("Contraseña: ")
+print("la contraseña hash es: ", generar_hash(password))